@@ -33,8 +33,8 @@ from pathlib import Path
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, CoreState
-from homeassistant.const import Platform, EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import Event, HomeAssistant, CoreState
+from homeassistant.const import Platform, EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_STARTED
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.components.http import StaticPathConfig
@@ -49,8 +49,16 @@ from .const import (
     CONF_USE_HTTPS,
     CONF_VERIFY_SSL,
     CONF_UPDATE_INTERVAL,
+    CONF_CONFIG_INTERVAL,
+    CONF_DYNBLOCK_INTERVAL,
+    CONF_USE_PROMETHEUS,
+    CONF_MAX_CONFIG_SIZE,
+    CONF_RETAIN_ALL_COUNTERS,
     CONF_MEMBERS,
     CONF_IS_GROUP,
+    DEFAULT_CONFIG_INTERVAL,
+    DEFAULT_DYNBLOCK_INTERVAL,
+    DEFAULT_MAX_CONFIG_SIZE,
     DEFAULT_UPDATE_INTERVAL,
 )
 
@@ -63,7 +71,10 @@ from . import sensor  # noqa: F401  # pylint: disable=unused-import
 from . import switch  # noqa: F401  # pylint: disable=unused-import
 from .coordinator import DnsdistCoordinator
 from .group_coordinator import DnsdistGroupCoordinator
+from .registry import async_get_member_registry
+from .scheduler import async_get_scheduler
 from .services import register_dnsdist_services
+from .utils import group_dependency_order, group_leaf_hosts, group_members_by_name
 
 _LOGGER = logging.getLogger(__name__)
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
@@ -204,6 +215,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if is_group:
         members = list(data.get(CONF_MEMBERS, []))
+        groups = group_members_by_name(hass.config_entries.async_entries(DOMAIN))
+        try:
+            group_dependency_order(groups, [name])
+            group_leaf_hosts(groups, name)
+        except ValueError as err:
+            _LOGGER.error("[dnsdist] Not setting up group '%s': %s", name, err)
+            return False
         coordinator = DnsdistGroupCoordinator(
             hass,
             entry_id=entry.entry_id,
@@ -218,6 +236,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         verify_ssl = bool(data.get(CONF_VERIFY_SSL, True))
 
         api_key = data.get(CONF_API_KEY)
+        config_interval = int(data.get(CONF_CONFIG_INTERVAL, DEFAULT_CONFIG_INTERVAL))
+        dynblock_interval = int(data.get(CONF_DYNBLOCK_INTERVAL, DEFAULT_DYNBLOCK_INTERVAL))
+        use_prometheus = bool(data.get(CONF_USE_PROMETHEUS, False))
+        max_config_size = int(data.get(CONF_MAX_CONFIG_SIZE, DEFAULT_MAX_CONFIG_SIZE))
+        retain_all_counters = bool(data.get(CONF_RETAIN_ALL_COUNTERS, False))
 
         coordinator = DnsdistCoordinator(
             hass,
@@ -229,18 +252,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             use_https=use_https,
             verify_ssl=verify_ssl,
             update_interval=update_interval,
+            config_interval=config_interval,
+            dynblock_interval=dynblock_interval,
+            use_prometheus=use_prometheus,
+            max_config_size=max_config_size,
+            retain_all_counters=retain_all_counters,
         )
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    await coordinator.async_config_entry_first_refresh()
+    # Entities start from the last known data; the first poll then runs in the background
+    restored = await coordinator.async_restore_snapshot()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
+
+    # Host polls are driven by the shared, staggered scheduler from here on.
+    if isinstance(coordinator, DnsdistCoordinator):
+        entry.async_on_unload(async_get_scheduler(hass).async_add(entry.entry_id, coordinator, poll_now=restored))
+
+        # Entries are not unloaded when HA stops; close the session and keep it closed
+        async def _async_close_session(_event: Event) -> None:
+            await coordinator.async_close_session()
+
+        entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session))
+    elif restored:
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {name}")
+
+    # Groups set up earlier look the new member up on the reload signal.
+    async_get_member_registry(hass).async_add(coordinator)
+    async_dispatcher_send(hass, SIGNAL_DNSDIST_RELOAD)
 
     platforms = [Platform.BINARY_SENSOR, Platform.BUTTON, Platform.SENSOR, Platform.SWITCH]
     await hass.config_entries.async_forward_entry_setups(entry, platforms)
 
-    # Clean up dispatcher listener for group coordinators on unload
+    # Clean up dispatcher and member listeners for group coordinators on unload
     if is_group:
         entry.async_on_unload(coordinator._unsub_dispatcher)
+        entry.async_on_unload(coordinator.async_unsubscribe_members)
 
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
@@ -251,7 +299,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     platforms = [Platform.BINARY_SENSOR, Platform.BUTTON, Platform.SENSOR, Platform.SWITCH]
     unloaded = await hass.config_entries.async_unload_platforms(entry, platforms)
     if unloaded:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        # Before the reload signal, so groups no longer resolve this entry
+        if coordinator is not None:
+            async_get_member_registry(hass).async_remove(coordinator)
+        if isinstance(coordinator, DnsdistCoordinator):
+            # Stop polling before the session goes away; on_unload callbacks run too late
+            await async_get_scheduler(hass).async_remove(entry.entry_id)
+            await coordinator.async_close_session()
         async_dispatcher_send(hass, SIGNAL_DNSDIST_RELOAD)
         _LOGGER.info("Unloaded dnsdist entry '%s'", entry.title)
     return unloaded
@@ -43,7 +43,7 @@ from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import ATTR_BACKENDS, CONF_IS_GROUP, DOMAIN
-from .utils import build_device_info
+from .utils import StructureTracker, build_device_info
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -57,10 +57,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         return
 
     backend_entities: dict[str, DnsdistBackendBinarySensor] = {}
+    structure = StructureTracker(coordinator)
 
     @callback
     def _async_sync_backends() -> None:
-        if not coordinator.data:
+        if not coordinator.data or structure.unchanged():
             return
         backends = coordinator.data.get(ATTR_BACKENDS)
         if not isinstance(backends, dict):
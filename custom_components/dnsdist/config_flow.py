@@ -52,6 +52,7 @@ from .const import (
     CONF_IS_GROUP,
     CONF_INCLUDE_FILTER_SENSORS,
 )
+from .utils import group_dependency_order, group_leaf_hosts, group_members_by_name
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -313,10 +314,13 @@ class DnsdistConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             user_input = {k: v for k, v in user_input.items() if k in expected_keys}
 
         # Determine available host names from existing host entries
-        entries = [e for e in self._async_current_entries() if not e.data.get(CONF_IS_GROUP)]
+        current_entries = self._async_current_entries()
+        entries = [e for e in current_entries if not e.data.get(CONF_IS_GROUP)]
         available_hosts = {e.data.get(CONF_NAME, e.title) for e in entries}
         if not available_hosts:
             errors["base"] = "no_hosts"
+        # Existing groups can be nested as members too
+        groups = group_members_by_name(current_entries)
 
         if user_input and not errors:
             group_name = user_input[CONF_NAME]
@@ -326,6 +330,19 @@ class DnsdistConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             if not members:
                 errors["base"] = "no_members"
+            else:
+                updated = {**groups, group_name: members}
+                try:
+                    group_dependency_order(updated, [group_name])
+                except ValueError:
+                    errors["base"] = "group_cycle"
+                else:
+                    # Groups above this one would count a shared host twice too
+                    try:
+                        for group in updated:
+                            group_leaf_hosts(updated, group)
+                    except ValueError:
+                        errors["base"] = "group_overlap"
 
             if not errors:
                 return self.async_create_entry(
@@ -342,7 +359,7 @@ class DnsdistConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         schema = vol.Schema(
             {
                 vol.Required(CONF_NAME): str,
-                vol.Required(CONF_MEMBERS, default=[]): cv.multi_select(sorted(available_hosts)),
+                vol.Required(CONF_MEMBERS, default=[]): cv.multi_select(sorted(available_hosts | groups.keys())),
                 vol.Optional(CONF_UPDATE_INTERVAL, default=30): vol.All(int, vol.Range(min=10, max=600)),
                 vol.Optional(CONF_INCLUDE_FILTER_SENSORS, default=True): bool,
             }
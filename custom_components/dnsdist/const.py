@@ -30,6 +30,112 @@ DOMAIN = "dnsdist"
 # Default update interval in seconds
 DEFAULT_UPDATE_INTERVAL = 30
 
+# Default refresh cadences in seconds for the slower host endpoints. Counters
+# from /statistics follow the entry's update interval; the server config
+# (rules/backends) and the dynblock list are only refetched once their own
+# cadence has elapsed.
+DEFAULT_CONFIG_INTERVAL = 60
+DEFAULT_DYNBLOCK_INTERVAL = 30
+
+# Shared deadline in seconds for all HTTP requests issued during one host poll
+REQUEST_TIMEOUT = 10
+
+# Upper bound in MiB on a streamed server config document; larger responses are
+# abandoned mid-stream instead of being buffered
+DEFAULT_MAX_CONFIG_SIZE = 16
+# Read size in bytes for streaming the server config response
+CONFIG_STREAM_CHUNK_SIZE = 65536
+
+# Top-level server config keys extracted while streaming; everything else
+# (statistics, config, zones, ...) is skipped without being decoded
+SERVER_CONFIG_KEYS = ("rules", "filteringRules", "filtering_rules", "servers")
+
+# Circuit breaker for unreachable hosts: after this many consecutive failed
+# polls the host is only probed again after an exponential backoff (starting at
+# the update interval, capped below) with +/- jitter to spread retries.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BACKOFF_MAX = 900
+BREAKER_JITTER = 0.2
+
+# Circuit breaker states
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Samples kept per poll instrumentation series (latency, payload size, parse time)
+INSTRUMENTATION_SAMPLES = 64
+
+# Upper bound on host polls in flight at once across the whole integration
+MAX_CONCURRENT_POLLS = 8
+
+# Groups re-aggregate when a member publishes new data; updates landing
+# within this many seconds are folded into one aggregation
+GROUP_AGGREGATION_DEBOUNCE = 2.0
+
+# dnsdist statistics that only ever increase until the host restarts. The JSON
+# API reports every statistic with type "StatisticItem", so counters are told
+# apart from gauges by name.
+DNSDIST_COUNTER_STATS = frozenset(
+    {
+        "acl-drops",
+        "cache-hits",
+        "cache-misses",
+        "cpu-iowait",
+        "cpu-steal",
+        "cpu-sys-msec",
+        "cpu-user-msec",
+        "doh-query-pipe-full",
+        "doh-response-pipe-full",
+        "doh3-response-pipe-full",
+        "doq-response-pipe-full",
+        "downstream-send-errors",
+        "downstream-timeouts",
+        "dyn-blocked",
+        "empty-queries",
+        "frontend-noerror",
+        "frontend-nxdomain",
+        "frontend-servfail",
+        "latency-count",
+        "latency-slow",
+        "latency-sum",
+        "latency0-1",
+        "latency1-10",
+        "latency10-50",
+        "latency50-100",
+        "latency100-1000",
+        "no-policy",
+        "noncompliant-queries",
+        "noncompliant-responses",
+        "outgoing-doh-query-pipe-full",
+        "proxy-protocol-invalid",
+        "queries",
+        "rdqueries",
+        "responses",
+        "rule-drop",
+        "rule-nxdomain",
+        "rule-refused",
+        "rule-servfail",
+        "rule-truncated",
+        "self-answered",
+        "servfail-responses",
+        "tcp-cross-protocol-query-pipe-full",
+        "tcp-cross-protocol-response-pipe-full",
+        "tcp-listen-overflows",
+        "tcp-query-pipe-full",
+        "trunc-failures",
+        "udp-in-csum-errors",
+        "udp-in-errors",
+        "udp-noport-errors",
+        "udp-recvbuf-errors",
+        "udp-sndbuf-errors",
+        "udp6-in-csum-errors",
+        "udp6-in-errors",
+        "udp6-noport-errors",
+        "udp6-recvbuf-errors",
+        "udp6-sndbuf-errors",
+    }
+)
+
 # Platforms used by this integration
 PLATFORMS = ["sensor", "button"]  # <-- added button
 
@@ -43,6 +149,12 @@ CONF_API_KEY = "api_key"
 CONF_USE_HTTPS = "use_https"
 CONF_VERIFY_SSL = "verify_ssl"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_CONFIG_INTERVAL = "config_interval"
+CONF_DYNBLOCK_INTERVAL = "dynblock_interval"
+CONF_USE_PROMETHEUS = "use_prometheus"
+CONF_MAX_CONFIG_SIZE = "max_config_size"
+CONF_RETAIN_ALL_COUNTERS = "retain_all_counters"
+CONF_POLL_INSTRUMENTATION = "poll_instrumentation"
 CONF_NAME = "name"
 CONF_MEMBERS = "members"
 CONF_IS_GROUP = "is_group"
@@ -63,15 +175,76 @@ ATTR_UPTIME = "uptime"
 ATTR_SECURITY_STATUS = "security_status"
 ATTR_REQ_PER_HOUR = "req_per_hour"
 ATTR_REQ_PER_DAY = "req_per_day"
+ATTR_REQ_PER_WEEK = "req_per_week"
+ATTR_REQ_PER_MONTH = "req_per_month"
 
 # Attribute names for complex data structures
 ATTR_FILTERING_RULES = "filtering_rules"
 ATTR_DYNAMIC_RULES = "dynamic_rules"
 ATTR_BACKENDS = "backends"
+# Every reported counter, as a list aligned with the coordinator's counter_names
+ATTR_COUNTERS = "counters"
+
+# dnsdist statistics name -> normalized data key. Names are given in the dash
+# form used by the JSON API; the underscore form is accepted as well.
+STATISTICS_KEY_MAP = {
+    "queries": ATTR_QUERIES,
+    "responses": ATTR_RESPONSES,
+    "drops": ATTR_DROPS,
+    "rule-drop": ATTR_RULE_DROP,
+    "downstream-send-errors": ATTR_DOWNSTREAM_ERRORS,
+    "cache-hits": ATTR_CACHE_HITS,
+    "cache-misses": ATTR_CACHE_MISSES,
+    "uptime": ATTR_UPTIME,
+    "cpu-user-msec": "cpu_user_msec",
+    "security-status": ATTR_SECURITY_STATUS,
+}
+
+# Alternative statistics names seen in older or vendor-modified builds
+STATISTICS_ALIASES = {
+    "downstream-errors": "downstream-send-errors",
+}
 
 # Storage helpers
 STORAGE_VERSION = 1
 STORAGE_KEY_HISTORY = "history"
+STORAGE_KEY_HISTORY_5M = "history_5m"
+STORAGE_KEY_HISTORY_1H = "history_1h"
+# Suffix of the binary history journal, stored next to the JSON store file
+JOURNAL_SUFFIX = ".journal"
+# Last normalized data, restored before the first poll after a restart.
+# Written at most once per delay (and on shutdown); ignored once too old.
+STORAGE_KEY_SNAPSHOT = "snapshot"
+SNAPSHOT_SAVE_DELAY = 300
+SNAPSHOT_MAX_AGE = 86400
+
+# Consolidated history tiers kept next to the 24 h of raw samples: one sample
+# per bucket (the last counter value seen in it), in fixed-size rings.
+# (bucket seconds, retention seconds)
+HISTORY_TIER_5M = (300, 7 * 86400)
+HISTORY_TIER_1H = (3600, 90 * 86400)
+
+# Counters with rolling per-minute/per-hour rates. They are stored as extra
+# columns of the raw history, sharing its timestamp column with the queries.
+RATE_COUNTERS = (
+    ATTR_RESPONSES,
+    ATTR_DROPS,
+    ATTR_RULE_DROP,
+    ATTR_DOWNSTREAM_ERRORS,
+    ATTR_CACHE_HITS,
+    ATTR_CACHE_MISSES,
+)
+RATE_SUFFIX_MINUTE = "_per_minute"
+RATE_SUFFIX_HOUR = "_per_hour"
+
+# Counters with exponentially weighted per-second rates, and their horizons
+# as (key suffix, seconds)
+EWMA_COUNTERS = (ATTR_QUERIES, ATTR_DROPS, ATTR_DOWNSTREAM_ERRORS)
+EWMA_HORIZONS = (("_per_second_1m", 60), ("_per_second_5m", 300))
+
+# Trailing windows of the long-range rate sensors
+WEEK_SECONDS = 7 * 86400
+MONTH_SECONDS = 30 * 86400
 
 # Security status mappings (dnsdist API code -> string)
 SECURITY_STATUS_MAP = {
@@ -27,18 +27,20 @@
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import json
 import logging
 import time
-from asyncio import timeout
-from time import monotonic
-from collections import deque
+from time import monotonic, perf_counter
+from collections.abc import Callable
 from datetime import timedelta
-from typing import Any, Deque, Tuple
+from typing import Any
 
 import aiohttp
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
@@ -47,31 +49,86 @@ from .const import (
     ATTR_CACHE_HITS,
     ATTR_CACHE_HITRATE,
     ATTR_CACHE_MISSES,
+    ATTR_COUNTERS,
     ATTR_CPU,
-    ATTR_DOWNSTREAM_ERRORS,
-    ATTR_DROPS,
     ATTR_DYNAMIC_RULES,
     ATTR_FILTERING_RULES,
     ATTR_QUERIES,
     ATTR_REQ_PER_DAY,
     ATTR_REQ_PER_HOUR,
-    ATTR_RESPONSES,
-    ATTR_RULE_DROP,
+    ATTR_REQ_PER_MONTH,
+    ATTR_REQ_PER_WEEK,
     ATTR_SECURITY_STATUS,
     ATTR_UPTIME,
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    CONFIG_STREAM_CHUNK_SIZE,
+    DEFAULT_CONFIG_INTERVAL,
+    DEFAULT_DYNBLOCK_INTERVAL,
+    DEFAULT_MAX_CONFIG_SIZE,
+    DNSDIST_COUNTER_STATS,
     DOMAIN,
+    RATE_COUNTERS,
+    REQUEST_TIMEOUT,
     SECURITY_STATUS_MAP,
+    SERVER_CONFIG_KEYS,
+    STATISTICS_ALIASES,
+    STATISTICS_KEY_MAP,
     STORAGE_KEY_HISTORY,
     STORAGE_VERSION,
 )
-from .utils import HistoryMixin, coerce_int, make_zero_data, slugify_rule
+from .utils import (
+    CircuitBreaker,
+    DataSnapshot,
+    EwmaRates,
+    HistoryMixin,
+    HistoryRing,
+    JsonArrayExtractor,
+    PollInstrumentation,
+    SlugCache,
+    coerce_int,
+    make_zero_data,
+    parse_prometheus_line,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Fields identifying a rule or backend record across polls, most specific first
+RECORD_ID_FIELDS = ("uuid", "id", "address", "name")
+
+# Per-backend /metrics series (``dnsdist_server_<field>``) copied into backend records
+METRICS_SERVER_FIELDS = frozenset({"queries", "responses", "drops", "latency", "outstanding", "order", "weight", "qps"})
+
+
+def _security_status(value: Any) -> str:
+    return SECURITY_STATUS_MAP.get(int(value), "unknown")
+
+
+def _build_statistics_table() -> dict[str, tuple[str, Callable[[Any], Any]]]:
+    """Expand STATISTICS_KEY_MAP into a lookup of every accepted name spelling."""
+    converters: dict[str, Callable[[Any], Any]] = {ATTR_SECURITY_STATUS: _security_status}
+    names = dict(STATISTICS_KEY_MAP)
+    for alias, target in STATISTICS_ALIASES.items():
+        names[alias] = STATISTICS_KEY_MAP[target]
+
+    table: dict[str, tuple[str, Callable[[Any], Any]]] = {}
+    for name, key in names.items():
+        field = (key, converters.get(key, int))
+        table[name] = field
+        table[name.replace("-", "_")] = field
+    return table
+
+
+# Precompiled statistics name -> (data key, converter) lookup used by _normalize
+STATISTICS_TABLE = _build_statistics_table()
+
 
 class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
     """Coordinator that polls a single dnsdist host."""
 
+    # A host's CPU figure counts once in group averages
+    cpu_weight = 1
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -84,6 +141,11 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         use_https: bool,
         verify_ssl: bool,
         update_interval: int,
+        config_interval: int = DEFAULT_CONFIG_INTERVAL,
+        dynblock_interval: int = DEFAULT_DYNBLOCK_INTERVAL,
+        use_prometheus: bool = False,
+        max_config_size: int = DEFAULT_MAX_CONFIG_SIZE,
+        retain_all_counters: bool = False,
     ) -> None:
         """Initialize the coordinator."""
         super().__init__(
@@ -100,12 +162,27 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         self._use_https = use_https
         self._verify_ssl = verify_ssl
         self._base_url = f"{'https' if use_https else 'http'}://{host}:{port}"
+        # Session from the HA helper, created lazily inside the event loop
+        self._session: aiohttp.ClientSession | None = None
+        # Set once the entry unloads or HA closes; no session is created after that
+        self._closed = False
+        # Read counters and backends from /metrics instead of the JSON API
+        self._use_prometheus = use_prometheus
+        # Ceiling in bytes for the streamed server config document
+        self._max_config_bytes = max_config_size * 1024 * 1024
+        # Optionally keep every reported counter. Names only ever get appended,
+        # so a counter keeps its slot in ATTR_COUNTERS for the coordinator's life.
+        self._retain_all_counters = retain_all_counters
+        self.counter_names: list[str] = []
+        self.counter_types: dict[str, str] = {}
+        self._counter_index: dict[str, int] = {}
         # Track CPU deltas
         self._last_cpu_user_msec: int | None = None
         self._last_update_ts: float | None = None
         # Rolling history of (wallclock_ts, queries_counter) for rate sensors.
         # Capped at 24 hours worth of samples to bound memory usage.
-        self._history: Deque[Tuple[float, int]] = deque(maxlen=(86400 // update_interval) + 1)
+        self._history = HistoryRing((86400 // update_interval) + 1, width=len(self._HISTORY_COLUMNS))
+        self._init_history_tiers()
         self._history_dirty = False
         self._last_history_persist: float | None = None
         self._history_store = Store(
@@ -113,50 +190,156 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
             STORAGE_VERSION,
             f"{DOMAIN}_{entry_id}_{STORAGE_KEY_HISTORY}",
         )
+        self._init_history_journal()
         self._history_loaded = False
+        # Slower refresh tiers for the server config and dynblock endpoints.
+        # A tier never runs more often than the counters themselves.
+        self._update_interval_s = update_interval
+        self._config_interval = max(config_interval, update_interval)
+        self._dynblock_interval = max(dynblock_interval, update_interval)
+        self._last_config_fetch: float | None = None
+        self._last_dynblock_fetch: float | None = None
+        # Stop polling a dead host every tick; back off and probe instead
+        self.breaker = CircuitBreaker(update_interval)
+        # Per-endpoint latency, payload size and parse timings of recent polls
+        self.instrumentation = PollInstrumentation()
+        # Short-horizon per-second rates of the query, drop and error counters
+        self._ewma = EwmaRates()
+        # Caches of normalized rules/backends, keyed by record id
+        self._rule_cache: dict[Any, tuple[dict[str, Any], str, dict[str, Any]]] = {}
+        self._backend_cache: dict[Any, tuple[dict[str, Any], str, dict[str, Any]]] = {}
+        # Slugs of the rule, backend and dynblock names of the last parses
+        self.slug_caches = {"rules": SlugCache(), "backends": SlugCache(), "dynamic": SlugCache()}
+        # Bumped whenever the set of rules, backends or dynblocks changes so
+        # platforms can skip entity sync when only counters moved.
+        self.structure_version = 0
+        self._structure_refs: dict[str, dict[str, Any]] = {}
         # Avoid hammering unsupported endpoints with 404s
         self._server_config_supported: bool | None = None
         self._dynamic_rules_supported: bool | None = None
+        # Last normalized data, so entities come up populated after a restart
+        self._snapshot = DataSnapshot(hass, entry_id)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Seed ``data`` from the last snapshot; return True if there was one."""
+        payload = await self._snapshot.async_load()
+        if payload is None:
+            return False
+        data = payload["data"]
+        if self._retain_all_counters:
+            counter_types = payload.get("counter_types") or {}
+            for name in payload.get("counter_names") or []:
+                if isinstance(name, str) and name not in self._counter_index:
+                    self._register_counter(name, counter_types.get(name))
+        for key in (ATTR_FILTERING_RULES, ATTR_BACKENDS, ATTR_DYNAMIC_RULES):
+            if isinstance(data.get(key), dict):
+                self._track_structure(key, data[key])
+        self.data = data
+        _LOGGER.debug("[%s] Restored data snapshot", self._name)
+        return True
+
+    def _snapshot_payload(self) -> dict[str, Any]:
+        return {
+            "data": self.data,
+            "counter_names": self.counter_names,
+            "counter_types": self.counter_types,
+        }
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch and normalize dnsdist stats."""
+        if self._closed:
+            _LOGGER.debug("[%s] Coordinator closed, skipping poll", self._name)
+            return dict(self.data or self._zero_data())
+
         await self._async_ensure_history_loaded()
 
-        url = f"{self._base_url}/api/v1/servers/localhost/statistics"
+        poll_start = monotonic()
+        if not self.breaker.allow(poll_start):
+            _LOGGER.debug(
+                "[%s] Host unreachable, skipping poll (next probe in %.0fs)",
+                self._name,
+                self.breaker.retry_in(poll_start) or 0,
+            )
+            return dict(self.data or self._zero_data())
+
         headers = {"X-API-Key": self._api_key} if self._api_key else {}
+        session = self.async_get_session()
+
+        # Counters are fetched every tick; the heavier endpoints only when
+        # their own cadence has elapsed. A half-open probe only asks for the
+        # counters.
+        probing = self.breaker.state == BREAKER_HALF_OPEN
+        fetch_config = not probing and self._tier_due(self._last_config_fetch, self._config_interval, poll_start)
+        fetch_dynamic = not probing and self._tier_due(self._last_dynblock_fetch, self._dynblock_interval, poll_start)
+
+        # Issue all requests concurrently under one shared deadline so a poll
+        # lasts as long as the slowest endpoint rather than the sum of them.
+        if self._use_prometheus:
+            stats_task = asyncio.create_task(self._async_fetch_metrics(session, headers))
+        else:
+            stats_task = asyncio.create_task(self._async_fetch_statistics(session, headers))
+        config_task = asyncio.create_task(self._async_fetch_server_config(session, headers)) if fetch_config else None
+        dynamic_task = asyncio.create_task(self._async_fetch_dynamic_rules(session, headers)) if fetch_dynamic else None
+        tasks = [task for task in (stats_task, config_task, dynamic_task) if task is not None]
 
-        session = async_get_clientsession(self.hass)
+        try:
+            await asyncio.wait(tasks, timeout=REQUEST_TIMEOUT)
+        finally:
+            # Also when the poll itself is cancelled, so no fetch outlives it
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        server_config = self._task_result(config_task, "Server config fetch")
+        dynamic_rules = self._task_result(dynamic_task, "Dynamic rules fetch")
+        if server_config is not None:
+            self._last_config_fetch = poll_start
+        if dynamic_rules is not None:
+            self._last_dynblock_fetch = poll_start
 
         try:
-            ssl_context = False if not self._verify_ssl else None
-            _LOGGER.debug("[%s] Requesting stats from %s (ssl=%s)", self._name, url, ssl_context)
-            async with timeout(10):
-                async with session.get(url, headers=headers, ssl=ssl_context) as resp:
-                    if resp.status != 200:
-                        raise ConnectionError(f"HTTP {resp.status}")
-                    stats = await resp.json()
+            if stats_task.cancelled():
+                raise TimeoutError
+            stats = stats_task.result()
         except aiohttp.ClientSSLError as err:
             _LOGGER.warning("[%s] SSL error: %s", self._name, err)
-            data = dict(self.data or self._zero_data())
-            return data
+            stats = None
         except aiohttp.ClientConnectorError as err:
             _LOGGER.warning("[%s] Connection failed: %s", self._name, err)
-            data = dict(self.data or self._zero_data())
-            return data
+            stats = None
         except TimeoutError:
-            _LOGGER.warning("[%s] Request timed out after 10s", self._name)
-            data = dict(self.data or self._zero_data())
-            return data
+            _LOGGER.warning("[%s] Request timed out after %ss", self._name, REQUEST_TIMEOUT)
+            stats = None
         except Exception as err:
             _LOGGER.warning("[%s] Fetch error: %s", self._name, err)
-            # Preserve last data to avoid sensor going unavailable
+            stats = None
+
+        if stats is None:
+            if self.breaker.record_failure(poll_start):
+                _LOGGER.warning(
+                    "[%s] Host unreachable after %d failed polls, next probe in %.0fs",
+                    self._name,
+                    self.breaker.consecutive_failures,
+                    self.breaker.retry_in(poll_start) or 0,
+                )
+            # Preserve last data to avoid sensor going unavailable, but still
+            # merge whatever the other endpoints returned within the deadline.
             data = dict(self.data or self._zero_data())
+            self._merge_server_state(data, server_config, dynamic_rules)
             return data
 
+        if self.breaker.state != BREAKER_CLOSED:
+            _LOGGER.info("[%s] Host reachable again, resuming normal polling", self._name)
+        self.breaker.record_success()
+
         stats_preview = stats[:10] if isinstance(stats, list) else stats
         _LOGGER.debug("[%s] Raw dnsdist stats (first 10): %s", self._name, stats_preview)
 
+        started = perf_counter()
         normalized = self._normalize(stats)
+        self.instrumentation.record("normalize_ms", (perf_counter() - started) * 1000)
 
         # Preserve the latest known filtering rules so sensors remain available when
         # the endpoint temporarily fails or is disabled. ``self.data`` is ``None``
@@ -190,6 +373,13 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         if previous_backends is not None and ATTR_BACKENDS not in normalized:
             normalized[ATTR_BACKENDS] = previous_backends
 
+        # In Prometheus mode the per-backend series arrive with the counters
+        if self._use_prometheus and isinstance(stats, dict):
+            metrics_backends = self._parse_backends(stats)
+            if metrics_backends is not None:
+                normalized[ATTR_BACKENDS] = metrics_backends
+                self._track_structure(ATTR_BACKENDS, metrics_backends)
+
         # --- Compute CPU % based on cpu-user-msec counter ---
         try:
             cpu_user_msec = normalized.get("cpu_user_msec")
@@ -210,35 +400,185 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         try:
             now_ts = time.time()
             q = int(normalized.get(ATTR_QUERIES, 0))
-            self._update_history(now_ts, q)
+            counters = [int(normalized.get(key, 0)) for key in RATE_COUNTERS]
+            uptime = normalized.get(ATTR_UPTIME)
+            # Rates are computed on the stored series, which stays monotonic across restarts
+            q, *counters = self._update_history(
+                now_ts, q, counters, int(uptime) if isinstance(uptime, (int, float)) else None
+            )
             req_hour, req_day = self._compute_rates(now_ts, q)
             normalized[ATTR_REQ_PER_HOUR] = req_hour
             normalized[ATTR_REQ_PER_DAY] = req_day
+            req_week, req_month = self._compute_long_rates(now_ts, q)
+            normalized[ATTR_REQ_PER_WEEK] = req_week
+            normalized[ATTR_REQ_PER_MONTH] = req_month
+            normalized.update(self._compute_counter_rates(now_ts, counters))
+            normalized.update(self._ewma.update(monotonic(), normalized))
         except Exception as err:
             _LOGGER.debug("[%s] Rate computation failed: %s", self._name, err)
 
         await self._async_save_history()
 
+        self._merge_server_state(normalized, server_config, dynamic_rules)
+        self.instrumentation.record("poll_ms", (monotonic() - poll_start) * 1000)
+        self._snapshot.async_schedule_save(self._snapshot_payload)
+
+        return normalized
+
+    def async_get_session(self) -> aiohttp.ClientSession:
+        """Return this host's HTTP session, creating it on first use.
+
+        The session is created through Home Assistant, so it runs on HA's
+        pooled connector for the host's SSL setting, sends HA's user agent and
+        is closed by HA at shutdown. Polls and service calls share it. Must be
+        called from the event loop. Raises RuntimeError once
+        ``async_close_session`` has run.
+        """
+        if self._closed:
+            raise RuntimeError(f"Session of dnsdist host {self._name} is closed")
+        if self._session is None or self._session.closed:
+            self._session = async_create_clientsession(self.hass, verify_ssl=self._verify_ssl)
+        return self._session
+
+    async def async_close_session(self) -> None:
+        """Close the HTTP session for good; HA's shared connector stays open."""
+        self._closed = True
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _tier_due(self, last_fetch: float | None, interval: int, now: float) -> bool:
+        """Return True when a refresh tier should be fetched on this tick.
+
+        Half a tick of slack absorbs timer jitter so a 60 s tier on a 30 s
+        update interval runs every second tick rather than every third.
+        """
+        if last_fetch is None:
+            return True
+        return now - last_fetch >= interval - self._update_interval_s / 2
+
+    def _task_result(self, task: asyncio.Task[Any] | None, label: str) -> Any | None:
+        """Return the result of a finished fetch task, or None on failure/timeout."""
+        if task is None:
+            return None
+        if task.cancelled():
+            _LOGGER.debug("[%s] %s did not finish within %ss", self._name, label, REQUEST_TIMEOUT)
+            return None
+        err = task.exception()
+        if err is not None:
+            _LOGGER.debug("[%s] %s failed: %s", self._name, label, err)
+            return None
+        return task.result()
+
+    def _merge_server_state(
+        self,
+        data: dict[str, Any],
+        server_config: dict[str, Any] | None,
+        dynamic_rules: dict[str, dict[str, Any]] | None,
+    ) -> None:
+        """Merge parsed server config and dynamic rules into ``data`` in place."""
         try:
-            server_config = await self._async_fetch_server_config(session, headers)
             if server_config is not None:
+                started = perf_counter()
                 rules = self._parse_filtering_rules(server_config)
                 if rules is not None:
-                    normalized[ATTR_FILTERING_RULES] = rules
-                backends = self._parse_backends(server_config)
+                    data[ATTR_FILTERING_RULES] = rules
+                    self._track_structure(ATTR_FILTERING_RULES, rules)
+                # Prometheus mode takes backends from /metrics instead
+                backends = None if self._use_prometheus else self._parse_backends(server_config)
                 if backends is not None:
-                    normalized[ATTR_BACKENDS] = backends
+                    data[ATTR_BACKENDS] = backends
+                    self._track_structure(ATTR_BACKENDS, backends)
+                self.instrumentation.record("server_config_parse_ms", (perf_counter() - started) * 1000)
         except Exception as err:
-            _LOGGER.debug("[%s] Server config fetch failed: %s", self._name, err)
+            _LOGGER.debug("[%s] Server config parsing failed: %s", self._name, err)
 
-        try:
-            dynamic_rules = await self._async_fetch_dynamic_rules(session, headers)
-            if dynamic_rules is not None:
-                normalized[ATTR_DYNAMIC_RULES] = dynamic_rules
-        except Exception as err:
-            _LOGGER.debug("[%s] Dynamic rules fetch failed: %s", self._name, err)
+        if dynamic_rules is not None:
+            data[ATTR_DYNAMIC_RULES] = dynamic_rules
+            self._track_structure(ATTR_DYNAMIC_RULES, dynamic_rules)
 
-        return normalized
+    def _track_structure(self, key: str, mapping: dict[str, Any]) -> None:
+        """Bump ``structure_version`` if the slugs of ``mapping`` changed."""
+        previous = self._structure_refs.get(key)
+        if previous is None or previous.keys() != mapping.keys():
+            self.structure_version += 1
+        self._structure_refs[key] = mapping
+
+    async def _async_fetch_statistics(self, session: aiohttp.ClientSession, headers: dict[str, str]) -> Any:
+        """Fetch the statistics list from /api/v1/servers/localhost/statistics."""
+        url = f"{self._base_url}/api/v1/servers/localhost/statistics"
+        _LOGGER.debug("[%s] Requesting stats from %s (verify_ssl=%s)", self._name, url, self._verify_ssl)
+        started = perf_counter()
+        async with session.get(url, headers=headers) as resp:
+            if resp.status != 200:
+                raise ConnectionError(f"HTTP {resp.status}")
+            return await self._async_read_json(resp, "statistics", started)
+
+    async def _async_read_json(self, resp: aiohttp.ClientResponse, endpoint: str, started: float) -> Any:
+        """Read and decode a JSON body, recording latency, size and decode time."""
+        body = await resp.read()
+        decode_start = perf_counter()
+        self.instrumentation.record(f"{endpoint}_latency_ms", (decode_start - started) * 1000)
+        self.instrumentation.record(f"{endpoint}_bytes", len(body))
+        payload = json.loads(body)
+        self.instrumentation.record(f"{endpoint}_decode_ms", (perf_counter() - decode_start) * 1000)
+        return payload
+
+    async def _async_fetch_metrics(self, session: aiohttp.ClientSession, headers: dict[str, str]) -> dict[str, Any]:
+        """Stream /metrics and collect host counters and per-backend series.
+
+        The exposition is parsed line by line as it arrives. Unlabelled
+        ``dnsdist_*`` samples are mapped back to their JSON statistic names
+        (``dnsdist_cache_hits`` -> ``cache-hits``) so ``_normalize`` handles
+        both sources, and ``dnsdist_server_*`` series are folded into records
+        shaped like the ``servers`` list of the JSON server config.
+        """
+        url = f"{self._base_url}/metrics"
+        _LOGGER.debug("[%s] Requesting metrics from %s (verify_ssl=%s)", self._name, url, self._verify_ssl)
+
+        statistics: list[dict[str, Any]] = []
+        servers: dict[str, dict[str, Any]] = {}
+        received = 0
+        parse_time = 0.0
+        started = perf_counter()
+        async with session.get(url, headers=headers) as resp:
+            if resp.status != 200:
+                raise ConnectionError(f"HTTP {resp.status}")
+            async for raw_line in resp.content:
+                received += len(raw_line)
+                parse_start = perf_counter()
+                self._fold_metric_line(raw_line, statistics, servers)
+                parse_time += perf_counter() - parse_start
+
+        self.instrumentation.record("metrics_latency_ms", (perf_counter() - started) * 1000)
+        self.instrumentation.record("metrics_bytes", received)
+        self.instrumentation.record("metrics_decode_ms", parse_time * 1000)
+        return {"statistics": statistics, "servers": list(servers.values())}
+
+    @staticmethod
+    def _fold_metric_line(
+        raw_line: bytes, statistics: list[dict[str, Any]], servers: dict[str, dict[str, Any]]
+    ) -> None:
+        """Fold one exposition line into the statistics list or a backend record."""
+        sample = parse_prometheus_line(raw_line.decode("utf-8", "replace"))
+        if sample is None:
+            return
+        name, labels, value = sample
+        if not name.startswith("dnsdist_"):
+            return
+        metric = name[8:]
+        if metric.startswith("server_"):
+            address = labels.get("address")
+            if not address:
+                return
+            server = servers.setdefault(address, {"address": address, "name": labels.get("server", "")})
+            field = metric[7:]
+            if field == "status":
+                server["state"] = "up" if value else "down"
+            elif field in METRICS_SERVER_FIELDS:
+                server[field] = value
+        elif not labels:
+            statistics.append({"name": metric.replace("_", "-"), "value": value})
 
     def _zero_data(self) -> dict[str, Any]:
         data = make_zero_data()
@@ -249,33 +589,30 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         """Normalize dnsdist JSON stats into HA-friendly keys."""
         normalized: dict[str, Any] = self._zero_data()
 
+        table = STATISTICS_TABLE
+        counters: list[Any] | None = None
+        if self._retain_all_counters:
+            counters = [None] * len(self.counter_names)
+            normalized[ATTR_COUNTERS] = counters
+        known = len(self.counter_names)
+
         try:
             items = stats if isinstance(stats, list) else stats.get("statistics", [])
             for item in items:
-                key = item.get("name")
+                name = item.get("name")
                 val = item.get("value")
 
-                if key == "queries":
-                    normalized[ATTR_QUERIES] = int(val)
-                elif key == "responses":
-                    normalized[ATTR_RESPONSES] = int(val)
-                elif key == "drops":
-                    normalized[ATTR_DROPS] = int(val)
-                elif key in ("rule-drop", "rule_drop"):
-                    normalized[ATTR_RULE_DROP] = int(val)
-                elif key in ("downstream-send-errors", "downstream_errors"):
-                    normalized[ATTR_DOWNSTREAM_ERRORS] = int(val)
-                elif key in ("cache-hits", "cache_hits"):
-                    normalized[ATTR_CACHE_HITS] = int(val)
-                elif key in ("cache-misses", "cache_misses"):
-                    normalized[ATTR_CACHE_MISSES] = int(val)
-                elif key in ("uptime",):
-                    normalized[ATTR_UPTIME] = int(val)
-                elif key in ("cpu-user-msec", "cpu_user_msec"):
-                    normalized["cpu_user_msec"] = int(val)
-                elif key in ("security-status", "security_status"):
-                    sec = int(val)
-                    normalized[ATTR_SECURITY_STATUS] = SECURITY_STATUS_MAP.get(sec, "unknown")
+                field = table.get(name)
+                if field is not None:
+                    key, convert = field
+                    normalized[key] = convert(val)
+
+                if counters is not None and isinstance(name, str) and isinstance(val, (int, float)):
+                    slot = self._counter_index.get(name)
+                    if slot is None:
+                        slot = self._register_counter(name, item.get("type"))
+                        counters.append(None)
+                    counters[slot] = val
 
             # Compute cache hit %
             hits = normalized[ATTR_CACHE_HITS]
@@ -286,8 +623,26 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         except Exception as err:
             _LOGGER.warning("[%s] Failed to normalize data: %s", self._name, err)
 
+        if len(self.counter_names) != known:
+            # New counter names appeared: let the platforms add their sensors
+            self.structure_version += 1
         return normalized
 
+    def _register_counter(self, name: str, kind: Any) -> int:
+        """Assign the next ATTR_COUNTERS slot to a newly seen counter name.
+
+        ``kind`` is kept when it says "counter" or "gauge"; otherwise (the JSON
+        API's "StatisticItem") known dnsdist counters are recognized by name.
+        """
+        slot = len(self.counter_names)
+        self.counter_names.append(name)
+        self._counter_index[name] = slot
+        if kind in ("counter", "gauge"):
+            self.counter_types[name] = kind
+        elif name in DNSDIST_COUNTER_STATS:
+            self.counter_types[name] = "counter"
+        return slot
+
     async def _async_fetch_server_config(
         self, session: aiohttp.ClientSession, headers: dict[str, str]
     ) -> dict[str, Any] | None:
@@ -299,21 +654,21 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         url = f"{self._base_url}/api/v1/servers/localhost"
 
         try:
-            ssl_context = False if not self._verify_ssl else None
-            _LOGGER.debug("[%s] Requesting server config from %s (ssl=%s)", self._name, url, ssl_context)
-            async with timeout(10):
-                async with session.get(url, headers=headers, ssl=ssl_context) as resp:
-                    if resp.status == 404:
-                        if self._server_config_supported is not False:
-                            _LOGGER.debug(
-                                "[%s] Server config endpoint not available (404)",
-                                self._name,
-                            )
-                        self._server_config_supported = False
-                        return None
-                    if resp.status != 200:
-                        raise ConnectionError(f"HTTP {resp.status}")
-                    payload = await resp.json()
+            _LOGGER.debug("[%s] Requesting server config from %s (verify_ssl=%s)", self._name, url, self._verify_ssl)
+            started = perf_counter()
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 404:
+                    if self._server_config_supported is not False:
+                        _LOGGER.debug(
+                            "[%s] Server config endpoint not available (404)",
+                            self._name,
+                        )
+                    self._server_config_supported = False
+                    return None
+                if resp.status != 200:
+                    raise ConnectionError(f"HTTP {resp.status}")
+                payload = await self._async_stream_server_config(resp)
+            self.instrumentation.record("server_config_latency_ms", (perf_counter() - started) * 1000)
         except Exception as err:
             _LOGGER.debug("[%s] Could not retrieve server config: %s", self._name, err)
             return None
@@ -324,6 +679,36 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         self._server_config_supported = True
         return payload if isinstance(payload, dict) else None
 
+    async def _async_stream_server_config(self, resp: aiohttp.ClientResponse) -> dict[str, Any]:
+        """Stream the server config body, keeping only the rules and servers arrays.
+
+        Items are decoded one by one as chunks arrive, so the full document is
+        never buffered. Raises ValueError once the body exceeds the size ceiling.
+        """
+        limit = self._max_config_bytes
+        if resp.content_length is not None and resp.content_length > limit:
+            raise ValueError(f"server config is {resp.content_length} bytes, limit is {limit}")
+
+        extractor = JsonArrayExtractor(SERVER_CONFIG_KEYS)
+        decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")("replace")
+        received = 0
+        decode_time = 0.0
+        async for chunk in resp.content.iter_chunked(CONFIG_STREAM_CHUNK_SIZE):
+            received += len(chunk)
+            if received > limit:
+                raise ValueError(f"server config exceeds {limit} bytes")
+            decode_start = perf_counter()
+            extractor.feed(decoder.decode(chunk))
+            decode_time += perf_counter() - decode_start
+        decode_start = perf_counter()
+        extractor.feed(decoder.decode(b"", final=True))
+        payload = extractor.finish()
+        decode_time += perf_counter() - decode_start
+
+        self.instrumentation.record("server_config_bytes", received)
+        self.instrumentation.record("server_config_decode_ms", decode_time * 1000)
+        return payload
+
     def _parse_filtering_rules(self, payload: dict[str, Any]) -> dict[str, dict[str, Any]] | None:
         """Parse filtering rules from the server config response."""
         rules_raw: list[dict[str, Any]] = []
@@ -348,16 +733,8 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
                 if rules_raw:
                     break
 
-        rules: dict[str, dict[str, Any]] = {}
-        for item in rules_raw:
-            if not isinstance(item, dict):
-                continue
-            normalized = self._normalize_filtering_rule(item)
-            if normalized is None:
-                continue
-            slug = normalized.pop("slug")
-            rules[slug] = normalized
-
+        rules, self._rule_cache = self._normalize_records(rules_raw, self._rule_cache, self._normalize_filtering_rule)
+        self.slug_caches["rules"].prune()
         return rules
 
     def _parse_backends(self, payload: dict[str, Any]) -> dict[str, dict[str, Any]] | None:
@@ -366,17 +743,49 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         if not isinstance(servers_raw, list):
             return None
 
-        backends: dict[str, dict[str, Any]] = {}
-        for item in servers_raw:
+        backends, self._backend_cache = self._normalize_records(
+            servers_raw, self._backend_cache, self._normalize_backend
+        )
+        self.slug_caches["backends"].prune()
+        return backends
+
+    @staticmethod
+    def _normalize_records(
+        items: list[Any],
+        cache: dict[Any, tuple[dict[str, Any], str, dict[str, Any]]],
+        normalize: Callable[[dict[str, Any]], dict[str, Any] | None],
+    ) -> tuple[dict[str, dict[str, Any]], dict[Any, tuple[dict[str, Any], str, dict[str, Any]]]]:
+        """Normalize raw records, reusing cached results for unchanged ones.
+
+        Records are cached under their id (see ``RECORD_ID_FIELDS``) with the
+        raw dict they were built from. When a record's raw dict compares equal
+        to the cached one, the already normalized dict is reused instead of
+        being rebuilt. Records without an id are always normalized. Returns the
+        slug mapping and the cache to use on the next poll (records that
+        disappeared are dropped).
+        """
+        result: dict[str, dict[str, Any]] = {}
+        next_cache: dict[Any, tuple[dict[str, Any], str, dict[str, Any]]] = {}
+        for item in items:
             if not isinstance(item, dict):
                 continue
-            normalized = self._normalize_backend(item)
-            if normalized is None:
-                continue
-            slug = normalized.pop("slug")
-            backends[slug] = normalized
-
-        return backends
+            key = None
+            for field in RECORD_ID_FIELDS:
+                value = item.get(field)
+                if isinstance(value, (str, int)) and value != "":
+                    key = value
+                    break
+            cached = cache.get(key) if key is not None else None
+            if cached is None or cached[0] != item:
+                normalized = normalize(item)
+                if normalized is None:
+                    continue
+                slug = normalized.pop("slug")
+                cached = (item, slug, normalized)
+            if key is not None:
+                next_cache[key] = cached
+            result[cached[1]] = cached[2]
+        return result, next_cache
 
     def _normalize_backend(self, item: dict[str, Any]) -> dict[str, Any] | None:
         """Normalize a backend server entry."""
@@ -386,7 +795,7 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
 
         name = str(item.get("name", "")).strip()
         slug_source = name or address
-        slug = slugify_rule(slug_source)
+        slug = self.slug_caches["backends"].slugify(slug_source)
 
         state = str(item.get("state", "")).lower()
 
@@ -419,7 +828,7 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
                 break
 
         slug_source = item.get("uuid") or item.get("id") or name
-        slug = slugify_rule(slug_source)
+        slug = self.slug_caches["rules"].slugify(slug_source)
 
         rule = {
             "slug": slug,
@@ -449,21 +858,20 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         payload: Any | None = None
 
         try:
-            ssl_context = False if not self._verify_ssl else None
             _LOGGER.debug("[%s] Requesting dynamic rules from %s", self._name, url)
-            async with timeout(10):
-                async with session.get(url, headers=headers, ssl=ssl_context) as resp:
-                    if resp.status == 404:
-                        if self._dynamic_rules_supported is not False:
-                            _LOGGER.debug(
-                                "[%s] Dynamic rules endpoint not available (404)",
-                                self._name,
-                            )
-                        self._dynamic_rules_supported = False
-                        return None
-                    if resp.status != 200:
-                        raise ConnectionError(f"HTTP {resp.status}")
-                    payload = await resp.json()
+            started = perf_counter()
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 404:
+                    if self._dynamic_rules_supported is not False:
+                        _LOGGER.debug(
+                            "[%s] Dynamic rules endpoint not available (404)",
+                            self._name,
+                        )
+                    self._dynamic_rules_supported = False
+                    return None
+                if resp.status != 200:
+                    raise ConnectionError(f"HTTP {resp.status}")
+                payload = await self._async_read_json(resp, "dynamic_rules", started)
         except Exception as err:
             _LOGGER.debug("[%s] Could not retrieve dynamic rules: %s", self._name, err)
             return None
@@ -491,6 +899,7 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
                 continue
             slug = normalized.pop("slug")
             rules[slug] = normalized
+        self.slug_caches["dynamic"].prune()
 
         return rules
 
@@ -501,7 +910,7 @@ class DnsdistCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
         if not network:
             return None
 
-        slug = slugify_rule(network)
+        slug = self.slug_caches["dynamic"].slugify(network)
 
         # Extract block count from various possible field names
         blocks = 0
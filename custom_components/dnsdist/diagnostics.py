@@ -35,6 +35,7 @@ from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN, CONF_API_KEY
+from .scheduler import SCHEDULER_KEY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -59,6 +60,12 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
         current_data = coordinator.data or {}
         diagnostics["data"] = current_data
         diagnostics["last_update_success"] = coordinator.last_update_success
+        instrumentation = getattr(coordinator, "instrumentation", None)
+        if instrumentation is not None:
+            diagnostics["instrumentation"] = instrumentation.as_dict()
+        slug_caches = getattr(coordinator, "slug_caches", None)
+        if slug_caches is not None:
+            diagnostics["slug_cache"] = {table: cache.as_dict() for table, cache in slug_caches.items()}
     except Exception as err:
         _LOGGER.warning("Failed to collect diagnostics for %s: %s", entry.title, err)
         diagnostics["error"] = str(err)
@@ -83,7 +90,17 @@ async def async_get_system_diagnostics(hass: HomeAssistant) -> dict[str, Any]:
                 "data": data,
                 "last_update_success": coordinator.last_update_success,
             }
+            instrumentation = getattr(coordinator, "instrumentation", None)
+            if instrumentation is not None:
+                system_info[name]["instrumentation"] = instrumentation.as_dict()
+            slug_caches = getattr(coordinator, "slug_caches", None)
+            if slug_caches is not None:
+                system_info[name]["slug_cache"] = {table: cache.as_dict() for table, cache in slug_caches.items()}
         except Exception as err:
             system_info[entry_id] = {"error": str(err)}
 
+    scheduler = all_entries.get(SCHEDULER_KEY)
+    if scheduler is not None:
+        system_info["scheduler"] = scheduler.as_dict()
+
     return {"dnsdist": system_info}
@@ -29,10 +29,10 @@ from __future__ import annotations
 
 import logging
 import time
-from collections import deque
-from datetime import timedelta
-from typing import Any, Deque, Tuple
+from collections.abc import Callable
+from typing import Any
 
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.core import HomeAssistant, callback
@@ -43,29 +43,36 @@ from .const import (
     ATTR_CACHE_HITRATE,
     ATTR_CACHE_MISSES,
     ATTR_CPU,
-    ATTR_DOWNSTREAM_ERRORS,
-    ATTR_DROPS,
     ATTR_DYNAMIC_RULES,
     ATTR_FILTERING_RULES,
     ATTR_QUERIES,
     ATTR_REQ_PER_DAY,
     ATTR_REQ_PER_HOUR,
-    ATTR_RESPONSES,
-    ATTR_RULE_DROP,
+    ATTR_REQ_PER_MONTH,
+    ATTR_REQ_PER_WEEK,
     ATTR_SECURITY_STATUS,
     ATTR_UPTIME,
     DOMAIN,
+    GROUP_AGGREGATION_DEBOUNCE,
+    RATE_COUNTERS,
     SIGNAL_DNSDIST_RELOAD,
     STORAGE_KEY_HISTORY,
     STORAGE_VERSION,
 )
-from .utils import HistoryMixin, coerce_int, make_zero_data, slugify_rule
+from .registry import async_get_member_registry
+from .utils import DataSnapshot, EwmaRates, HistoryMixin, HistoryRing, MemberPartial, RuleAggregate, make_zero_data
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class DnsdistGroupCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]]):
-    """Aggregate multiple dnsdist server coordinators into one logical group."""
+    """Aggregate multiple dnsdist server coordinators into one logical group.
+
+    Members are hosts or other groups. The group has no timer of its own: it
+    listens to its members' coordinators and re-aggregates, debounced,
+    whenever one of them publishes new data, so updates flow up a hierarchy
+    of groups one level at a time.
+    """
 
     def __init__(
         self,
@@ -81,149 +88,166 @@ class DnsdistGroupCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]
             hass,
             _LOGGER,
             name=f"dnsdist_group_{name}",
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=None,
+            request_refresh_debouncer=Debouncer(
+                hass,
+                _LOGGER,
+                cooldown=GROUP_AGGREGATION_DEBOUNCE,
+                immediate=False,
+            ),
         )
         self._name = name
         self._entry_id = entry_id
         self._members = members or []
         self._last_data: dict[str, Any] = self._zero_data()
-        # Capped at 24 hours worth of samples to bound memory usage.
-        self._history: Deque[Tuple[float, int]] = deque(maxlen=(86400 // update_interval) + 1)
+        # Capped at 24 hours worth of samples to bound memory usage. Member
+        # updates arrive more often than that, so keep one per interval.
+        self._history = HistoryRing((86400 // update_interval) + 1, width=len(self._HISTORY_COLUMNS))
+        self._history_spacing = update_interval
+        self._init_history_tiers()
         self._history_store = Store(
             hass,
             STORAGE_VERSION,
             f"{DOMAIN}_{entry_id}_{STORAGE_KEY_HISTORY}",
         )
+        self._init_history_journal()
         self._history_loaded = False
         self._history_dirty = False
         self._last_history_persist: float | None = None
+        self._ewma = EwmaRates()
+        # Group counter series fed to the history, and each member's series it
+        # was last advanced from
+        self._group_traffic: list[int] | None = None
+        self._member_traffic: dict[str, tuple[int, ...]] = {}
+        # Running rule sums, updated by each member's delta
+        self._rules = RuleAggregate("name", "matches", ("id", "uuid", "action", "rule", "type", "enabled", "bypass"))
+        self._dynamic = RuleAggregate("network", "blocks", ("reason", "action", "seconds", "ebpf", "warning"))
+        # Hosts behind the CPU average, for parent groups to weight it by
+        self.cpu_weight = 0
+        # Member coordinators resolved from the member registry, None when stale
+        self._resolved_members: list[Any] | None = None
+        # Listener removal callbacks of the subscribed member coordinators
+        self._member_unsubs: dict[int, Callable[[], None]] = {}
+        # Last aggregated data, so entities come up populated after a restart
+        self._snapshot = DataSnapshot(hass, entry_id)
         self._unsub_dispatcher = async_dispatcher_connect(hass, SIGNAL_DNSDIST_RELOAD, self._handle_reload_signal)
         _LOGGER.info("Initialized dnsdist group '%s' with members: %s", name, ", ".join(self._members))
 
+    async def async_restore_snapshot(self) -> bool:
+        """Seed ``data`` from the last snapshot; return True if there was one."""
+        payload = await self._snapshot.async_load()
+        if payload is None:
+            return False
+        self.data = self._last_data = payload["data"]
+        cpu_weight = payload.get("cpu_weight")
+        self.cpu_weight = cpu_weight if isinstance(cpu_weight, int) else 0
+        _LOGGER.debug("[%s] Restored data snapshot", self._name)
+        return True
+
+    def _snapshot_payload(self) -> dict[str, Any]:
+        return {"data": self._last_data, "cpu_weight": self.cpu_weight}
+
     @callback
     def _handle_reload_signal(self) -> None:
         """React to host addition/removal and trigger immediate refresh."""
         _LOGGER.debug("[%s] Received reload signal — forcing refresh", self._name)
+        self._resolved_members = None
+        self._async_sync_member_listeners()
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _handle_member_update(self) -> None:
+        """Schedule a debounced re-aggregation after a member refresh."""
         self.hass.async_create_task(self.async_request_refresh())
 
+    def _member_coordinators(self) -> list[Any]:
+        """Return the loaded coordinators of this group's members."""
+        if self._resolved_members is None:
+            registry = async_get_member_registry(self.hass)
+            self._resolved_members = [c for name in self._members if (c := registry.get(name)) is not None]
+        return self._resolved_members
+
+    @callback
+    def _async_sync_member_listeners(self) -> None:
+        """Subscribe to newly loaded members and drop unloaded ones."""
+        members = {id(c): c for c in self._member_coordinators()}
+        for key in set(self._member_unsubs) - set(members):
+            self._member_unsubs.pop(key)()
+        for key, member in members.items():
+            if key not in self._member_unsubs:
+                self._member_unsubs[key] = member.async_add_listener(self._handle_member_update)
+
+    @callback
+    def async_unsubscribe_members(self) -> None:
+        """Stop listening to the member coordinators."""
+        for unsub in self._member_unsubs.values():
+            unsub()
+        self._member_unsubs.clear()
+
+    def _update_rule_aggregates(self, partials: dict[str, MemberPartial]) -> None:
+        """Apply only the rule tables that changed since the last aggregation."""
+        for aggregate, key, field in (
+            (self._rules, ATTR_FILTERING_RULES, "rules"),
+            (self._dynamic, ATTR_DYNAMIC_RULES, "dynamic"),
+        ):
+            for name in aggregate.members() - partials.keys():
+                aggregate.discard(name)
+            changed = [name for name, p in partials.items() if aggregate.update(name, getattr(p, field))]
+            if changed:
+                _LOGGER.debug("[%s] Re-applied %s from %s", self._name, key, ", ".join(changed))
+
+    def _advance_traffic(self, partials: dict[str, MemberPartial]) -> list[int]:
+        """Advance the group's counter series by what each member counted since the last aggregation.
+
+        Members follow their own stored series, which already bridge host
+        restarts and nested membership changes. A member joining the active set
+        only contributes from its next update on and one leaving just stops
+        contributing, so neither shows up as requests.
+        """
+        current = {name: p.traffic for name, p in partials.items()}
+        width = self._history.width
+        if self._group_traffic is None:
+            # Continue the persisted series, else start it at the current sum
+            base = self._last_raw or (tuple(self._history[-1][1:]) if self._history else None)
+            self._group_traffic = (
+                list(base) if base else [sum(values[i] for values in current.values()) for i in range(width)]
+            )
+        else:
+            for name, values in current.items():
+                last = self._member_traffic.get(name)
+                if last is None:
+                    continue
+                for i in range(width):
+                    self._group_traffic[i] += max(0, values[i] - last[i])
+        self._member_traffic = current
+        return self._group_traffic
+
     async def _async_update_data(self) -> dict[str, Any]:
         """Aggregate metrics from active member coordinators."""
         await self._async_ensure_history_loaded()
+        self._async_sync_member_listeners()
         try:
-            all_coords = self.hass.data.get(DOMAIN, {})
-            if not all_coords:
-                return self._last_data
-
-            active_members = []
-
-            for _, c in all_coords.items():
-                if not hasattr(c, "_name"):
-                    continue
-                if c._name in self._members and c.last_update_success and c.data:
-                    active_members.append(c)
+            active_members = [c for c in self._member_coordinators() if c.last_update_success and c.data]
 
             if not active_members:
                 _LOGGER.debug("[%s] No active members yet", self._name)
                 return self._last_data
 
-            totals = {
-                ATTR_QUERIES: 0,
-                ATTR_RESPONSES: 0,
-                ATTR_DROPS: 0,
-                ATTR_RULE_DROP: 0,
-                ATTR_DOWNSTREAM_ERRORS: 0,
-                ATTR_CACHE_HITS: 0,
-                ATTR_CACHE_MISSES: 0,
-            }
-            cpu_values: list[float] = []
-            uptime_values: list[int] = []
-            sec_values: list[str] = []
-            aggregated_rules: dict[str, dict[str, Any]] = {}
-            aggregated_dynamic: dict[str, dict[str, Any]] = {}
-
-            for c in active_members:
-                d = c.data or {}
-                for k in totals:
-                    totals[k] += int(d.get(k, 0) or 0)
-
-                cpu_val = d.get(ATTR_CPU)
-                try:
-                    if cpu_val is not None:
-                        cpu_values.append(float(cpu_val))
-                except (ValueError, TypeError):
-                    _LOGGER.debug("[%s] Skipping invalid CPU value from %s: %s", self._name, c._name, cpu_val)
-
-                uptime = d.get(ATTR_UPTIME)
-                if isinstance(uptime, (int, float)):
-                    uptime_values.append(int(uptime))
-
-                sec = str(d.get(ATTR_SECURITY_STATUS, "unknown")).lower()
-                sec_values.append(sec)
-
-                rules = d.get(ATTR_FILTERING_RULES)
-                if isinstance(rules, dict):
-                    source_name = getattr(c, "_name", "dnsdist")
-                    for rule in rules.values():
-                        if not isinstance(rule, dict):
-                            continue
-
-                        base_name = str(rule.get("name") or "Unnamed Rule").strip()
-                        if not base_name:
-                            base_name = "Unnamed Rule"
-
-                        agg_slug = slugify_rule(base_name)
-                        matches = coerce_int(rule.get("matches"))
-
-                        entry = aggregated_rules.setdefault(
-                            agg_slug,
-                            {
-                                "name": base_name,
-                                "matches": 0,
-                                "sources": {},
-                            },
-                        )
-
-                        entry["matches"] += matches
-                        entry_sources = entry.setdefault("sources", {})
-                        entry_sources[source_name] = entry_sources.get(source_name, 0) + matches
-
-                        for key in ("id", "uuid", "action", "rule", "type", "enabled", "bypass"):
-                            if key in rule and key not in entry and rule[key] is not None:
-                                entry[key] = rule[key]
-
-                # Aggregate dynamic rules (dynblocks)
-                dynamic_rules = d.get(ATTR_DYNAMIC_RULES)
-                if isinstance(dynamic_rules, dict):
-                    source_name = getattr(c, "_name", "dnsdist")
-                    for rule in dynamic_rules.values():
-                        if not isinstance(rule, dict):
-                            continue
-
-                        network = str(rule.get("network") or "Unknown").strip()
-                        if not network:
-                            network = "Unknown"
-
-                        agg_slug = slugify_rule(network)
-                        blocks = coerce_int(rule.get("blocks"))
-
-                        entry = aggregated_dynamic.setdefault(
-                            agg_slug,
-                            {
-                                "network": network,
-                                "blocks": 0,
-                                "sources": {},
-                            },
-                        )
-
-                        entry["blocks"] += blocks
-                        entry_sources = entry.setdefault("sources", {})
-                        entry_sources[source_name] = entry_sources.get(source_name, 0) + blocks
-
-                        for key in ("reason", "action", "seconds", "ebpf", "warning"):
-                            if key in rule and key not in entry and rule[key] is not None:
-                                entry[key] = rule[key]
-
-            avg_cpu = round(sum(cpu_values) / len(cpu_values), 2) if cpu_values else 0.0
+            registry = async_get_member_registry(self.hass)
+            partials = {c._name: registry.partial(c) for c in active_members}
+
+            totals = {key: sum(p.totals[key] for p in partials.values()) for key in (ATTR_QUERIES, *RATE_COUNTERS)}
+            cpu_members = [(p.cpu, p.cpu_weight) for p in partials.values() if p.cpu is not None]
+            cpu_weight = sum(weight for _, weight in cpu_members)
+            uptime_values = [p.uptime for p in partials.values() if p.uptime is not None]
+            sec_values = [p.security for p in partials.values()]
+
+            self._update_rule_aggregates(partials)
+            aggregated_rules = self._rules.as_dict()
+            aggregated_dynamic = self._dynamic.as_dict()
+
+            # Weighted by host count, so nested groups average over their hosts
+            avg_cpu = round(sum(cpu * weight for cpu, weight in cpu_members) / cpu_weight, 2) if cpu_weight else 0.0
             max_uptime = max(uptime_values) if uptime_values else 0
 
             priority = {"critical": 3, "warning": 2, "ok": 1, "secure": 1, "unknown": 0}
@@ -255,17 +279,24 @@ class DnsdistGroupCoordinator(HistoryMixin, DataUpdateCoordinator[dict[str, Any]
             # --- Rolling-window request totals for the group ---
             try:
                 now_ts = time.time()
-                q_total = int(aggregated[ATTR_QUERIES])
-                self._update_history(now_ts, q_total)
+                q_total, *counters = self._advance_traffic(partials)
+                q_total, *counters = self._update_history(now_ts, q_total, counters)
                 req_hour, req_day = self._compute_rates(now_ts, q_total)
                 aggregated[ATTR_REQ_PER_HOUR] = req_hour
                 aggregated[ATTR_REQ_PER_DAY] = req_day
+                req_week, req_month = self._compute_long_rates(now_ts, q_total)
+                aggregated[ATTR_REQ_PER_WEEK] = req_week
+                aggregated[ATTR_REQ_PER_MONTH] = req_month
+                aggregated.update(self._compute_counter_rates(now_ts, counters))
+                aggregated.update(self._ewma.update(time.monotonic(), aggregated))
             except Exception as err:
                 _LOGGER.debug("[%s] Group rate computation failed: %s", self._name, err)
 
             await self._async_save_history()
 
             self._last_data = aggregated
+            self.cpu_weight = cpu_weight
+            self._snapshot.async_schedule_save(self._snapshot_payload)
             _LOGGER.debug("[%s] Aggregated stats: %s", self._name, aggregated)
             return aggregated
 
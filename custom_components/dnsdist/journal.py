@@ -0,0 +1,193 @@
+# Copyright (c) 2025, Renaud Allard <renaud@allard.it>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Append-only binary journal for the rate history."""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import zlib
+from collections.abc import Iterable, Sequence
+
+_LOGGER = logging.getLogger(__name__)
+
+JOURNAL_MAGIC = b"DDHJ"
+# 1: snapshot blobs are HistoryRing.to_bytes() output
+# 2: snapshot blobs are HistoryRing.to_varint_bytes() output
+# 3: as 2, records and snapshot also carry the counter-reset state
+JOURNAL_VERSION = 3
+JOURNAL_VERSIONS = (1, 2, 3)
+
+# Appended records may grow to this size before a compaction even when the
+# snapshot is smaller
+JOURNAL_COMPACT_MIN_BYTES = 64 * 1024
+
+# magic, version, sample width, snapshot length, snapshot CRC32
+_HEADER = struct.Struct("<4sBBII")
+
+
+class HistoryJournal:
+    """Snapshot of the history rings followed by appended raw samples.
+
+    The file starts with a header and a snapshot (opaque blobs, each
+    prefixed by its length; the header version tells how they are encoded).
+    Every poll then appends one fixed-size ``(timestamp, value, ...)``
+    record with its own CRC32, so a save only writes the new samples. ``compact()`` rewrites the file as a
+    fresh snapshot through a temporary file and an atomic rename; a record
+    torn by a crash is detected on load and cut off.
+
+    A file written by an older version or with another record width is
+    still loaded (``snapshot_version`` and ``loaded_width`` describe it),
+    but must be compacted before anything is appended to it.
+
+    All methods do blocking file I/O and must run in the executor.
+    """
+
+    def __init__(self, path: str, width: int) -> None:
+        self.path = path
+        self.width = width
+        self._record = struct.Struct(f"<d{width}q")
+        self._record_size = self._record.size + 4
+        # Records appended since the last snapshot, None until the file is known valid
+        self.records: int | None = None
+        self.snapshot_version = JOURNAL_VERSION
+        self.snapshot_size = 0
+        self.loaded_width = width
+
+    def needs_compaction(self, pending: int, limit: int) -> bool:
+        """Tell whether appending ``pending`` records should rewrite the snapshot instead.
+
+        Compacts once more than ``limit`` records are appended, or once they
+        take more room than the snapshot itself.
+        """
+        if self.records is None:
+            return True
+        records = self.records + pending
+        return records > limit or records * self._record_size > max(self.snapshot_size, JOURNAL_COMPACT_MIN_BYTES)
+
+    def load(self) -> tuple[list[bytes], list[tuple]] | None:
+        """Return the snapshot blobs and the appended samples, or None."""
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+
+        blobs = self._parse_snapshot(data)
+        if blobs is None:
+            _LOGGER.debug("Ignoring invalid history journal %s", self.path)
+            return None
+
+        record = struct.Struct(f"<d{self.loaded_width}q")
+        record_size = record.size + 4
+        offset = _HEADER.size + sum(4 + len(blob) for blob in blobs)
+        samples: list[tuple] = []
+        end = len(data) - record_size + 1
+        while offset < end:
+            body = data[offset : offset + record.size]
+            (crc,) = struct.unpack_from("<I", data, offset + record.size)
+            if zlib.crc32(body) != crc:
+                break
+            samples.append(record.unpack(body))
+            offset += record_size
+
+        if offset != len(data):
+            # Torn or corrupt tail: drop it so later appends stay aligned
+            _LOGGER.debug("Truncating history journal %s at %d bytes", self.path, offset)
+            os.truncate(self.path, offset)
+
+        current = self.snapshot_version == JOURNAL_VERSION and self.loaded_width == self.width
+        self.records = len(samples) if current else None
+        return blobs, samples
+
+    def _parse_snapshot(self, data: bytes) -> list[bytes] | None:
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, width, length, crc = _HEADER.unpack_from(data)
+        if magic != JOURNAL_MAGIC or version not in JOURNAL_VERSIONS or not width:
+            return None
+        snapshot = data[_HEADER.size : _HEADER.size + length]
+        if len(snapshot) != length or zlib.crc32(snapshot) != crc:
+            return None
+        self.snapshot_version = version
+        self.loaded_width = width
+        self.snapshot_size = _HEADER.size + length
+
+        blobs: list[bytes] = []
+        offset = 0
+        while offset < length:
+            if offset + 4 > length:
+                return None
+            (size,) = struct.unpack_from("<I", snapshot, offset)
+            offset += 4
+            if offset + size > length:
+                return None
+            blobs.append(snapshot[offset : offset + size])
+            offset += size
+        return blobs
+
+    def append(self, samples: Iterable[Sequence[float]]) -> None:
+        """Append raw samples to a journal that has a valid snapshot."""
+        if self.records is None:
+            raise RuntimeError("journal has no snapshot")
+        buffer = bytearray()
+        count = 0
+        for sample in samples:
+            body = self._record.pack(*sample)
+            buffer += body
+            buffer += struct.pack("<I", zlib.crc32(body))
+            count += 1
+        if not buffer:
+            return
+        try:
+            with open(self.path, "ab") as file:
+                file.write(buffer)
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError:
+            # A partial write leaves the tail misaligned; recompact next time
+            self.records = None
+            raise
+        self.records += count
+
+    def compact(self, blobs: Sequence[bytes]) -> None:
+        """Atomically replace the journal with a snapshot of ``blobs``."""
+        snapshot = b"".join(struct.pack("<I", len(blob)) + blob for blob in blobs)
+        header = _HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, self.width, len(snapshot), zlib.crc32(snapshot))
+        tmp_path = f"{self.path}.tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            file.write(header)
+            file.write(snapshot)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        self.records = 0
+        self.snapshot_version = JOURNAL_VERSION
+        self.loaded_width = self.width
+        self.snapshot_size = len(header) + len(snapshot)
@@ -40,11 +40,21 @@ from .const import (
     DOMAIN,
     CONF_NAME,
     CONF_UPDATE_INTERVAL,
+    CONF_CONFIG_INTERVAL,
+    CONF_DYNBLOCK_INTERVAL,
+    CONF_USE_PROMETHEUS,
+    CONF_MAX_CONFIG_SIZE,
+    CONF_RETAIN_ALL_COUNTERS,
+    CONF_POLL_INSTRUMENTATION,
     CONF_IS_GROUP,
     CONF_MEMBERS,
     CONF_INCLUDE_FILTER_SENSORS,
     CONF_REMOVE_DISABLED_FILTER_SENSORS,
+    DEFAULT_CONFIG_INTERVAL,
+    DEFAULT_DYNBLOCK_INTERVAL,
+    DEFAULT_MAX_CONFIG_SIZE,
 )
+from .utils import group_dependency_order, group_leaf_hosts, group_members_by_name
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -59,12 +69,20 @@ class DnsdistOptionsFlowHandler(config_entries.OptionsFlow):
         is_group = bool(data.get(CONF_IS_GROUP))
         name = data.get(CONF_NAME, self.config_entry.title)
         update_interval = int(data.get(CONF_UPDATE_INTERVAL, 30))
+        config_interval = int(data.get(CONF_CONFIG_INTERVAL, DEFAULT_CONFIG_INTERVAL))
+        dynblock_interval = int(data.get(CONF_DYNBLOCK_INTERVAL, DEFAULT_DYNBLOCK_INTERVAL))
+        use_prometheus = bool(data.get(CONF_USE_PROMETHEUS, False))
+        max_config_size = int(data.get(CONF_MAX_CONFIG_SIZE, DEFAULT_MAX_CONFIG_SIZE))
+        retain_all_counters = bool(data.get(CONF_RETAIN_ALL_COUNTERS, False))
+        poll_instrumentation = bool(data.get(CONF_POLL_INSTRUMENTATION, False))
         members = list(data.get(CONF_MEMBERS, []))
         include_filter_sensors = bool(data.get(CONF_INCLUDE_FILTER_SENSORS, bool(is_group)))
 
-        # Build available hosts from other host entries
-        entries = [e for e in self.hass.config_entries.async_entries(DOMAIN) if not e.data.get(CONF_IS_GROUP)]
-        available_hosts = sorted({e.data.get(CONF_NAME, e.title) for e in entries})
+        # Build available hosts from other host entries, plus the other groups
+        all_entries = self.hass.config_entries.async_entries(DOMAIN)
+        entries = [e for e in all_entries if not e.data.get(CONF_IS_GROUP)]
+        groups = group_members_by_name(e for e in all_entries if e.entry_id != self.config_entry.entry_id)
+        available_hosts = sorted({e.data.get(CONF_NAME, e.title) for e in entries} | groups.keys())
 
         errors: dict[str, str] = {}
 
@@ -74,6 +92,16 @@ class DnsdistOptionsFlowHandler(config_entries.OptionsFlow):
             new_interval = user_input.get(CONF_UPDATE_INTERVAL, update_interval)
             new_data[CONF_UPDATE_INTERVAL] = int(new_interval)
 
+            if not is_group:
+                new_data[CONF_CONFIG_INTERVAL] = int(user_input.get(CONF_CONFIG_INTERVAL, config_interval))
+                new_data[CONF_DYNBLOCK_INTERVAL] = int(user_input.get(CONF_DYNBLOCK_INTERVAL, dynblock_interval))
+                new_data[CONF_USE_PROMETHEUS] = bool(user_input.get(CONF_USE_PROMETHEUS, use_prometheus))
+                new_data[CONF_MAX_CONFIG_SIZE] = int(user_input.get(CONF_MAX_CONFIG_SIZE, max_config_size))
+                new_data[CONF_RETAIN_ALL_COUNTERS] = bool(user_input.get(CONF_RETAIN_ALL_COUNTERS, retain_all_counters))
+                new_data[CONF_POLL_INSTRUMENTATION] = bool(
+                    user_input.get(CONF_POLL_INSTRUMENTATION, poll_instrumentation)
+                )
+
             new_include_filters = bool(user_input.get(CONF_INCLUDE_FILTER_SENSORS, include_filter_sensors))
             new_data[CONF_INCLUDE_FILTER_SENSORS] = new_include_filters
 
@@ -96,10 +124,24 @@ class DnsdistOptionsFlowHandler(config_entries.OptionsFlow):
             # Update group-specific members
             if is_group:
                 new_members = user_input.get(CONF_MEMBERS, members)
+                group_name = new_data.get(CONF_NAME, name)
                 if not new_members:
                     errors["base"] = "no_members"
                 else:
-                    new_data[CONF_MEMBERS] = list(new_members)
+                    updated = {**groups, group_name: list(new_members)}
+                    try:
+                        group_dependency_order(updated, [group_name])
+                    except ValueError:
+                        errors["base"] = "group_cycle"
+                    else:
+                        # Groups above this one would count a shared host twice too
+                        try:
+                            for group in updated:
+                                group_leaf_hosts(updated, group)
+                        except ValueError:
+                            errors["base"] = "group_overlap"
+                        else:
+                            new_data[CONF_MEMBERS] = list(new_members)
 
             if not errors:
                 self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
@@ -132,6 +174,18 @@ class DnsdistOptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Optional(CONF_UPDATE_INTERVAL, default=update_interval): vol.All(
                         int, vol.Range(min=10, max=600)
                     ),
+                    vol.Optional(CONF_CONFIG_INTERVAL, default=config_interval): vol.All(
+                        int, vol.Range(min=10, max=3600)
+                    ),
+                    vol.Optional(CONF_DYNBLOCK_INTERVAL, default=dynblock_interval): vol.All(
+                        int, vol.Range(min=10, max=3600)
+                    ),
+                    vol.Optional(CONF_USE_PROMETHEUS, default=use_prometheus): bool,
+                    vol.Optional(CONF_MAX_CONFIG_SIZE, default=max_config_size): vol.All(
+                        int, vol.Range(min=1, max=256)
+                    ),
+                    vol.Optional(CONF_RETAIN_ALL_COUNTERS, default=retain_all_counters): bool,
+                    vol.Optional(CONF_POLL_INSTRUMENTATION, default=poll_instrumentation): bool,
                     vol.Optional(CONF_INCLUDE_FILTER_SENSORS, default=include_filter_sensors): bool,
                     vol.Optional(
                         CONF_REMOVE_DISABLED_FILTER_SENSORS,
@@ -0,0 +1,99 @@
+# Copyright (c) 2025, Renaud Allard <renaud@allard.it>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Name-keyed index of the loaded dnsdist host and group coordinators."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import DOMAIN
+from .utils import MemberPartial
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key of the shared member registry in hass.data[DOMAIN]
+REGISTRY_KEY = "_members"
+
+
+class DnsdistMemberRegistry:
+    """Map host and group display names to their coordinators.
+
+    Maintained as entries load and unload, so group coordinators can resolve
+    their members, hosts or other groups, by name instead of scanning
+    ``hass.data[DOMAIN]``. It also caches each member's ``MemberPartial``, so
+    groups sharing a member normalize its data once per update between them.
+    """
+
+    def __init__(self) -> None:
+        self._members: dict[str, DataUpdateCoordinator[dict[str, Any]]] = {}
+        self._partials: dict[str, MemberPartial] = {}
+
+    @callback
+    def async_add(self, coordinator: DataUpdateCoordinator[dict[str, Any]]) -> None:
+        """Index ``coordinator`` under its display name."""
+        if self._members.get(coordinator._name) is not coordinator:
+            self._partials.pop(coordinator._name, None)
+        self._members[coordinator._name] = coordinator
+        _LOGGER.debug("[%s] Added to the member registry", coordinator._name)
+
+    @callback
+    def async_remove(self, coordinator: DataUpdateCoordinator[dict[str, Any]]) -> None:
+        """Drop ``coordinator`` unless its name was taken over by another entry."""
+        name = coordinator._name
+        if self._members.get(name) is coordinator:
+            del self._members[name]
+            self._partials.pop(name, None)
+            _LOGGER.debug("[%s] Removed from the member registry", name)
+
+    def get(self, name: str) -> DataUpdateCoordinator[dict[str, Any]] | None:
+        """Return the coordinator of host or group ``name``, if it is loaded."""
+        return self._members.get(name)
+
+    def partial(self, coordinator: DataUpdateCoordinator[dict[str, Any]]) -> MemberPartial:
+        """Return the normalized form of ``coordinator``'s current data."""
+        name = coordinator._name
+        cached = self._partials.get(name)
+        if cached is None or cached.data is not coordinator.data:
+            cached = self._partials[name] = MemberPartial(
+                name, coordinator.data or {}, cached, coordinator.cpu_weight, coordinator.traffic_counters
+            )
+        return cached
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+
+def async_get_member_registry(hass: HomeAssistant) -> DnsdistMemberRegistry:
+    """Return the integration's shared member registry, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    registry = domain_data.get(REGISTRY_KEY)
+    if registry is None:
+        registry = domain_data[REGISTRY_KEY] = DnsdistMemberRegistry()
+    return registry
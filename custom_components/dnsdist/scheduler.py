@@ -0,0 +1,191 @@
+# Copyright (c) 2025, Renaud Allard <renaud@allard.it>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Fleet-wide poll scheduler for dnsdist host coordinators."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, MAX_CONCURRENT_POLLS
+from .coordinator import DnsdistCoordinator
+from .utils import PollInstrumentation
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key of the shared scheduler in hass.data[DOMAIN]
+SCHEDULER_KEY = "_scheduler"
+
+
+class _ScheduledHost:
+    """Scheduling state of one host coordinator."""
+
+    def __init__(self, coordinator: DnsdistCoordinator, interval: float) -> None:
+        self.coordinator = coordinator
+        self.interval = interval
+        self.phase = 0.0
+        self.due: float | None = None
+        self.handle: asyncio.TimerHandle | None = None
+        self.task: asyncio.Task[None] | None = None
+
+
+class DnsdistPollScheduler:
+    """Drive every host poll from one scheduler instead of per-coordinator timers.
+
+    Hosts sharing an update interval are given evenly spaced phase offsets
+    within it (ordered by entry id, so phases are deterministic for a given
+    set of hosts). Polls run under a semaphore capping how many are in flight
+    at once, and the delay between a poll's slot and its actual start is
+    recorded as ``schedule_lag_ms`` in the host's instrumentation.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_POLLS) -> None:
+        self._hass = hass
+        self._loop = hass.loop
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._hosts: dict[str, _ScheduledHost] = {}
+        self.in_flight = 0
+        self.skipped = 0
+        # Fleet-wide lag, across all hosts
+        self.instrumentation = PollInstrumentation()
+
+    @callback
+    def async_add(self, entry_id: str, coordinator: DnsdistCoordinator, poll_now: bool = False) -> Callable[[], None]:
+        """Take over polling of ``coordinator``; returns a callable that releases it.
+
+        With ``poll_now`` a first poll starts right away, through the same
+        semaphore and in-flight tracking as scheduled ones, so a slot falling
+        due while it runs is skipped rather than stacked.
+        """
+        interval = float(coordinator._update_interval_s)
+        # Stop the coordinator's own timer; manual refreshes keep working
+        coordinator.update_interval = None
+        host = self._hosts[entry_id] = _ScheduledHost(coordinator=coordinator, interval=interval)
+        self._rephase(interval)
+        if poll_now:
+            self._start(host, None)
+
+        @callback
+        def _remove() -> None:
+            self._release(entry_id)
+
+        return _remove
+
+    async def async_remove(self, entry_id: str) -> None:
+        """Release ``entry_id`` and cancel its poll if one is running or queued."""
+        host = self._release(entry_id)
+        if host is None or host.task is None or host.task.done():
+            return
+        host.task.cancel()
+        await asyncio.gather(host.task, return_exceptions=True)
+
+    def _release(self, entry_id: str) -> _ScheduledHost | None:
+        """Stop scheduling ``entry_id``; return its state if it was scheduled."""
+        host = self._hosts.pop(entry_id, None)
+        if host is None:
+            return None
+        if host.handle is not None:
+            host.handle.cancel()
+        self._rephase(host.interval)
+        return host
+
+    def _rephase(self, interval: float) -> None:
+        """Spread the hosts sharing ``interval`` evenly across it and reschedule them."""
+        group = sorted(entry_id for entry_id, host in self._hosts.items() if host.interval == interval)
+        now = self._loop.time()
+        for index, entry_id in enumerate(group):
+            host = self._hosts[entry_id]
+            host.phase = interval * index / len(group)
+            if host.handle is not None:
+                host.handle.cancel()
+            self._schedule(entry_id, host, now)
+
+    def _schedule(self, entry_id: str, host: _ScheduledHost, now: float) -> None:
+        host.due = next_slot(now, host.interval, host.phase)
+        host.handle = self._loop.call_at(host.due, self._fire, entry_id)
+
+    @callback
+    def _fire(self, entry_id: str) -> None:
+        host = self._hosts.get(entry_id)
+        if host is None:
+            return
+        due = host.due
+        self._schedule(entry_id, host, max(self._loop.time(), due or 0.0))
+        if host.task is not None and not host.task.done():
+            # Never stack polls of a slow host; its next slot will try again
+            self.skipped += 1
+            _LOGGER.debug("[%s] Previous poll still running, skipping slot", host.coordinator._name)
+            return
+        self._start(host, due)
+
+    def _start(self, host: _ScheduledHost, due: float | None) -> None:
+        host.task = self._hass.async_create_background_task(
+            self._async_poll(host, due), name=f"{DOMAIN} poll {host.coordinator._name}"
+        )
+
+    async def _async_poll(self, host: _ScheduledHost, due: float | None) -> None:
+        async with self._semaphore:
+            if due is not None:
+                lag_ms = max(0.0, self._loop.time() - due) * 1000
+                host.coordinator.instrumentation.record("schedule_lag_ms", lag_ms)
+                self.instrumentation.record("schedule_lag_ms", lag_ms)
+            self.in_flight += 1
+            try:
+                await host.coordinator.async_refresh()
+            finally:
+                self.in_flight -= 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the schedule and lag summary for diagnostics."""
+        return {
+            "in_flight": self.in_flight,
+            "skipped_slots": self.skipped,
+            "lag": self.instrumentation.as_dict(),
+            "hosts": {
+                host.coordinator._name: {"interval": host.interval, "phase": round(host.phase, 3)}
+                for host in self._hosts.values()
+            },
+        }
+
+
+def next_slot(now: float, interval: float, phase: float) -> float:
+    """Return the first time after ``now`` congruent to ``phase`` modulo ``interval``."""
+    return (math.floor((now - phase) / interval) + 1) * interval + phase
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> DnsdistPollScheduler:
+    """Return the integration's shared scheduler, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    scheduler = domain_data.get(SCHEDULER_KEY)
+    if scheduler is None:
+        scheduler = domain_data[SCHEDULER_KEY] = DnsdistPollScheduler(hass)
+    return scheduler
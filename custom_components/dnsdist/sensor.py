@@ -28,6 +28,7 @@
 from __future__ import annotations
 
 import logging
+from time import monotonic
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -37,10 +38,11 @@ from homeassistant.components.sensor import (
 )
 import homeassistant.const as ha_const
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTime, PERCENTAGE
+from homeassistant.const import UnitOfInformation, UnitOfTime, PERCENTAGE
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers import entity_registry as er
 
@@ -49,6 +51,7 @@ from .const import (
     ATTR_CACHE_HITS,
     ATTR_CACHE_HITRATE,
     ATTR_CACHE_MISSES,
+    ATTR_COUNTERS,
     ATTR_CPU,
     ATTR_DOWNSTREAM_ERRORS,
     ATTR_DROPS,
@@ -57,23 +60,54 @@ from .const import (
     ATTR_QUERIES,
     ATTR_REQ_PER_DAY,
     ATTR_REQ_PER_HOUR,
+    ATTR_REQ_PER_MONTH,
+    ATTR_REQ_PER_WEEK,
     ATTR_RESPONSES,
     ATTR_RULE_DROP,
     ATTR_SECURITY_STATUS,
     ATTR_UPTIME,
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
     CONF_INCLUDE_FILTER_SENSORS,
     CONF_IS_GROUP,
+    CONF_POLL_INSTRUMENTATION,
+    CONF_RETAIN_ALL_COUNTERS,
     DOMAIN,
+    EWMA_COUNTERS,
+    EWMA_HORIZONS,
+    RATE_COUNTERS,
+    RATE_SUFFIX_HOUR,
+    RATE_SUFFIX_MINUTE,
     SECURITY_STATUS_CODE,
     SECURITY_STATUS_LABEL,
 )
-from .utils import build_device_info
+from .coordinator import STATISTICS_TABLE
+from .utils import StructureTracker, build_device_info
 
 # COUNT constant for sensor units - use HA's COUNT if available, otherwise fallback
 COUNT = getattr(ha_const, "COUNT", "count")
 
 _LOGGER = logging.getLogger(__name__)
 
+# Poll instrumentation series -> label; the unit follows from the suffix. The
+# statistics endpoint is reported as "metrics" in Prometheus mode.
+INSTRUMENTATION_SERIES: dict[str, str] = {
+    "{stats}_latency_ms": "Counters Request Latency",
+    "{stats}_bytes": "Counters Response Size",
+    "{stats}_decode_ms": "Counters Decode Time",
+    "server_config_latency_ms": "Server Config Request Latency",
+    "server_config_bytes": "Server Config Response Size",
+    "server_config_decode_ms": "Server Config Decode Time",
+    "server_config_parse_ms": "Server Config Parse Time",
+    "dynamic_rules_latency_ms": "Dynamic Rules Request Latency",
+    "dynamic_rules_bytes": "Dynamic Rules Response Size",
+    "dynamic_rules_decode_ms": "Dynamic Rules Decode Time",
+    "normalize_ms": "Counters Normalize Time",
+    "poll_ms": "Poll Duration",
+    "schedule_lag_ms": "Poll Schedule Lag",
+}
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     """Set up dnsdist sensors for a host or group."""
@@ -113,6 +147,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             "mdi:chart-areaspline",
             SensorStateClass.MEASUREMENT,
         ),
+        ATTR_REQ_PER_WEEK: ("Requests per Week (last 7d)", "req/w", "mdi:chart-bar", SensorStateClass.MEASUREMENT),
+        ATTR_REQ_PER_MONTH: (
+            "Requests per Month (last 30d)",
+            "req/mo",
+            "mdi:chart-timeline-variant",
+            SensorStateClass.MEASUREMENT,
+        ),
         ATTR_SECURITY_STATUS: ("Security Status", None, "mdi:shield-check-outline", None),
     }
 
@@ -130,14 +171,69 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             )
         )
 
+    # Per-minute/per-hour rates of the event counters, disabled by default
+    for key in RATE_COUNTERS:
+        label = metric_map[key][0]
+        for suffix, period, unit in (
+            (RATE_SUFFIX_MINUTE, "Minute", "count/min"),
+            (RATE_SUFFIX_HOUR, "Hour", "count/h"),
+        ):
+            sensors.append(
+                DnsdistSensor(
+                    coordinator=coordinator,
+                    entry_id=entry.entry_id,
+                    key=f"{key}{suffix}",
+                    label=f"{label} per {period}",
+                    unit=unit,
+                    icon="mdi:speedometer",
+                    state_class=SensorStateClass.MEASUREMENT,
+                    is_group=is_group,
+                    enabled_default=False,
+                )
+            )
+
+    # Exponentially weighted per-second rates; only queries/s is enabled by default
+    for key in EWMA_COUNTERS:
+        label = "Queries" if key == ATTR_QUERIES else metric_map[key][0]
+        for suffix, horizon in EWMA_HORIZONS:
+            sensors.append(
+                DnsdistSensor(
+                    coordinator=coordinator,
+                    entry_id=entry.entry_id,
+                    key=f"{key}{suffix}",
+                    label=f"{label} per Second ({horizon // 60} min avg)",
+                    unit="req/s" if key == ATTR_QUERIES else "count/s",
+                    icon="mdi:pulse",
+                    state_class=SensorStateClass.MEASUREMENT,
+                    is_group=is_group,
+                    enabled_default=key == ATTR_QUERIES,
+                )
+            )
+
+    if not is_group:
+        sensors.append(DnsdistBreakerSensor(coordinator=coordinator, entry_id=entry.entry_id))
+
+    if not is_group and entry.data.get(CONF_POLL_INSTRUMENTATION):
+        stats_endpoint = "metrics" if getattr(coordinator, "_use_prometheus", False) else "statistics"
+        for pattern, label in INSTRUMENTATION_SERIES.items():
+            sensors.append(
+                DnsdistInstrumentationSensor(
+                    coordinator=coordinator,
+                    entry_id=entry.entry_id,
+                    series=pattern.format(stats=stats_endpoint),
+                    label=label,
+                )
+            )
+
     async_add_entities(sensors)
 
     if coordinator and include_filter_sensors:
         known_rules: set[str] = set()
+        rules_structure = StructureTracker(coordinator)
 
         @callback
         def _async_sync_filtering_rules() -> None:
-            if not coordinator.data:
+            if not coordinator.data or rules_structure.unchanged():
                 return
             rules = coordinator.data.get(ATTR_FILTERING_RULES)
             if not isinstance(rules, dict):
@@ -170,10 +266,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         # Also sync dynamic rules (dynblocks)
         # Track slug -> entity mapping so we can remove expired dynblocks
         dynamic_entities: dict[str, DnsdistDynamicRuleSensor] = {}
+        dynamic_structure = StructureTracker(coordinator)
 
         @callback
         def _async_sync_dynamic_rules() -> None:
-            if not coordinator.data:
+            if not coordinator.data or dynamic_structure.unchanged():
                 return
             rules = coordinator.data.get(ATTR_DYNAMIC_RULES)
             if not isinstance(rules, dict):
@@ -227,10 +324,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     # Backend query sensors (host entries only)
     if not is_group:
         backend_sensor_entities: dict[str, DnsdistBackendSensor] = {}
+        backend_structure = StructureTracker(coordinator)
 
         @callback
         def _async_sync_backend_sensors() -> None:
-            if not coordinator.data:
+            if not coordinator.data or backend_structure.unchanged():
                 return
             backends = coordinator.data.get(ATTR_BACKENDS)
             if not isinstance(backends, dict):
@@ -267,6 +365,39 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         _async_sync_backend_sensors()
         entry.async_on_unload(coordinator.async_add_listener(_async_sync_backend_sensors))
 
+    # Extra counter sensors (host entries retaining every counter). Created
+    # disabled so users opt into the ones they care about from the UI.
+    if not is_group and entry.data.get(CONF_RETAIN_ALL_COUNTERS):
+        known_counters: set[str] = set()
+        counter_structure = StructureTracker(coordinator)
+
+        @callback
+        def _async_sync_counter_sensors() -> None:
+            if not coordinator.data or counter_structure.unchanged():
+                return
+
+            new_entities: list[DnsdistCounterSensor] = []
+            for slot, name in enumerate(coordinator.counter_names):
+                # Counters already exposed by the fixed metric sensors are skipped
+                if name in known_counters or name in STATISTICS_TABLE:
+                    continue
+                known_counters.add(name)
+                new_entities.append(
+                    DnsdistCounterSensor(
+                        coordinator=coordinator,
+                        entry_id=entry.entry_id,
+                        counter=name,
+                        slot=slot,
+                        kind=coordinator.counter_types.get(name),
+                    )
+                )
+
+            if new_entities:
+                async_add_entities(new_entities)
+
+        _async_sync_counter_sensors()
+        entry.async_on_unload(coordinator.async_add_listener(_async_sync_counter_sensors))
+
 
 class DnsdistSensor(CoordinatorEntity, SensorEntity):
     """Representation of a dnsdist metric sensor (host or group)."""
@@ -285,6 +416,7 @@ class DnsdistSensor(CoordinatorEntity, SensorEntity):
         icon: str,
         state_class: SensorStateClass | None,
         is_group: bool,
+        enabled_default: bool = True,
     ) -> None:
         super().__init__(coordinator)
         self._key = key
@@ -296,6 +428,7 @@ class DnsdistSensor(CoordinatorEntity, SensorEntity):
         self._attr_icon = icon
         self._attr_should_poll = False
         self._attr_state_class = state_class
+        self._attr_entity_registry_enabled_default = enabled_default
 
     @property
     def native_value(self):
@@ -305,12 +438,15 @@ class DnsdistSensor(CoordinatorEntity, SensorEntity):
         if self._key == "uptime" and isinstance(val, (int, float)):
             return int(val)
 
-        # Requests/hour and day are integers already (rounded in coordinators), enforce int
-        if self._key in ("req_per_hour", "req_per_day") and isinstance(val, (int, float)):
+        # Request rates are integers already (rounded in coordinators), enforce int
+        if (
+            self._key in ("req_per_hour", "req_per_day", "req_per_week", "req_per_month")
+            or self._key.endswith((RATE_SUFFIX_MINUTE, RATE_SUFFIX_HOUR))
+        ) and isinstance(val, (int, float)):
             return int(val)
 
-        # Percentages rounded to two decimals
-        if self._key in ("cacheHit", "cpu") and isinstance(val, (int, float)):
+        # Percentages and per-second rates rounded to two decimals
+        if (self._key in ("cacheHit", "cpu") or "_per_second_" in self._key) and isinstance(val, (int, float)):
             return round(float(val), 2)
 
         if self._key == "security_status" and isinstance(val, str):
@@ -351,6 +487,112 @@ class DnsdistSensor(CoordinatorEntity, SensorEntity):
         return build_device_info(self.coordinator, self._is_group)
 
 
+class DnsdistBreakerSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor exposing the host's circuit breaker state."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_name = "Connection State"
+    _attr_icon = "mdi:electric-switch"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN]
+
+    def __init__(self, *, coordinator, entry_id: str) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{entry_id}:circuit_breaker"
+
+    @property
+    def available(self) -> bool:
+        # Report the breaker even while the host itself is failing
+        return True
+
+    @property
+    def native_value(self) -> str:
+        return self.coordinator.breaker.state
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        breaker = self.coordinator.breaker
+        attrs: dict[str, Any] = {"consecutive_failures": breaker.consecutive_failures}
+        retry_in = breaker.retry_in(monotonic())
+        if retry_in is not None:
+            attrs["next_probe_in"] = round(retry_in)
+        return attrs
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return build_device_info(self.coordinator, False)
+
+
+class DnsdistInstrumentationSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor reporting the p95 of a poll instrumentation series."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, *, coordinator, entry_id: str, series: str, label: str) -> None:
+        super().__init__(coordinator)
+        self._series = series
+        self._attr_name = label
+        self._attr_unique_id = f"{entry_id}:instrumentation:{series}"
+        if series.endswith("_bytes"):
+            self._attr_native_unit_of_measurement = UnitOfInformation.BYTES
+            self._attr_device_class = SensorDeviceClass.DATA_SIZE
+            self._attr_icon = "mdi:file-download-outline"
+        else:
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_icon = "mdi:timer-sand"
+
+    @property
+    def native_value(self) -> float | None:
+        summary = self.coordinator.instrumentation.summary(self._series)
+        return summary["p95"] if summary else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.coordinator.instrumentation.summary(self._series) or {}
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return build_device_info(self.coordinator, False)
+
+
+class DnsdistCounterSensor(CoordinatorEntity, SensorEntity):
+    """Sensor for a raw dnsdist counter without a dedicated metric sensor."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, *, coordinator, entry_id: str, counter: str, slot: int, kind: str | None) -> None:
+        super().__init__(coordinator)
+        self._counter = counter
+        self._slot = slot
+        self._attr_name = counter
+        self._attr_unique_id = f"{entry_id}:counter:{counter}"
+        self._attr_icon = "mdi:counter"
+        if kind == "counter":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self):
+        data = self.coordinator.data or {}
+        counters = data.get(ATTR_COUNTERS) if isinstance(data, dict) else None
+        if isinstance(counters, list) and self._slot < len(counters):
+            return counters[self._slot]
+        return None
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return build_device_info(self.coordinator, False)
+
+
 class DnsdistFilteringRuleSensor(CoordinatorEntity, SensorEntity):
     """Sensor tracking matches for a dnsdist filtering rule."""
 
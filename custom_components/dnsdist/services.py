@@ -32,9 +32,8 @@ from asyncio import timeout
 from urllib.parse import urlencode, quote
 
 from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .const import DOMAIN, REQUEST_TIMEOUT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,13 +60,11 @@ async def _call_dnsdist_api(
     if params:
         url = f"{url}?{urlencode(params, doseq=True)}"
 
-    session = async_get_clientsession(coordinator.hass)
-
     try:
-        verify_ssl = getattr(coordinator, "_verify_ssl", True)
-        ssl_context = False if not verify_ssl else None
-        async with timeout(10):
-            async with session.request(method, url, headers=headers, ssl=ssl_context, json=json_data) as resp:
+        # Reuse the host's session (created for its SSL setting)
+        session = coordinator.async_get_session()
+        async with timeout(REQUEST_TIMEOUT):
+            async with session.request(method, url, headers=headers, json=json_data) as resp:
                 text = await resp.text()
                 if resp.status in (200, 204):
                     _LOGGER.info("[%s] %s %s OK", getattr(coordinator, "_name", "?"), method, endpoint)
@@ -41,7 +41,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import ATTR_BACKENDS, CONF_IS_GROUP, DOMAIN
 from .services import _call_dnsdist_api, _encode_backend_segment
-from .utils import build_device_info
+from .utils import StructureTracker, build_device_info
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -55,10 +55,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         return
 
     switch_entities: dict[str, DnsdistBackendSwitch] = {}
+    structure = StructureTracker(coordinator)
 
     @callback
     def _async_sync_switches() -> None:
-        if not coordinator.data:
+        if not coordinator.data or structure.unchanged():
             return
         backends = coordinator.data.get(ATTR_BACKENDS)
         if not isinstance(backends, dict):
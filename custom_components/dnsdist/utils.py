@@ -27,15 +27,24 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import math
+import random
 import re
+import sys
 import time
+import zlib
+from array import array
+from bisect import bisect_left
 from collections import deque
-from collections.abc import Sequence
-from itertools import islice
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from itertools import accumulate, islice
+from operator import itemgetter
 from time import monotonic
-from typing import Any, Deque, Tuple
+from typing import Any, Deque
 
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
@@ -47,32 +56,331 @@ from .const import (
     ATTR_CPU,
     ATTR_DOWNSTREAM_ERRORS,
     ATTR_DROPS,
+    ATTR_DYNAMIC_RULES,
+    ATTR_FILTERING_RULES,
     ATTR_QUERIES,
     ATTR_REQ_PER_DAY,
     ATTR_REQ_PER_HOUR,
+    ATTR_REQ_PER_MONTH,
+    ATTR_REQ_PER_WEEK,
     ATTR_RESPONSES,
     ATTR_RULE_DROP,
     ATTR_SECURITY_STATUS,
     ATTR_UPTIME,
+    BREAKER_BACKOFF_MAX,
+    BREAKER_CLOSED,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_HALF_OPEN,
+    BREAKER_JITTER,
+    BREAKER_OPEN,
+    CONF_IS_GROUP,
+    CONF_MEMBERS,
+    CONF_NAME,
     DOMAIN,
+    EWMA_COUNTERS,
+    EWMA_HORIZONS,
+    HISTORY_TIER_1H,
+    HISTORY_TIER_5M,
+    INSTRUMENTATION_SAMPLES,
+    JOURNAL_SUFFIX,
+    MONTH_SECONDS,
+    RATE_COUNTERS,
+    RATE_SUFFIX_HOUR,
+    RATE_SUFFIX_MINUTE,
+    SNAPSHOT_MAX_AGE,
+    SNAPSHOT_SAVE_DELAY,
     STORAGE_KEY_HISTORY,
+    STORAGE_KEY_HISTORY_1H,
+    STORAGE_KEY_HISTORY_5M,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_VERSION,
+    WEEK_SECONDS,
 )
+from .journal import HistoryJournal
 
 _LOGGER = logging.getLogger(__name__)
 
 # Pre-compiled pattern for slugifying strings
 SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
 
+# Pre-compiled patterns for Prometheus text exposition samples
+PROMETHEUS_SAMPLE_PATTERN = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)")
+PROMETHEUS_LABEL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+# Pre-compiled patterns used to skip over unwanted JSON values while streaming
+JSON_STRUCTURAL_PATTERN = re.compile(r'[\[\]{}",]')
+JSON_STRING_SPECIAL_PATTERN = re.compile(r'["\\]')
+JSON_WHITESPACE = " \t\n\r"
+# Characters that can only mean a number was cut short by the chunk boundary
+JSON_NUMBER_CONTINUATION = frozenset(".eE0123456789")
+
 
 def slugify_rule(value: Any) -> str:
-    """Slugify a filtering rule name with hash fallback."""
-    base = str(value or "").lower()
-    base = SLUG_PATTERN.sub("-", base).strip("-")
+    """Slugify a filtering rule name with digest fallback."""
+    text = str(value or "")
+    base = SLUG_PATTERN.sub("-", text.lower()).strip("-")
     if not base:
-        base = f"rule-{abs(hash(value)) & 0xFFFF:x}"
+        # CRC32 rather than hash(), which is salted per interpreter run
+        base = f"rule-{zlib.crc32(text.encode()) & 0xFFFF:x}"
     return base
 
 
+class SlugCache:
+    """Memoized ``slugify_rule`` for the names of one table.
+
+    The same names recur on every parse of a table, however many there are,
+    so the cache holds exactly the names of the current and previous parse:
+    ``prune()``, called after each parse, forgets the names that were not
+    seen since the one before.
+    """
+
+    __slots__ = ("_current", "_previous", "hits", "misses")
+
+    def __init__(self) -> None:
+        self._current: dict[str, str] = {}
+        self._previous: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def slugify(self, value: Any) -> str:
+        text = str(value or "")
+        slug = self._current.get(text)
+        if slug is None:
+            slug = self._previous.get(text)
+            if slug is None:
+                self.misses += 1
+                slug = slugify_rule(text)
+            else:
+                self.hits += 1
+            self._current[text] = slug
+        else:
+            self.hits += 1
+        return slug
+
+    def prune(self) -> None:
+        """Start a new parse; names unused since the last one are dropped."""
+        self._previous = self._current
+        self._current = {}
+
+    def as_dict(self) -> dict[str, int]:
+        """Return hit/miss counters and size for diagnostics."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._previous)}
+
+
+def parse_prometheus_line(line: str) -> tuple[str, dict[str, str], float] | None:
+    """Parse one line of Prometheus text exposition.
+
+    Returns (metric_name, labels, value) for sample lines, or None for
+    comments, blank lines and anything that cannot be parsed.
+    """
+    line = line.strip()
+    if not line or line[0] == "#":
+        return None
+    match = PROMETHEUS_SAMPLE_PATTERN.match(line)
+    if match is None:
+        return None
+    name, raw_labels, raw_value = match.groups()
+    try:
+        value = float(raw_value)
+    except ValueError:
+        return None
+    labels = dict(PROMETHEUS_LABEL_PATTERN.findall(raw_labels)) if raw_labels else {}
+    return name, labels, value
+
+
+class JsonArrayExtractor:
+    """Incrementally extract selected top-level values from a streamed JSON object.
+
+    Text is pushed in with ``feed()`` as it arrives. Items of the arrays named
+    in ``keys`` are decoded one at a time as soon as they are complete; every
+    other top-level value is skipped with a regex-driven scanner and never
+    materialized. Consumed text is discarded, so the buffer only holds the
+    item currently being received plus one chunk.
+    """
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        self._keys = frozenset(keys)
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = ""
+        self._final = False
+        # Scanner state for skipped values, kept across chunks
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.result: dict[str, Any] = {}
+
+    def feed(self, text: str) -> None:
+        """Consume the next chunk of decoded text."""
+        if self._pos:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        self._buf += text
+        self._process()
+
+    def finish(self) -> dict[str, Any]:
+        """Flush the remaining input and return the extracted values.
+
+        Raises ValueError if the document is truncated or malformed.
+        """
+        self._final = True
+        self._process()
+        if self._state != "done":
+            raise ValueError("Truncated JSON document")
+        return self.result
+
+    def _next_char(self) -> str | None:
+        """Skip whitespace and return the next significant character, if any."""
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf) and buf[pos] in JSON_WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buf[pos] if pos < len(buf) else None
+
+    def _decode(self) -> tuple[bool, Any]:
+        """Decode one complete value at the cursor; (False, None) if more input is needed."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._final:
+                raise
+            return False, None
+        if not self._final:
+            # A scalar ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self._buf):
+                return False, None
+            # So may a number cut inside its fraction or exponent: "-2." decodes as -2
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and self._buf[end] in JSON_NUMBER_CONTINUATION
+            ):
+                return False, None
+        self._pos = end
+        return True, value
+
+    def _process(self) -> None:
+        while self._state != "done":
+            if self._state == "skip":
+                if not self._skip():
+                    return
+                self._state = "key"
+                continue
+
+            char = self._next_char()
+            if char is None:
+                return
+
+            if self._state == "start":
+                if char != "{":
+                    raise ValueError("Expected a JSON object")
+                self._pos += 1
+                self._state = "key"
+            elif self._state == "key":
+                if char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                else:
+                    ok, key = self._decode()
+                    if not ok:
+                        return
+                    self._key = str(key)
+                    self._state = "colon"
+            elif self._state == "colon":
+                if char != ":":
+                    raise ValueError("Expected ':' after object key")
+                self._pos += 1
+                self._state = "value"
+            elif self._state == "value":
+                if self._key not in self._keys:
+                    self._depth = 0
+                    self._in_string = False
+                    self._escape = False
+                    self._state = "skip"
+                elif char == "[":
+                    self._pos += 1
+                    self.result[self._key] = []
+                    self._state = "array"
+                else:
+                    ok, value = self._decode()
+                    if not ok:
+                        return
+                    self.result[self._key] = value
+                    self._state = "key"
+            elif self._state == "array":
+                if char == ",":
+                    self._pos += 1
+                elif char == "]":
+                    self._pos += 1
+                    self._state = "key"
+                else:
+                    ok, item = self._decode()
+                    if not ok:
+                        return
+                    self.result[self._key].append(item)
+
+    def _skip(self) -> bool:
+        """Advance past one unwanted value; False if it continues in the next chunk."""
+        buf = self._buf
+        pos = self._pos
+        while True:
+            if self._in_string:
+                if self._escape:
+                    if pos >= len(buf):
+                        break
+                    pos += 1
+                    self._escape = False
+                    continue
+                match = JSON_STRING_SPECIAL_PATTERN.search(buf, pos)
+                if match is None:
+                    pos = len(buf)
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    self._pos = pos
+                    return True
+                continue
+
+            match = JSON_STRUCTURAL_PATTERN.search(buf, pos)
+            if match is None:
+                pos = len(buf)
+                break
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+                pos = match.end()
+            elif char in "[{":
+                self._depth += 1
+                pos = match.end()
+            elif self._depth == 0:
+                # ``,`` or ``}`` closing a scalar value: leave it for the key state
+                self._pos = match.start()
+                return True
+            elif char in "]}":
+                self._depth -= 1
+                pos = match.end()
+                if self._depth == 0:
+                    self._pos = pos
+                    return True
+            else:
+                pos = match.end()
+
+        if self._final and self._depth == 0 and not self._in_string:
+            self._pos = pos
+            return True
+        self._pos = pos
+        return False
+
+
 def coerce_int(value: Any) -> int:
     """Safely convert a value to integer.
 
@@ -119,6 +427,461 @@ def build_device_info(coordinator: DataUpdateCoordinator[Any], is_group: bool) -
     return info
 
 
+def group_members_by_name(entries: Iterable[Any]) -> dict[str, list[str]]:
+    """Map each group config entry's name to its member names."""
+    groups: dict[str, list[str]] = {}
+    for entry in entries:
+        data = entry.data
+        if data.get(CONF_IS_GROUP) or data.get(CONF_MEMBERS):
+            groups[data.get(CONF_NAME) or entry.title] = list(data.get(CONF_MEMBERS, []))
+    return groups
+
+
+def group_dependency_order(groups: dict[str, Iterable[str]], roots: Iterable[str] | None = None) -> list[str]:
+    """Order groups so that every group comes after the groups it contains.
+
+    Members that are not keys of ``groups`` are hosts. Only groups reachable
+    from ``roots`` (default: all) are ordered. Raises ValueError naming the
+    groups involved if the membership graph has a cycle.
+    """
+    order: list[str] = []
+    done: set[str] = set()
+    path: list[str] = []
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in path:
+            cycle = path[path.index(name) :] + [name]
+            raise ValueError(f"Group cycle: {' -> '.join(cycle)}")
+        path.append(name)
+        for member in groups[name]:
+            if member in groups:
+                visit(member)
+        path.pop()
+        done.add(name)
+        order.append(name)
+
+    for name in groups if roots is None else roots:
+        if name in groups:
+            visit(name)
+    return order
+
+
+def group_leaf_hosts(groups: dict[str, Iterable[str]], name: str) -> list[str]:
+    """Return the hosts behind group ``name``, expanding nested groups.
+
+    Raises ValueError if a member is reached through more than one path, since
+    the group would then count its hosts more than once. A cycle is reported
+    the same way, as the group it loops back to is reached twice.
+    """
+    hosts: list[str] = []
+    reached: dict[str, str] = {}
+
+    def visit(group: str) -> None:
+        for member in groups[group]:
+            if member in reached:
+                raise ValueError(f"Group {name} reaches {member} through both {reached[member]} and {group}")
+            reached[member] = group
+            if member in groups:
+                visit(member)
+            else:
+                hosts.append(member)
+
+    visit(name)
+    return hosts
+
+
+class StructureTracker:
+    """Track the coordinator structure version an entity sync last ran against.
+
+    Host coordinators expose ``structure_version`` which only changes when
+    rules, backends or dynblocks appear or disappear. Coordinators without it
+    (groups) are always treated as changed.
+    """
+
+    def __init__(self, coordinator: DataUpdateCoordinator[Any]) -> None:
+        self._coordinator = coordinator
+        self._seen: int | None = None
+
+    def unchanged(self) -> bool:
+        """Return True if nothing structural changed since the last call."""
+        version = getattr(self._coordinator, "structure_version", None)
+        if not isinstance(version, int):
+            return False
+        if version == self._seen:
+            return True
+        self._seen = version
+        return False
+
+
+class RuleContribution:
+    """One member's rule table, slugged and summed per slug.
+
+    ``source`` is the rules mapping it was built from, so an unchanged table
+    can keep its contribution across member updates. Label slugs are taken
+    over from ``previous``, the member's last contribution, when it had them.
+    """
+
+    __slots__ = ("source", "counts", "first", "slugs")
+
+    def __init__(
+        self,
+        rules: Any,
+        label_key: str,
+        count_key: str,
+        default_label: str,
+        previous: RuleContribution | None = None,
+    ) -> None:
+        self.source = rules
+        self.counts: dict[str, int] = {}
+        # First rule seen per slug, with the cleaned-up label
+        self.first: dict[str, dict[str, Any]] = {}
+        self.slugs: dict[str, str] = {}
+        if not isinstance(rules, dict):
+            return
+        known = previous.slugs if previous is not None else {}
+        for rule in rules.values():
+            if not isinstance(rule, dict):
+                continue
+            label = str(rule.get(label_key) or default_label).strip() or default_label
+            slug = self.slugs.get(label) or known.get(label) or slugify_rule(label)
+            self.slugs[label] = slug
+            self.counts[slug] = self.counts.get(slug, 0) + coerce_int(rule.get(count_key))
+            self.first.setdefault(slug, {**rule, label_key: label})
+
+
+class MemberPartial:
+    """A member's data normalized once per update for every group using it.
+
+    Holds the coerced counters, CPU, uptime and security status plus the rule
+    and dynblock contributions. Contributions whose source mapping did not
+    change are carried over from ``previous``. ``cpu_weight`` is the number of
+    hosts behind the CPU figure: 1 for a host, the host count for a group.
+    ``traffic`` is the member's stored counter series (see ``HistoryMixin``),
+    falling back to the raw totals when the member has none yet.
+    """
+
+    __slots__ = ("data", "totals", "traffic", "cpu", "cpu_weight", "uptime", "security", "rules", "dynamic")
+
+    rules: RuleContribution
+    dynamic: RuleContribution
+
+    def __init__(
+        self,
+        name: str,
+        data: dict[str, Any],
+        previous: MemberPartial | None = None,
+        cpu_weight: int = 1,
+        traffic: Any = (),
+    ) -> None:
+        self.data = data
+        self.totals = {key: int(data.get(key, 0) or 0) for key in (ATTR_QUERIES, *RATE_COUNTERS)}
+        if isinstance(traffic, tuple) and len(traffic) == len(self.totals):
+            self.traffic: tuple[int, ...] = traffic
+        else:
+            self.traffic = tuple(self.totals.values())
+
+        self.cpu: float | None = None
+        self.cpu_weight = cpu_weight
+        cpu_val = data.get(ATTR_CPU)
+        try:
+            if cpu_val is not None and cpu_weight > 0:
+                self.cpu = float(cpu_val)
+        except (ValueError, TypeError):
+            _LOGGER.debug("[%s] Skipping invalid CPU value: %s", name, cpu_val)
+
+        uptime = data.get(ATTR_UPTIME)
+        self.uptime = int(uptime) if isinstance(uptime, (int, float)) else None
+        self.security = str(data.get(ATTR_SECURITY_STATUS, "unknown")).lower()
+
+        rules = data.get(ATTR_FILTERING_RULES)
+        if previous is not None and previous.rules.source is rules:
+            self.rules = previous.rules
+        else:
+            self.rules = RuleContribution(
+                rules, "name", "matches", "Unnamed Rule", previous.rules if previous is not None else None
+            )
+        dynamic = data.get(ATTR_DYNAMIC_RULES)
+        if previous is not None and previous.dynamic.source is dynamic:
+            self.dynamic = previous.dynamic
+        else:
+            self.dynamic = RuleContribution(
+                dynamic, "network", "blocks", "Unknown", previous.dynamic if previous is not None else None
+            )
+
+
+class RuleAggregate:
+    """Running group-wide sum of one per-host rule table.
+
+    Each member's last contribution is kept so that a member update only
+    subtracts its old counts and adds the new ones, instead of re-walking
+    every member's rules. Touched entries are replaced rather than mutated, so
+    dicts handed out by ``as_dict`` never change underneath their readers.
+    An entry's metadata is rebuilt from its current sources whenever the entry
+    is touched, taking each key from the earliest source that has it.
+    """
+
+    def __init__(self, label_key: str, count_key: str, metadata_keys: tuple[str, ...]) -> None:
+        self._label_key = label_key
+        self._count_key = count_key
+        self._metadata_keys = metadata_keys
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._contributions: dict[str, RuleContribution] = {}
+
+    def members(self) -> set[str]:
+        """Return the members that currently contribute."""
+        return set(self._contributions)
+
+    def update(self, member: str, contribution: RuleContribution) -> bool:
+        """Replace ``member``'s contribution; return False if it is unchanged."""
+        previous = self._contributions.get(member)
+        if previous is contribution:
+            return False
+
+        self._contributions[member] = contribution
+        counts = contribution.counts
+        first = contribution.first
+        old_counts = previous.counts if previous is not None else {}
+        old_first = previous.first if previous is not None else {}
+        for slug in old_counts.keys() - counts.keys():
+            self._apply(member, slug, -old_counts[slug], None)
+        for slug, count in counts.items():
+            old = old_counts.get(slug)
+            if old != count or self._metadata_changed(old_first.get(slug), first[slug]):
+                self._apply(member, slug, count - (old or 0), first[slug], count)
+        return True
+
+    def discard(self, member: str) -> None:
+        """Withdraw everything ``member`` contributed."""
+        previous = self._contributions.pop(member, None)
+        if previous is None:
+            return
+        for slug, count in previous.counts.items():
+            self._apply(member, slug, -count, None)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return a snapshot of the aggregated table."""
+        return dict(self._entries)
+
+    def _metadata_changed(self, old: dict[str, Any] | None, new: dict[str, Any]) -> bool:
+        if old is None:
+            return True
+        return any(old.get(key) != new.get(key) for key in self._metadata_keys)
+
+    def _apply(
+        self, member: str, slug: str, delta: int, rule: dict[str, Any] | None, member_count: int | None = None
+    ) -> None:
+        """Add ``delta`` to ``slug``; ``rule`` is None when ``member`` drops it."""
+        entry = self._entries.get(slug)
+        if entry is None:
+            if rule is None:
+                return
+            entry = {self._label_key: rule[self._label_key], self._count_key: 0, "sources": {}}
+        else:
+            entry = {**entry, "sources": dict(entry["sources"])}
+
+        entry[self._count_key] += delta
+        sources = entry["sources"]
+        if rule is None:
+            sources.pop(member, None)
+            if not sources:
+                self._entries.pop(slug, None)
+                return
+        else:
+            sources[member] = member_count
+
+        for key in self._metadata_keys:
+            entry.pop(key, None)
+        for source in sources:
+            source_rule = self._contributions[source].first[slug]
+            for key in self._metadata_keys:
+                if key not in entry and source_rule.get(key) is not None:
+                    entry[key] = source_rule[key]
+        self._entries[slug] = entry
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker with exponential backoff and jitter.
+
+    Closed: every poll runs. After ``threshold`` consecutive failures the
+    breaker opens and polls are skipped until the backoff expires. The next
+    poll is then a single half-open probe: success closes the breaker, failure
+    reopens it with twice the previous backoff (capped at ``max_delay``).
+    """
+
+    def __init__(
+        self,
+        base_delay: float,
+        *,
+        threshold: int = BREAKER_FAILURE_THRESHOLD,
+        max_delay: float = BREAKER_BACKOFF_MAX,
+        jitter: float = BREAKER_JITTER,
+    ) -> None:
+        self._base_delay = base_delay
+        self._threshold = threshold
+        self._max_delay = max(max_delay, base_delay)
+        self._jitter = jitter
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.retry_at: float | None = None
+
+    def allow(self, now: float) -> bool:
+        """Return True if a poll may run now, moving open -> half-open when due."""
+        if self.state != BREAKER_OPEN:
+            return True
+        if self.retry_at is not None and now < self.retry_at:
+            return False
+        self.state = BREAKER_HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.retry_at = None
+
+    def record_failure(self, now: float) -> bool:
+        """Count a failed poll; return True if this opened the breaker."""
+        self.consecutive_failures += 1
+        if self.state != BREAKER_HALF_OPEN and self.consecutive_failures < self._threshold:
+            return False
+        delay = min(self._base_delay * (2**self.trips), self._max_delay)
+        delay *= random.uniform(1 - self._jitter, 1 + self._jitter)
+        self.trips += 1
+        self.state = BREAKER_OPEN
+        self.retry_at = now + delay
+        return True
+
+    def retry_in(self, now: float) -> float | None:
+        """Seconds until the next probe while open, else None."""
+        if self.state != BREAKER_OPEN or self.retry_at is None:
+            return None
+        return max(0.0, self.retry_at - now)
+
+
+class DataSnapshot:
+    """Persisted copy of a coordinator's last normalized data for warm starts.
+
+    The payload is built by ``payload_fn`` when the store actually writes, so
+    it always holds the latest data. Writes are spaced ``SNAPSHOT_SAVE_DELAY``
+    apart rather than postponed on every poll, and Home Assistant flushes a
+    pending write on shutdown.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}_{entry_id}_{STORAGE_KEY_SNAPSHOT}")
+        self._scheduled_at: float | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the stored payload, or None if missing, malformed or stale."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.debug("Failed to load data snapshot: %s", err)
+            return None
+        if not isinstance(stored, dict) or not isinstance(stored.get("data"), dict):
+            return None
+        saved_at = stored.get("saved_at")
+        if not isinstance(saved_at, (int, float)) or time.time() - saved_at > SNAPSHOT_MAX_AGE:
+            return None
+        return stored
+
+    def async_schedule_save(self, payload_fn: Callable[[], dict[str, Any]]) -> None:
+        """Write ``payload_fn()`` once the save delay has elapsed."""
+        now = monotonic()
+        if self._scheduled_at is not None and now - self._scheduled_at < SNAPSHOT_SAVE_DELAY:
+            return
+        self._scheduled_at = now
+        self._store.async_delay_save(lambda: {**payload_fn(), "saved_at": time.time()}, SNAPSHOT_SAVE_DELAY)
+
+
+class PollInstrumentation:
+    """Small per-series ring buffers of poll timings and payload sizes."""
+
+    def __init__(self, size: int = INSTRUMENTATION_SAMPLES) -> None:
+        self._size = size
+        self._series: dict[str, Deque[float]] = {}
+
+    def record(self, series: str, value: float) -> None:
+        samples = self._series.get(series)
+        if samples is None:
+            samples = self._series[series] = deque(maxlen=self._size)
+        samples.append(value)
+
+    def summary(self, series: str) -> dict[str, float] | None:
+        """Return p50/p95/max/last over the buffered samples, or None if empty."""
+        samples = self._series.get(series)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        count = len(ordered)
+        return {
+            "p50": round(ordered[(count - 1) // 2], 2),
+            "p95": round(ordered[max(0, -(-count * 95 // 100) - 1)], 2),
+            "max": round(ordered[-1], 2),
+            "last": round(samples[-1], 2),
+            "samples": count,
+        }
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        return {series: summary for series in sorted(self._series) if (summary := self.summary(series))}
+
+
+class EwmaRates:
+    """Exponentially weighted per-second rates of counter deltas.
+
+    Keeps the last value and one average per horizon for each counter, so
+    memory does not depend on the poll history. The weight of a new sample
+    is ``1 - exp(-dt / horizon)``, which keeps the horizons meaningful when
+    polls are late or skipped. A counter going backwards (service restart)
+    only rebases the series.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str] = EWMA_COUNTERS,
+        horizons: Sequence[tuple[str, float]] = EWMA_HORIZONS,
+    ) -> None:
+        self._keys = tuple(keys)
+        self._horizons = tuple(horizons)
+        self._last: dict[str, tuple[float, int]] = {}
+        self._rates: dict[str, float] = {}
+
+    def update(self, now: float, data: dict[str, Any]) -> dict[str, float]:
+        """Fold the counters in ``data`` sampled at ``now`` and return the rates."""
+        for key in self._keys:
+            value = data.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            last = self._last.get(key)
+            self._last[key] = (now, int(value))
+            if last is None:
+                continue
+            dt = now - last[0]
+            delta = int(value) - last[1]
+            if dt <= 0 or delta < 0:
+                continue
+            instant = delta / dt
+            for suffix, horizon in self._horizons:
+                name = f"{key}{suffix}"
+                previous = self._rates.get(name)
+                if previous is None:
+                    self._rates[name] = instant
+                else:
+                    weight = 1.0 - math.exp(-dt / horizon)
+                    self._rates[name] = previous + weight * (instant - previous)
+        return self.as_dict()
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            f"{key}{suffix}": round(self._rates.get(f"{key}{suffix}", 0.0), 2)
+            for key in self._keys
+            for suffix, _ in self._horizons
+        }
+
+
 def make_zero_data() -> dict[str, Any]:
     """Create a zeroed data dictionary for coordinators."""
     return {
@@ -135,9 +898,253 @@ def make_zero_data() -> dict[str, Any]:
         ATTR_SECURITY_STATUS: "unknown",
         ATTR_REQ_PER_HOUR: 0,
         ATTR_REQ_PER_DAY: 0,
+        ATTR_REQ_PER_WEEK: 0,
+        ATTR_REQ_PER_MONTH: 0,
+        **{f"{key}{suffix}": 0 for key in RATE_COUNTERS for suffix in (RATE_SUFFIX_MINUTE, RATE_SUFFIX_HOUR)},
+        **{f"{key}{suffix}": 0.0 for key in EWMA_COUNTERS for suffix, _ in EWMA_HORIZONS},
     }
 
 
+class HistoryRing(Sequence[tuple]):
+    """Fixed-capacity columnar ring of ``(timestamp, counter, ...)`` samples.
+
+    Drop-in replacement for a ``deque`` of tuples with ``maxlen``: appending
+    to a full ring discards the oldest sample. Timestamps live in one
+    preallocated ``array('d')`` shared by ``width`` ``array('q')`` counter
+    columns (8 bytes per value instead of a tuple plus boxed numbers), and
+    tuples are only built on access. ``column(i)`` gives a ``(timestamp,
+    counter)`` view of a single series.
+    """
+
+    def __init__(self, maxlen: int, samples: Iterable[tuple] = (), *, width: int = 1) -> None:
+        if maxlen < 1:
+            raise ValueError("maxlen must be positive")
+        if width < 1:
+            raise ValueError("width must be positive")
+        self._maxlen = maxlen
+        self._width = width
+        self._ts = array("d", bytes(8 * maxlen))
+        self._cols = [array("q", bytes(8 * maxlen)) for _ in range(width)]
+        self._val = self._cols[0]
+        self._start = 0
+        self._len = 0
+        for sample in samples:
+            self.append(sample)
+
+    @property
+    def maxlen(self) -> int:
+        return self._maxlen
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("HistoryRing index out of range")
+        return (self._start + index) % self._maxlen
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        slot = self._slot(index)
+        if self._width == 1:
+            return self._ts[slot], self._val[slot]
+        return (self._ts[slot], *(col[slot] for col in self._cols))
+
+    def __iter__(self) -> Iterator[tuple]:
+        ts, cols, val, cap = self._ts, self._cols, self._val, self._maxlen
+        for offset in range(self._len):
+            slot = (self._start + offset) % cap
+            if self._width == 1:
+                yield ts[slot], val[slot]
+            else:
+                yield (ts[slot], *(col[slot] for col in cols))
+
+    def column(self, index: int) -> HistoryColumn:
+        """Return a ``(timestamp, counter)`` view of counter column ``index``."""
+        return HistoryColumn(self, self._cols[index])
+
+    def append(self, sample: tuple) -> None:
+        if self._len == self._maxlen:
+            slot = self._start
+            self._start = (self._start + 1) % self._maxlen
+        else:
+            slot = (self._start + self._len) % self._maxlen
+            self._len += 1
+        self._write(slot, sample)
+
+    def _write(self, slot: int, sample: tuple) -> None:
+        self._ts[slot] = sample[0]
+        for col, value in zip(self._cols, islice(sample, 1, None)):
+            col[slot] = value
+
+    def popleft(self) -> tuple:
+        if not self._len:
+            raise IndexError("pop from an empty HistoryRing")
+        sample = self[0]
+        self._start = (self._start + 1) % self._maxlen
+        self._len -= 1
+        return sample
+
+    def clear(self) -> None:
+        self._start = 0
+        self._len = 0
+
+    def set_last(self, sample: tuple) -> None:
+        """Overwrite the newest sample in place."""
+        if not self._len:
+            raise IndexError("set_last on an empty HistoryRing")
+        self._write(self._slot(-1), sample)
+
+    def fill_column(self, index: int, value: int) -> None:
+        """Set counter column ``index`` of every stored sample to ``value``."""
+        col = self._cols[index]
+        for offset in range(self._len):
+            col[(self._start + offset) % self._maxlen] = value
+
+    def bisect_time(self, ts: float) -> int:
+        """Return the index of the first sample with timestamp >= ``ts`` (O(log n))."""
+        end = self._start + self._len
+        if end <= self._maxlen:
+            return bisect_left(self._ts, ts, self._start, end) - self._start
+        # Wrapped: samples live in [start, maxlen) then [0, end - maxlen)
+        if ts <= self._ts[self._maxlen - 1]:
+            return bisect_left(self._ts, ts, self._start, self._maxlen) - self._start
+        return self._maxlen - self._start + bisect_left(self._ts, ts, 0, end - self._maxlen)
+
+    def _ordered(self, buffer: array) -> array:
+        end = self._start + self._len
+        if end <= self._maxlen:
+            return buffer[self._start : end]
+        return buffer[self._start :] + buffer[: end - self._maxlen]
+
+    def to_bytes(self) -> bytes:
+        """Serialize the samples, oldest first, as little-endian timestamps then each column."""
+        parts = [self._ordered(self._ts), *(self._ordered(col) for col in self._cols)]
+        if sys.byteorder != "little":
+            for part in parts:
+                part.byteswap()
+        return b"".join(part.tobytes() for part in parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, maxlen: int, *, width: int = 1) -> HistoryRing:
+        """Rebuild a ring from ``to_bytes()`` output, keeping the newest ``maxlen`` samples."""
+        stride = 8 * (1 + width)
+        if len(data) % stride:
+            raise ValueError("HistoryRing payload has a partial sample")
+        count = len(data) // stride
+        ts = array("d")
+        ts.frombytes(data[: 8 * count])
+        cols = []
+        for index in range(width):
+            col = array("q")
+            offset = 8 * count * (1 + index)
+            col.frombytes(data[offset : offset + 8 * count])
+            cols.append(col)
+        if sys.byteorder != "little":
+            ts.byteswap()
+            for col in cols:
+                col.byteswap()
+        return cls(maxlen, zip(ts, *cols), width=width)
+
+    def to_varint_bytes(self) -> bytes:
+        """Serialize the samples as zig-zag varint deltas, one column after another.
+
+        Timestamps are stored in whole milliseconds. A steadily polled ring
+        takes one to three bytes per value instead of eight.
+        """
+        ts_ms = [round(ts * 1000) for ts in self._ordered(self._ts)]
+        out = bytearray()
+        _write_varint(out, len(self))
+        for column in (ts_ms, *(self._ordered(col) for col in self._cols)):
+            previous = 0
+            for value in column:
+                _write_varint(out, _zigzag(value - previous))
+                previous = value
+        return bytes(out)
+
+    @classmethod
+    def from_varint_bytes(cls, data: bytes, maxlen: int, *, width: int = 1) -> HistoryRing:
+        """Rebuild a ring from ``to_varint_bytes()`` output, keeping the newest ``maxlen`` samples."""
+        (count,), offset = _read_varints(data, 0, 1, signed=False)
+        columns = []
+        for _ in range(1 + width):
+            deltas, offset = _read_varints(data, offset, count)
+            columns.append(list(accumulate(deltas)))
+        if offset != len(data):
+            raise ValueError("HistoryRing payload has trailing bytes")
+        ts = [ms / 1000 for ms in columns[0]]
+        try:
+            return cls(maxlen, zip(ts, *columns[1:]), width=width)
+        except OverflowError as err:
+            raise ValueError("HistoryRing payload has an out-of-range counter") from err
+
+
+def _zigzag(value: int) -> int:
+    """Map a signed integer to a non-negative one (0, -1, 1, -2 -> 0, 1, 2, 3)."""
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append a non-negative integer as a LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data: bytes, offset: int, count: int, *, signed: bool = True) -> tuple[list[int], int]:
+    """Read ``count`` varints (zig-zag decoded when ``signed``), returning them and the new offset."""
+    values: list[int] = []
+    end = len(data)
+    for _ in range(count):
+        result = shift = 0
+        while True:
+            if offset >= end:
+                raise ValueError("truncated varint")
+            byte = data[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append((result >> 1) ^ -(result & 1) if signed else result)
+    return values, offset
+
+
+class HistoryColumn(Sequence[tuple[float, int]]):
+    """Read-only ``(timestamp, counter)`` view of one column of a HistoryRing."""
+
+    def __init__(self, ring: HistoryRing, values: array) -> None:
+        self._ring = ring
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._ring)))]
+        slot = self._ring._slot(index)
+        return self._ring._ts[slot], self._values[slot]
+
+    def bisect_time(self, ts: float) -> int:
+        return self._ring.bisect_time(ts)
+
+
+def _bisect_history(history: Sequence[tuple[float, int]], ts: float) -> int:
+    """Return the index of the first history sample with timestamp >= ``ts``."""
+    if isinstance(history, (HistoryRing, HistoryColumn)):
+        return history.bisect_time(ts)
+    return bisect_left(history, ts, key=itemgetter(0))
+
+
 def compute_window_total(
     history: Sequence[tuple[float, int]],
     now_ts: float,
@@ -147,7 +1154,9 @@ def compute_window_total(
     """Compute total requests observed in a trailing time window.
 
     Uses linear interpolation to estimate the baseline value at the
-    window boundary when no exact sample exists at that time.
+    window boundary when no exact sample exists at that time. The boundary
+    sample is found by binary search, so the cost is O(log n) in the
+    history length.
 
     Args:
         history: Sequence of (timestamp, query_count) tuples, ordered by time.
@@ -162,15 +1171,20 @@ def compute_window_total(
         return 0
 
     horizon = now_ts - window_seconds
-    prev_ts, prev_q = history[0]
-    baseline = float(prev_q)
-
-    if prev_ts < horizon:
-        for ts, qq in islice(history, 1, None):
-            if ts < horizon:
-                prev_ts, prev_q = ts, qq
-                continue
+    first_ts, first_q = history[0]
 
+    if first_ts >= horizon:
+        baseline = float(first_q)
+    else:
+        # Locate the first sample at or after the horizon by binary search;
+        # the sample before it is the last one still outside the window.
+        index = _bisect_history(history, horizon)
+        if index == len(history):
+            # All history entries are older than horizon; use the most recent value
+            baseline = float(history[-1][1])
+        else:
+            ts, qq = history[index]
+            prev_ts, prev_q = history[index - 1]
             if ts == horizon:
                 baseline = float(qq)
             else:
@@ -181,13 +1195,6 @@ def compute_window_total(
                     baseline = float(prev_q) + (qq - prev_q) * fraction
                 else:
                     baseline = float(prev_q)
-            break
-        else:
-            # for/else: executes if loop completes without break, meaning all
-            # history entries are older than horizon; use the most recent value
-            baseline = float(history[-1][1])
-    else:
-        baseline = float(prev_q)
 
     delta = current_total - int(baseline)
     return max(0, delta)
@@ -196,21 +1203,80 @@ def compute_window_total(
 class HistoryMixin:
     """Mixin providing history persistence for coordinators.
 
+    Besides the 24 h of raw samples, the counter is consolidated into
+    fixed-size tiers of 5-minute buckets (7 days) and hourly buckets
+    (90 days) for the weekly and monthly rates. The raw history is columnar:
+    column 0 holds the query counter and the others the ``RATE_COUNTERS``,
+    all sharing one timestamp column.
+
+    Counter resets (dnsdist restarts, detected by ``uptime`` going down or a
+    counter going backwards) do not clear the history: the last values seen
+    before the reset are added to a per-column offset, so the stored series
+    stays monotonic and the rates stay accurate across restarts.
+
+    The rings are persisted in an append-only ``HistoryJournal``; the JSON
+    ``Store`` is only read to migrate history saved by older versions.
+
     Subclasses must define:
-        _history: Deque[Tuple[float, int]]
+        hass: HomeAssistant
+        _history: HistoryRing
         _history_loaded: bool
         _history_dirty: bool
         _last_history_persist: float | None
         _history_store: Store
         _name: str
+    and call ``_init_history_tiers()`` then ``_init_history_journal()`` from
+    their constructor.
     """
 
-    _history: Deque[Tuple[float, int]]
+    _history: HistoryRing
+    _history_5m: HistoryRing
+    _history_1h: HistoryRing
     _history_loaded: bool
     _history_dirty: bool
     _last_history_persist: float | None
     _history_store: Store
+    _history_journal: HistoryJournal
+    _journal_pending: list[tuple]
     _name: str
+    _history_backfill: bool = False
+    _history_migrated: bool = False
+    # Counter-reset state: raw values and uptime of the last sample, and the
+    # offsets added to the raw values
+    _last_raw: tuple[int, ...] | None = None
+    _last_uptime: int | None = None
+    _counter_offsets: tuple[int, ...] = ()
+    # Stored values of the last sample, for groups to follow this series
+    traffic_counters: tuple[int, ...] = ()
+    # Keep at most one raw sample per this many seconds (0: every update)
+    _history_spacing: float = 0
+
+    # Counter columns of the raw history
+    _HISTORY_COLUMNS = (ATTR_QUERIES, *RATE_COUNTERS)
+
+    # (attribute, storage key, bucket seconds, retention seconds)
+    _HISTORY_TIERS = (
+        ("_history_5m", STORAGE_KEY_HISTORY_5M, *HISTORY_TIER_5M),
+        ("_history_1h", STORAGE_KEY_HISTORY_1H, *HISTORY_TIER_1H),
+    )
+
+    def _init_history_tiers(self) -> None:
+        """Allocate the consolidated history tiers."""
+        for attr, _, bucket, retention in self._HISTORY_TIERS:
+            setattr(self, attr, HistoryRing(retention // bucket + 1))
+
+    def _init_history_journal(self) -> None:
+        """Create the history journal next to the legacy JSON store."""
+        # Records are (timestamp, uptime or -1, raw values...)
+        self._history_journal = HistoryJournal(
+            f"{self._history_store.path}{JOURNAL_SUFFIX}",
+            self._history.width + 1,
+        )
+        self._journal_pending = []
+
+    def _history_rings(self) -> list[tuple[str, int]]:
+        """Return ``(attribute, width)`` of every persisted ring, raw history first."""
+        return [("_history", self._history.width), *((attr, 1) for attr, _, _, _ in self._HISTORY_TIERS)]
 
     async def _async_ensure_history_loaded(self) -> None:
         """Load persisted history once so rate sensors survive restarts."""
@@ -219,6 +1285,55 @@ class HistoryMixin:
 
         self._history_loaded = True
 
+        try:
+            journal = await self.hass.async_add_executor_job(self._read_history_journal)
+        except Exception as err:
+            _LOGGER.debug("[%s] Failed to read history journal: %s", self._name, err)
+            journal = None
+
+        if journal is not None:
+            self._restore_journal(*journal)
+            return
+
+        await self._async_load_legacy_history()
+
+    def _read_history_journal(self) -> tuple[dict[str, HistoryRing], bytes, list[tuple]] | None:
+        """Read the journal and decode its snapshot (runs in the executor)."""
+        journal = self._history_journal.load()
+        if journal is None:
+            return None
+
+        blobs, samples = journal
+        version = self._history_journal.snapshot_version
+        decode = HistoryRing.from_varint_bytes if version >= 2 else HistoryRing.from_bytes
+        rings: dict[str, HistoryRing] = {}
+        persisted = self._history_rings()
+        for (attr, width), blob in zip(persisted, blobs):
+            try:
+                rings[attr] = decode(blob, getattr(self, attr).maxlen, width=width)
+            except ValueError as err:
+                _LOGGER.debug("[%s] Ignoring corrupt history snapshot %s: %s", self._name, attr, err)
+
+        if version < 3:
+            # Older records hold the stored values only, without uptime
+            return rings, b"", [(ts, -1, *values) for ts, *values in samples]
+        state = blobs[len(persisted)] if len(blobs) > len(persisted) else b""
+        return rings, state, samples
+
+    def _restore_journal(self, rings: dict[str, HistoryRing], state: bytes, samples: list[tuple]) -> None:
+        """Install the decoded snapshot, then replay the appended samples."""
+        for attr, ring in rings.items():
+            setattr(self, attr, ring)
+        self._restore_reset_state(state)
+
+        for ts, uptime, query_count, *counters in samples:
+            self._update_history(ts, query_count, counters, None if uptime < 0 else uptime)
+        self._trim_history(time.time())
+        self._journal_pending.clear()
+        self._history_dirty = False
+
+    async def _async_load_legacy_history(self) -> None:
+        """Load history saved as JSON by older versions; the next save migrates it."""
         try:
             stored = await self._history_store.async_load()
         except Exception as err:
@@ -228,30 +1343,47 @@ class HistoryMixin:
         if not isinstance(stored, dict):
             return
 
-        entries = stored.get(STORAGE_KEY_HISTORY)
-        if not isinstance(entries, list):
-            return
+        now = time.time()
+        width = self._history.width
+        history = self._parse_stored_samples(stored.get(STORAGE_KEY_HISTORY), now - 86400, width)
+        if history:
+            self._history = HistoryRing(self._history.maxlen, history, width=width)
+            # Samples persisted before the counter columns existed only carry
+            # queries; the first update fills the gaps with live values.
+            self._history_backfill = any(len(item) != width + 1 for item in stored[STORAGE_KEY_HISTORY])
+
+        for attr, key, _, retention in self._HISTORY_TIERS:
+            samples = self._parse_stored_samples(stored.get(key), now - retention)
+            if samples:
+                setattr(self, attr, HistoryRing(getattr(self, attr).maxlen, samples))
+        self._history_migrated = True
+        self._history_dirty = False
 
-        cutoff = time.time() - 86400
-        history: list[tuple[float, int]] = []
+    @staticmethod
+    def _parse_stored_samples(entries: Any, cutoff: float, width: int = 1) -> list[tuple]:
+        """Validate persisted ``[ts, queries, ...]`` samples, dropping those older than ``cutoff``.
 
+        Samples narrower than ``width`` counters are padded with zeros.
+        """
+        if not isinstance(entries, list):
+            return []
+
+        history: list[tuple] = []
         for item in entries:
-            if not isinstance(item, (list, tuple)) or len(item) != 2:
+            if not isinstance(item, (list, tuple)) or not 2 <= len(item) <= width + 1:
                 continue
-            ts_raw, val_raw = item
             try:
-                ts = float(ts_raw)
-                queries = int(val_raw)
+                ts = float(item[0])
+                values = [int(val) for val in item[1:]]
             except (TypeError, ValueError):
                 continue
             if ts < cutoff:
                 continue
-            history.append((ts, queries))
+            values.extend([0] * (width - len(values)))
+            history.append((ts, *values))
 
-        if history:
-            history.sort(key=lambda x: x[0])
-            self._history = deque(history, maxlen=self._history.maxlen)
-        self._history_dirty = False
+        history.sort(key=lambda x: x[0])
+        return history
 
     async def _async_save_history(self) -> None:
         """Persist the rolling history so restarts keep accurate rates."""
@@ -262,63 +1394,193 @@ class HistoryMixin:
             if monotonic() - self._last_history_persist < 30:
                 return
 
-        payload = {
-            STORAGE_KEY_HISTORY: [(float(ts), int(val)) for ts, val in self._history],
-        }
-
+        journal = self._history_journal
+        pending = self._journal_pending
         try:
-            await self._history_store.async_save(payload)
+            if journal.needs_compaction(len(pending), self._history.maxlen):
+                pending.clear()
+                blobs = [getattr(self, attr).to_varint_bytes() for attr, _ in self._history_rings()]
+                blobs.append(self._reset_state_bytes())
+                await self.hass.async_add_executor_job(journal.compact, blobs)
+                if self._history_migrated:
+                    await self._history_store.async_remove()
+                    self._history_migrated = False
+            elif pending:
+                samples = list(pending)
+                pending.clear()
+                await self.hass.async_add_executor_job(journal.append, samples)
             self._history_dirty = False
             self._last_history_persist = monotonic()
         except Exception as err:
             _LOGGER.debug("[%s] Failed to save history: %s", self._name, err)
 
-    def _update_history(self, now_ts: float, query_count: int) -> None:
+    def _update_history(
+        self,
+        now_ts: float,
+        query_count: int,
+        counters: Sequence[int] = (),
+        uptime: int | None = None,
+    ) -> tuple[int, ...]:
         """Update history with new data point and trim old entries.
 
-        Resets history if counter went backwards (service restart).
-        Trims entries older than 24 hours.
+        ``counters`` are the ``RATE_COUNTERS`` values, stored alongside the
+        query count. A counter reset, detected by ``uptime`` going down or a
+        counter going backwards, raises the per-column offsets instead of
+        clearing the history. Trims entries older than 24 hours, and
+        consolidated tiers beyond their retention.
+
+        Returns:
+            The stored (offset) values, query count first, to compute rates from.
         """
-        # Reset history if counter went backwards (service restart)
+        tiers = [(getattr(self, attr), bucket, retention) for attr, _, bucket, retention in self._HISTORY_TIERS]
+        width = self._history.width
+
+        raw = [int(query_count), *map(int, counters)][:width]
+        raw.extend([0] * (width - len(raw)))
+        offsets = self._counter_offsets or (0,) * width
+        # Without reset state (history from an older version) the stored
+        # values were the raw ones
+        last_raw = self._last_raw or (tuple(self._history[-1][1:]) if self._history else None)
+        if last_raw is not None:
+            restarted = uptime is not None and self._last_uptime is not None and uptime < self._last_uptime
+            if restarted or any(value < last for value, last in zip(raw, last_raw)):
+                _LOGGER.debug("[%s] Counter reset detected, keeping history", self._name)
+                offsets = tuple(
+                    offset + self._reset_offset(last, value) for offset, last, value in zip(offsets, last_raw, raw)
+                )
+        self._counter_offsets = offsets
+        self._last_raw = tuple(raw)
+        if uptime is not None:
+            self._last_uptime = int(uptime)
+
+        values = [value + offset for value, offset in zip(raw, offsets)]
+        query_count = values[0]
+        # Safety net: never let the stored series go backwards
         if self._history and query_count < self._history[-1][1]:
             self._history.clear()
+            for tier, _, _ in tiers:
+                tier.clear()
 
-        self._history.append((now_ts, query_count))
+        if self._history_backfill:
+            self._history_backfill = False
+            for index in range(1, len(values)):
+                self._history.fill_column(index, values[index])
+        spacing = self._history_spacing
+        if spacing and self._history and self._history[-1][0] // spacing == now_ts // spacing:
+            self._history.set_last((now_ts, *values))
+        else:
+            self._history.append((now_ts, *values))
+        self._journal_pending.append((now_ts, -1 if uptime is None else int(uptime), *raw))
         self._history_dirty = True
 
-        # Trim to last 24h
+        # Keep the last sample of each bucket
+        for tier, bucket, _ in tiers:
+            if tier and tier[-1][0] // bucket == now_ts // bucket:
+                tier.set_last((now_ts, query_count))
+            else:
+                tier.append((now_ts, query_count))
+
+        self._trim_history(now_ts)
+        self.traffic_counters = tuple(values)
+        return self.traffic_counters
+
+    def _reset_offset(self, last: int, current: int) -> int:
+        """Offset increase for a counter reset from ``last`` to ``current``.
+
+        The counter restarted from zero, so everything counted before the
+        reset is carried over.
+        """
+        return last
+
+    def _reset_state_bytes(self) -> bytes:
+        """Serialize the counter-reset state for the journal snapshot."""
+        last_raw = self._last_raw or ()
+        out = bytearray()
+        _write_varint(out, len(last_raw))
+        _write_varint(out, len(self._counter_offsets))
+        last_uptime = -1 if self._last_uptime is None else self._last_uptime
+        for value in (last_uptime, *last_raw, *self._counter_offsets):
+            _write_varint(out, _zigzag(value))
+        return bytes(out)
+
+    def _restore_reset_state(self, data: bytes) -> None:
+        """Restore the counter-reset state written by ``_reset_state_bytes()``."""
+        if not data:
+            return
+        try:
+            (raw_len, offsets_len), offset = _read_varints(data, 0, 2, signed=False)
+            values, offset = _read_varints(data, offset, 1 + raw_len + offsets_len)
+        except ValueError as err:
+            _LOGGER.debug("[%s] Ignoring corrupt counter reset state: %s", self._name, err)
+            return
+        width = self._history.width
+        if offset != len(data) or raw_len not in (0, width) or offsets_len not in (0, width):
+            return
+        self._last_uptime = None if values[0] < 0 else values[0]
+        self._last_raw = tuple(values[1 : 1 + raw_len]) or None
+        self._counter_offsets = tuple(values[1 + raw_len :])
+
+    def _trim_history(self, now_ts: float) -> None:
+        """Drop raw samples older than 24 hours and tier buckets beyond retention."""
         cutoff_24h = now_ts - 86400
         while self._history and self._history[0][0] < cutoff_24h:
             self._history.popleft()
 
+        for attr, _, _, retention in self._HISTORY_TIERS:
+            tier = getattr(self, attr)
+            cutoff = now_ts - retention
+            while tier and tier[0][0] < cutoff:
+                tier.popleft()
+
+    @staticmethod
+    def _window_rate(history: HistoryRing | HistoryColumn, now_ts: float, window: int, query_count: int) -> int:
+        """Requests over ``window`` seconds, extrapolated while history is shorter."""
+        if not history:
+            return 0
+
+        history_span = now_ts - history[0][0]
+        if history_span >= window:
+            return compute_window_total(history, now_ts, window, query_count)
+        if history_span > 0:
+            observed = query_count - history[0][1]
+            return int((observed / history_span) * window)
+        return 0
+
     def _compute_rates(self, now_ts: float, query_count: int) -> tuple[int, int]:
         """Compute hourly and daily request rates with extrapolation.
 
         Returns:
             Tuple of (req_per_hour, req_per_day).
         """
-        if not self._history:
-            return 0, 0
-
-        oldest_ts = self._history[0][0]
-        history_span = now_ts - oldest_ts
-
-        # Hourly rate
-        if history_span >= 3600:
-            req_per_hour = compute_window_total(self._history, now_ts, 3600, query_count)
-        elif history_span > 0:
-            observed = query_count - self._history[0][1]
-            req_per_hour = int((observed / history_span) * 3600)
-        else:
-            req_per_hour = 0
-
-        # Daily rate
-        if history_span >= 86400:
-            req_per_day = compute_window_total(self._history, now_ts, 86400, query_count)
-        elif history_span > 0:
-            observed = query_count - self._history[0][1]
-            req_per_day = int((observed / history_span) * 86400)
-        else:
-            req_per_day = 0
-
+        queries = self._history.column(0)
+        req_per_hour = self._window_rate(queries, now_ts, 3600, query_count)
+        req_per_day = self._window_rate(queries, now_ts, 86400, query_count)
         return req_per_hour, req_per_day
+
+    def _compute_counter_rates(self, now_ts: float, counters: Sequence[int]) -> dict[str, int]:
+        """Compute per-minute and per-hour rates of the ``RATE_COUNTERS``.
+
+        Returns:
+            Dict keyed ``<counter>_per_minute`` / ``<counter>_per_hour``.
+        """
+        rates: dict[str, int] = {}
+        for index, (key, value) in enumerate(zip(RATE_COUNTERS, counters), start=1):
+            if index >= self._history.width:
+                break
+            column = self._history.column(index)
+            rates[f"{key}{RATE_SUFFIX_MINUTE}"] = self._window_rate(column, now_ts, 60, value)
+            rates[f"{key}{RATE_SUFFIX_HOUR}"] = self._window_rate(column, now_ts, 3600, value)
+        return rates
+
+    def _compute_long_rates(self, now_ts: float, query_count: int) -> tuple[int, int]:
+        """Compute weekly and monthly request rates from the consolidated tiers.
+
+        Each tier holds a bounded number of buckets, so the lookup cost does
+        not grow with uptime.
+
+        Returns:
+            Tuple of (req_per_week, req_per_month).
+        """
+        req_per_week = self._window_rate(self._history_5m, now_ts, WEEK_SECONDS, query_count)
+        req_per_month = self._window_rate(self._history_1h, now_ts, MONTH_SECONDS, query_count)
+        return req_per_week, req_per_month
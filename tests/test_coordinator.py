@@ -25,24 +25,39 @@
 
 """Tests for DnsdistCoordinator normalization logic."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
 
 from custom_components.dnsdist.coordinator import DnsdistCoordinator
+from custom_components.dnsdist.journal import HistoryJournal
+from custom_components.dnsdist.utils import HistoryRing
 from custom_components.dnsdist.const import (
+    ATTR_BACKENDS,
     ATTR_CACHE_HITS,
     ATTR_CACHE_HITRATE,
     ATTR_CACHE_MISSES,
+    ATTR_COUNTERS,
     ATTR_DOWNSTREAM_ERRORS,
     ATTR_DROPS,
+    ATTR_DYNAMIC_RULES,
+    ATTR_FILTERING_RULES,
     ATTR_QUERIES,
+    ATTR_REQ_PER_MONTH,
+    ATTR_REQ_PER_WEEK,
     ATTR_RESPONSES,
     ATTR_RULE_DROP,
     ATTR_SECURITY_STATUS,
     ATTR_UPTIME,
+    RATE_COUNTERS,
 )
 
 
-def make_coordinator(update_interval=30):
+def make_coordinator(update_interval=30, **kwargs):
     hass = MagicMock()
     hass.data = {}
     with patch("homeassistant.helpers.frame.report_usage"):
@@ -56,6 +71,7 @@ def make_coordinator(update_interval=30):
             use_https=False,
             verify_ssl=True,
             update_interval=update_interval,
+            **kwargs,
         )
 
 
@@ -199,6 +215,73 @@ class TestNormalize:
         assert result[ATTR_QUERIES] == 500
         assert result[ATTR_RESPONSES] == 450
 
+    def test_counters_not_retained_by_default(self):
+        result = self.coord._normalize(self._stats(("queries", 10), ("latency-avg100", 1.5)))
+        assert ATTR_COUNTERS not in result
+        assert self.coord.counter_names == []
+
+
+class TestRetainAllCounters:
+    def setup_method(self):
+        self.coord = make_coordinator(retain_all_counters=True)
+
+    def test_every_numeric_counter_kept_by_name(self):
+        stats = [
+            {"name": "queries", "type": "counter", "value": 10},
+            {"name": "latency-avg100", "type": "gauge", "value": 1.5},
+            {"name": "fd-usage", "type": "gauge", "value": 42},
+            {"name": "security-status", "type": "gauge", "value": 1},
+        ]
+        result = self.coord._normalize(stats)
+        names = self.coord.counter_names
+        assert names == ["queries", "latency-avg100", "fd-usage", "security-status"]
+        assert dict(zip(names, result[ATTR_COUNTERS])) == {
+            "queries": 10,
+            "latency-avg100": 1.5,
+            "fd-usage": 42,
+            "security-status": 1,
+        }
+        assert self.coord.counter_types["queries"] == "counter"
+        # Mapped keys are still normalized as before
+        assert result[ATTR_QUERIES] == 10
+        assert result[ATTR_SECURITY_STATUS] == "ok"
+
+    def test_json_statistics_classified_by_name(self):
+        # As returned by /api/v1/servers/localhost/statistics
+        stats = [
+            {"name": "responses", "type": "StatisticItem", "value": 7032},
+            {"name": "servfail-responses", "type": "StatisticItem", "value": 0},
+            {"name": "latency-avg100", "type": "StatisticItem", "value": 2.62},
+            {"name": "fd-usage", "type": "StatisticItem", "value": 33},
+            {"name": "udp-in-errors", "type": "StatisticItem", "value": 3},
+            {"name": "uptime", "type": "StatisticItem", "value": 86421},
+        ]
+        self.coord._normalize(stats)
+        assert self.coord.counter_types == {
+            "responses": "counter",
+            "servfail-responses": "counter",
+            "udp-in-errors": "counter",
+        }
+
+    def test_slots_stable_across_polls(self):
+        self.coord._normalize([{"name": "a", "value": 1}, {"name": "b", "value": 2}])
+        result = self.coord._normalize([{"name": "b", "value": 5}, {"name": "c", "value": 7}])
+        assert self.coord.counter_names == ["a", "b", "c"]
+        assert result[ATTR_COUNTERS] == [None, 5, 7]
+
+    def test_new_names_bump_structure_version(self):
+        self.coord._normalize([{"name": "a", "value": 1}])
+        version = self.coord.structure_version
+        self.coord._normalize([{"name": "a", "value": 2}])
+        assert self.coord.structure_version == version
+        self.coord._normalize([{"name": "a", "value": 3}, {"name": "b", "value": 1}])
+        assert self.coord.structure_version == version + 1
+
+    def test_non_numeric_values_skipped(self):
+        result = self.coord._normalize([{"name": "version", "value": "1.9.0"}])
+        assert self.coord.counter_names == []
+        assert result[ATTR_COUNTERS] == []
+
 
 # ---------------------------------------------------------------------------
 # _normalize_filtering_rule
@@ -332,3 +415,900 @@ class TestNormalizeDynamicRule:
         result = self.coord._normalize_dynamic_rule("192.168.0.0/16", {"blocks": 2})
         assert "slug" in result
         assert result["slug"] != ""
+
+
+# ---------------------------------------------------------------------------
+# _async_update_data (concurrent fetch)
+# ---------------------------------------------------------------------------
+
+
+def run_update(coord, *, stats=None, config=None, dynamic=None, request_timeout=10):
+    """Run one poll with the three endpoint fetches replaced by async callables."""
+
+    async def _value(value):
+        if isinstance(value, BaseException):
+            raise value
+        if callable(value):
+            return await value()
+        return value
+
+    with (
+        patch.object(coord, "_async_ensure_history_loaded", new_callable=AsyncMock),
+        patch.object(coord, "_async_save_history", new_callable=AsyncMock),
+        patch.object(coord, "async_get_session"),
+        patch("custom_components.dnsdist.coordinator.REQUEST_TIMEOUT", request_timeout),
+        patch.object(coord, "_async_fetch_statistics", new=lambda *_: _value(stats)),
+        patch.object(coord, "_async_fetch_server_config", new=lambda *_: _value(config)),
+        patch.object(coord, "_async_fetch_dynamic_rules", new=lambda *_: _value(dynamic)),
+    ):
+        return asyncio.run(coord._async_update_data())
+
+
+def use_journal(coord, path):
+    """Point the history journal at ``path`` and run executor jobs inline."""
+
+    async def _run(func, *args):
+        return func(*args)
+
+    coord.hass.async_add_executor_job = _run
+    coord._history_journal = HistoryJournal(str(path), coord._history.width + 1)
+
+
+class TestConcurrentFetch:
+    def setup_method(self):
+        self.coord = make_coordinator()
+
+    def test_merges_all_endpoints(self):
+        config = {
+            "rules": [{"name": "Block Ads", "matches": 3}],
+            "servers": [{"address": "10.0.0.1:53", "state": "up", "queries": 7}],
+        }
+        dynamic = {"10-0-0-2-32": {"network": "10.0.0.2/32", "blocks": 4}}
+        result = run_update(
+            self.coord,
+            stats=[{"name": "queries", "value": 100}],
+            config=config,
+            dynamic=dynamic,
+        )
+        assert result[ATTR_QUERIES] == 100
+        assert result[ATTR_FILTERING_RULES]["block-ads"]["matches"] == 3
+        assert result[ATTR_BACKENDS]["10-0-0-1-53"]["queries"] == 7
+        assert result[ATTR_DYNAMIC_RULES] == dynamic
+
+    def test_requests_run_in_parallel(self):
+        async def slow(value):
+            await asyncio.sleep(0.2)
+            return value
+
+        start = time.monotonic()
+        run_update(
+            self.coord,
+            stats=lambda: slow([{"name": "queries", "value": 1}]),
+            config=lambda: slow({}),
+            dynamic=lambda: slow({}),
+        )
+        assert time.monotonic() - start < 0.5
+
+    def test_slow_endpoint_does_not_block_partial_results(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        result = run_update(
+            self.coord,
+            stats=[{"name": "queries", "value": 42}],
+            config=hang,
+            dynamic={"net": {"network": "10.0.0.0/8", "blocks": 1}},
+            request_timeout=0.1,
+        )
+        assert result[ATTR_QUERIES] == 42
+        assert result[ATTR_DYNAMIC_RULES]["net"]["blocks"] == 1
+        assert ATTR_FILTERING_RULES not in result
+
+    def test_stats_failure_keeps_previous_data_and_merges_rules(self):
+        self.coord.data = {**self.coord._zero_data(), ATTR_QUERIES: 500}
+        result = run_update(
+            self.coord,
+            stats=ConnectionError("HTTP 500"),
+            config={"rules": [{"name": "Allow", "matches": 1}]},
+            dynamic=None,
+        )
+        assert result[ATTR_QUERIES] == 500
+        assert result[ATTR_FILTERING_RULES]["allow"]["matches"] == 1
+
+    def test_stats_timeout_keeps_previous_data(self):
+        async def hang():
+            await asyncio.sleep(10)
+
+        self.coord.data = {**self.coord._zero_data(), ATTR_QUERIES: 9}
+        result = run_update(self.coord, stats=hang, config=None, dynamic=None, request_timeout=0.1)
+        assert result[ATTR_QUERIES] == 9
+
+    def test_cancelled_poll_cancels_its_fetches(self):
+        fetches = []
+
+        async def hang(*_):
+            fetches.append(asyncio.current_task())
+            await asyncio.sleep(10)
+
+        async def run():
+            poll = asyncio.create_task(self.coord._async_update_data())
+            await asyncio.sleep(0.05)
+            poll.cancel()
+            await asyncio.gather(poll, return_exceptions=True)
+            # Checked before asyncio.run cancels leftover tasks itself
+            return poll, [task.cancelled() for task in fetches]
+
+        with (
+            patch.object(self.coord, "_async_ensure_history_loaded", new_callable=AsyncMock),
+            patch.object(self.coord, "async_get_session"),
+            patch.object(self.coord, "_async_fetch_statistics", new=hang),
+            patch.object(self.coord, "_async_fetch_server_config", new=hang),
+            patch.object(self.coord, "_async_fetch_dynamic_rules", new=hang),
+        ):
+            poll, cancelled = asyncio.run(run())
+        assert poll.cancelled()
+        assert cancelled == [True, True, True]
+
+
+# ---------------------------------------------------------------------------
+# Refresh tiers
+# ---------------------------------------------------------------------------
+
+
+class TestRefreshTiers:
+    def test_tier_interval_never_below_update_interval(self):
+        coord = make_coordinator(update_interval=30, config_interval=10, dynblock_interval=10)
+        assert coord._config_interval == 30
+        assert coord._dynblock_interval == 30
+
+    def test_first_tick_is_always_due(self):
+        coord = make_coordinator(update_interval=30, config_interval=300)
+        assert coord._tier_due(None, 300, 1000.0)
+
+    def test_due_with_jitter_slack(self):
+        coord = make_coordinator(update_interval=30, config_interval=60)
+        # Second tick of a 60 s tier may fire slightly early
+        assert coord._tier_due(1000.0, 60, 1059.5)
+        assert not coord._tier_due(1000.0, 60, 1030.2)
+
+    def test_slow_tiers_skipped_between_due_ticks(self):
+        coord = make_coordinator(update_interval=30, config_interval=300, dynblock_interval=300)
+        calls = {"config": 0, "dynamic": 0}
+
+        async def config():
+            calls["config"] += 1
+            return {"rules": [{"name": "Block Ads", "matches": calls["config"]}]}
+
+        async def dynamic():
+            calls["dynamic"] += 1
+            return {}
+
+        stats = [{"name": "queries", "value": 1}]
+        first = run_update(coord, stats=stats, config=config, dynamic=dynamic)
+        coord.data = first
+        second = run_update(coord, stats=stats, config=config, dynamic=dynamic)
+
+        assert calls == {"config": 1, "dynamic": 1}
+        # Rules from the previous config fetch are carried over
+        assert second[ATTR_FILTERING_RULES]["block-ads"]["matches"] == 1
+
+    def test_failed_tier_is_retried_next_tick(self):
+        coord = make_coordinator(update_interval=30, config_interval=300)
+        stats = [{"name": "queries", "value": 1}]
+        run_update(coord, stats=stats, config=None, dynamic=None)
+        assert coord._last_config_fetch is None
+        assert coord._tier_due(coord._last_config_fetch, coord._config_interval, 0.0)
+
+
+# ---------------------------------------------------------------------------
+# Record fingerprinting
+# ---------------------------------------------------------------------------
+
+
+class TestRecordFingerprint:
+    def setup_method(self):
+        self.coord = make_coordinator()
+
+    def test_unchanged_rule_reuses_normalized_object(self):
+        payload = {"rules": [{"name": "Block Ads", "matches": 3}, {"name": "Allow", "matches": 1}]}
+        first = self.coord._parse_filtering_rules(payload)
+        second = self.coord._parse_filtering_rules({"rules": [dict(r) for r in payload["rules"]]})
+        assert second["block-ads"] is first["block-ads"]
+        assert second["allow"] is first["allow"]
+
+    def test_changed_rule_is_rebuilt(self):
+        first = self.coord._parse_filtering_rules({"rules": [{"name": "Block Ads", "matches": 3}]})
+        second = self.coord._parse_filtering_rules({"rules": [{"name": "Block Ads", "matches": 4}]})
+        assert second["block-ads"] is not first["block-ads"]
+        assert second["block-ads"]["matches"] == 4
+
+    def test_records_are_keyed_by_id(self):
+        rules = [{"uuid": "u1", "name": "Same", "matches": 1}, {"uuid": "u2", "name": "Other", "matches": 2}]
+        first = self.coord._parse_filtering_rules({"rules": rules})
+        second = self.coord._parse_filtering_rules({"rules": [dict(r) for r in reversed(rules)]})
+        assert second["u1"] is first["u1"]
+        assert second["u2"] is first["u2"]
+        assert set(self.coord._rule_cache) == {"u1", "u2"}
+
+    def test_removed_records_are_evicted_from_cache(self):
+        self.coord._parse_backends({"servers": [{"address": "10.0.0.1:53"}, {"address": "10.0.0.2:53"}]})
+        self.coord._parse_backends({"servers": [{"address": "10.0.0.1:53"}]})
+        assert len(self.coord._backend_cache) == 1
+
+    def test_structure_version_only_bumps_on_slug_changes(self):
+        data = {}
+        self.coord._merge_server_state(data, {"rules": [{"name": "A", "matches": 1}], "servers": []}, {})
+        version = self.coord.structure_version
+        self.coord._merge_server_state(data, {"rules": [{"name": "A", "matches": 2}], "servers": []}, {})
+        assert self.coord.structure_version == version
+        self.coord._merge_server_state(data, {"rules": [{"name": "A", "matches": 2}, {"name": "B"}], "servers": []}, {})
+        assert self.coord.structure_version == version + 1
+
+    def test_skipped_tier_does_not_bump_structure_version(self):
+        data = {}
+        self.coord._merge_server_state(data, {"rules": [], "servers": []}, {})
+        version = self.coord.structure_version
+        self.coord._merge_server_state(data, None, None)
+        assert self.coord.structure_version == version
+
+
+# ---------------------------------------------------------------------------
+# Prometheus /metrics mode
+# ---------------------------------------------------------------------------
+
+METRICS_BODY = b"""# HELP dnsdist_queries Number of received queries
+# TYPE dnsdist_queries counter
+dnsdist_queries 1000
+dnsdist_responses 990
+dnsdist_cache_hits 80
+dnsdist_cache_misses 20
+dnsdist_downstream_send_errors 3
+dnsdist_cpu_user_msec 5000
+dnsdist_security_status 1
+dnsdist_frontend_queries{frontend="127.0.0.1:53",proto="UDP",thread="0"} 500
+dnsdist_server_queries{server="ns1",address="10.0.0.1:53"} 600
+dnsdist_server_latency{server="ns1",address="10.0.0.1:53"} 1.5
+dnsdist_server_status{server="ns1",address="10.0.0.1:53"} 1
+dnsdist_server_queries{server="ns2",address="10.0.0.2:53"} 400
+dnsdist_server_status{server="ns2",address="10.0.0.2:53"} 0
+"""
+
+
+class FakeContent:
+    def __init__(self, body):
+        self._body = body
+        self._lines = body.splitlines(keepends=True)
+        self.bytes_read = 0
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for line in self._lines:
+            yield line
+
+    async def iter_chunked(self, size):
+        data = self._body.encode() if isinstance(self._body, str) else self._body
+        for start in range(0, len(data), size):
+            chunk = data[start : start + size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class FakeResponse:
+    def __init__(self, body, status=200, content_length=None):
+        self.status = status
+        self.content = FakeContent(body)
+        self.content_length = content_length
+        self.charset = None
+        self._body = body
+
+    async def read(self):
+        return self._body.encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestPrometheusMetrics:
+    def setup_method(self):
+        self.coord = make_coordinator(use_prometheus=True)
+
+    def _fetch(self, body, status=200):
+        session = MagicMock()
+        session.get = MagicMock(return_value=FakeResponse(body, status))
+        return asyncio.run(self.coord._async_fetch_metrics(session, {}))
+
+    def test_counters_map_to_statistics_names(self):
+        metrics = self._fetch(METRICS_BODY)
+        result = self.coord._normalize(metrics)
+        assert result[ATTR_QUERIES] == 1000
+        assert result[ATTR_RESPONSES] == 990
+        assert result[ATTR_CACHE_HITRATE] == 80.0
+        assert result[ATTR_DOWNSTREAM_ERRORS] == 3
+        assert result["cpu_user_msec"] == 5000
+        assert result[ATTR_SECURITY_STATUS] == "ok"
+
+    def test_labelled_non_server_series_ignored(self):
+        metrics = self._fetch(METRICS_BODY)
+        names = {item["name"] for item in metrics["statistics"]}
+        assert "frontend-queries" not in names
+
+    def test_server_series_become_backends(self):
+        metrics = self._fetch(METRICS_BODY)
+        backends = self.coord._parse_backends(metrics)
+        assert backends["ns1"]["address"] == "10.0.0.1:53"
+        assert backends["ns1"]["queries"] == 600
+        assert backends["ns1"]["latency"] == 1.5
+        assert backends["ns1"]["state"] == "up"
+        assert backends["ns2"]["state"] == "down"
+
+    def test_http_error_raises(self):
+        try:
+            self._fetch(b"", status=401)
+        except ConnectionError:
+            return
+        raise AssertionError("expected ConnectionError")
+
+    def test_backends_from_metrics_take_precedence_over_config(self):
+        metrics = {"statistics": [{"name": "queries", "value": 5}], "servers": [{"address": "10.0.0.1:53"}]}
+        config = {"rules": [], "servers": [{"address": "192.0.2.1:53"}]}
+        with patch.object(self.coord, "_async_fetch_metrics", new=lambda *_: asyncio.sleep(0, metrics)):
+            result = run_update(self.coord, stats=None, config=config, dynamic=None)
+        assert set(result[ATTR_BACKENDS]) == {"10-0-0-1-53"}
+
+
+# ---------------------------------------------------------------------------
+# Pooled HTTP session
+# ---------------------------------------------------------------------------
+
+
+class TestPooledSession:
+    def _run(self, coord, check):
+        async def _inner():
+            with patch(
+                "custom_components.dnsdist.coordinator.async_create_clientsession",
+                side_effect=lambda hass, verify_ssl: aiohttp.ClientSession(),
+            ) as create:
+                self.create = create
+                try:
+                    await check()
+                finally:
+                    await coord.async_close_session()
+
+        asyncio.run(_inner())
+
+    def test_session_is_reused(self):
+        coord = make_coordinator()
+
+        async def check():
+            assert coord.async_get_session() is coord.async_get_session()
+
+        self._run(coord, check)
+
+    def test_session_created_through_home_assistant(self):
+        coord = make_coordinator()
+
+        async def check():
+            coord.async_get_session()
+            self.create.assert_called_once_with(coord.hass, verify_ssl=True)
+
+        self._run(coord, check)
+
+    def test_externally_closed_session_is_replaced(self):
+        coord = make_coordinator()
+
+        async def check():
+            first = coord.async_get_session()
+            await first.close()
+            assert coord.async_get_session() is not first
+
+        self._run(coord, check)
+
+    def test_no_session_after_close(self):
+        coord = make_coordinator()
+
+        async def check():
+            first = coord.async_get_session()
+            await coord.async_close_session()
+            assert first.closed
+            with pytest.raises(RuntimeError):
+                coord.async_get_session()
+            # Polls after close neither fetch nor open a session
+            data = await coord._async_update_data()
+            assert data[ATTR_QUERIES] == 0
+            assert coord._session is None
+
+        self._run(coord, check)
+
+
+class TestStreamingServerConfig:
+    def _fetch(self, coord, response):
+        session = MagicMock()
+        session.get = MagicMock(return_value=response)
+        return asyncio.run(coord._async_fetch_server_config(session, {}))
+
+    def test_extracts_rules_and_servers_only(self):
+        coord = make_coordinator()
+        body = json.dumps(
+            {
+                "config": [{"name": "x", "value": "y"}] * 100,
+                "rules": [{"id": 0, "uuid": "a", "rule": "qname", "matches": 3}],
+                "servers": [{"address": "10.0.0.1:53", "state": "up"}],
+            }
+        )
+        payload = self._fetch(coord, FakeResponse(body))
+        assert payload == {
+            "rules": [{"id": 0, "uuid": "a", "rule": "qname", "matches": 3}],
+            "servers": [{"address": "10.0.0.1:53", "state": "up"}],
+        }
+        assert coord._server_config_supported is True
+        assert "a" in {rule["uuid"] for rule in coord._parse_filtering_rules(payload).values()}
+
+    def test_utf8_split_across_chunks(self):
+        coord = make_coordinator()
+        body = json.dumps({"rules": [{"name": "\u00e9" * 40000}]}, ensure_ascii=False)
+        payload = self._fetch(coord, FakeResponse(body))
+        assert payload["rules"][0]["name"] == "\u00e9" * 40000
+
+    def test_declared_length_over_ceiling_rejected_before_reading(self):
+        coord = make_coordinator(max_config_size=1)
+        response = FakeResponse('{"rules": []}', content_length=2 * 1024 * 1024)
+        assert self._fetch(coord, response) is None
+        assert response.content.bytes_read == 0
+
+    def test_stream_aborted_once_ceiling_exceeded(self):
+        coord = make_coordinator(max_config_size=1)
+        body = json.dumps({"rules": [{"rule": "x" * 1000}] * 3000})
+        response = FakeResponse(body)
+        assert self._fetch(coord, response) is None
+        assert response.content.bytes_read < len(body)
+        # An oversized document is not the same as an unsupported endpoint
+        assert coord._server_config_supported is not False
+
+    def test_malformed_body_returns_none(self):
+        coord = make_coordinator()
+        assert self._fetch(coord, FakeResponse('{"rules": [')) is None
+
+
+class TestCircuitBreakerPolling:
+    def _trip(self, coord):
+        for _ in range(3):
+            run_update(coord, stats=ConnectionError("down"))
+        assert coord.breaker.state == "open"
+
+    def test_open_breaker_skips_all_requests(self):
+        coord = make_coordinator()
+        self._trip(coord)
+        calls = []
+
+        async def stats():
+            calls.append("stats")
+            return []
+
+        with patch("custom_components.dnsdist.coordinator.monotonic", return_value=coord.breaker.retry_at - 1):
+            run_update(coord, stats=stats, config=stats, dynamic=stats)
+        assert calls == []
+
+    def test_half_open_probe_fetches_counters_only(self):
+        coord = make_coordinator()
+        self._trip(coord)
+        calls = []
+
+        def endpoint(name, value):
+            async def _fetch():
+                calls.append(name)
+                return value
+
+            return _fetch
+
+        with patch("custom_components.dnsdist.coordinator.monotonic", return_value=coord.breaker.retry_at + 1):
+            result = run_update(
+                coord,
+                stats=endpoint("stats", [{"name": "queries", "value": 5}]),
+                config=endpoint("config", {}),
+                dynamic=endpoint("dynamic", {}),
+            )
+        assert calls == ["stats"]
+        assert result[ATTR_QUERIES] == 5
+        assert coord.breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        coord = make_coordinator()
+        self._trip(coord)
+        with patch("custom_components.dnsdist.coordinator.monotonic", return_value=coord.breaker.retry_at + 1):
+            run_update(coord, stats=ConnectionError("still down"))
+        assert coord.breaker.state == "open"
+        assert coord.breaker.trips == 2
+
+
+class TestPollInstrumentation:
+    def test_statistics_fetch_records_latency_size_and_decode(self):
+        coord = make_coordinator()
+        body = json.dumps([{"name": "queries", "value": 1}])
+        session = MagicMock()
+        session.get = MagicMock(return_value=FakeResponse(body))
+        stats = asyncio.run(coord._async_fetch_statistics(session, {}))
+        assert stats == [{"name": "queries", "value": 1}]
+        assert coord.instrumentation.summary("statistics_bytes")["last"] == len(body)
+        assert coord.instrumentation.summary("statistics_latency_ms") is not None
+        assert coord.instrumentation.summary("statistics_decode_ms") is not None
+
+    def test_metrics_fetch_records_size(self):
+        coord = make_coordinator(use_prometheus=True)
+        session = MagicMock()
+        session.get = MagicMock(return_value=FakeResponse(METRICS_BODY))
+        asyncio.run(coord._async_fetch_metrics(session, {}))
+        assert coord.instrumentation.summary("metrics_bytes")["last"] == len(METRICS_BODY)
+
+    def test_streamed_config_records_size(self):
+        coord = make_coordinator()
+        body = json.dumps({"rules": [{"name": "a"}]})
+        session = MagicMock()
+        session.get = MagicMock(return_value=FakeResponse(body))
+        asyncio.run(coord._async_fetch_server_config(session, {}))
+        assert coord.instrumentation.summary("server_config_bytes")["last"] == len(body)
+        assert coord.instrumentation.summary("server_config_latency_ms") is not None
+
+    def test_poll_records_parse_steps(self):
+        coord = make_coordinator()
+        run_update(coord, stats=[{"name": "queries", "value": 1}], config={"rules": []})
+        series = coord.instrumentation.as_dict()
+        assert {"normalize_ms", "poll_ms", "server_config_parse_ms"} <= series.keys()
+
+    def test_failed_poll_records_no_parse_steps(self):
+        coord = make_coordinator()
+        run_update(coord, stats=ConnectionError("down"))
+        assert coord.instrumentation.summary("normalize_ms") is None
+
+
+class TestHistoryTiers:
+    def test_one_sample_per_bucket(self):
+        coord = make_coordinator(update_interval=30)
+        start = 1_700_000_000.0 - (1_700_000_000 % 3600)
+        for i in range(121):  # one hour of 30 s polls
+            coord._update_history(start + i * 30, i * 30)
+        assert len(coord._history_5m) == 13
+        assert coord._history_5m[0] == (start + 270, 270)
+        assert len(coord._history_1h) == 2
+        assert coord._history_1h[-1] == (start + 3600, 3600)
+
+    def test_tiers_are_bounded(self):
+        coord = make_coordinator()
+        assert coord._history_5m.maxlen == 7 * 24 * 12 + 1
+        assert coord._history_1h.maxlen == 90 * 24 + 1
+
+    def test_week_and_month_rates_from_tiers(self):
+        coord = make_coordinator(update_interval=30)
+        start = 1_700_000_000.0
+        # One query per second for 31 days, sampled every 5 minutes
+        now = start
+        for step in range(31 * 288 + 1):
+            now = start + step * 300
+            coord._update_history(now, int(now - start))
+        week, month = coord._compute_long_rates(now, int(now - start))
+        assert week == 7 * 86400
+        assert month == 30 * 86400
+
+    def test_rates_extrapolated_while_tier_is_short(self):
+        coord = make_coordinator(update_interval=30)
+        coord._update_history(0.0, 0)
+        coord._update_history(86400.0, 1000)
+        week, month = coord._compute_long_rates(86400.0, 1000)
+        assert week == 7000
+        assert month == 30000
+
+    def test_counter_reset_keeps_tiers(self):
+        coord = make_coordinator()
+        coord._update_history(0.0, 1000)
+        coord._update_history(600.0, 2000)
+        coord._update_history(900.0, 5)
+        assert list(coord._history_5m) == [(0.0, 1000), (600.0, 2000), (900.0, 2005)]
+        assert list(coord._history_1h) == [(900.0, 2005)]
+
+    def test_tiers_persist_and_reload(self, tmp_path):
+        coord = make_coordinator()
+        use_journal(coord, tmp_path / "history.journal")
+        now = float(int(time.time()))
+        coord._history_loaded = True
+        coord._update_history(now - 7200, 100)
+        coord._update_history(now, 500)
+        asyncio.run(coord._async_save_history())
+        assert list(coord._history_5m) == [(now - 7200, 100), (now, 500)]
+
+        restored = make_coordinator()
+        use_journal(restored, tmp_path / "history.journal")
+        asyncio.run(restored._async_ensure_history_loaded())
+        assert list(restored._history_1h) == list(coord._history_1h)
+        assert list(restored._history_5m) == list(coord._history_5m)
+
+
+class TestCounterRates:
+    def test_rates_per_counter(self):
+        coord = make_coordinator(update_interval=30)
+        for step in range(121):
+            now = step * 30.0
+            coord._update_history(now, step * 100, [step * (i + 1) for i in range(len(RATE_COUNTERS))])
+        counters = [120 * (i + 1) for i in range(len(RATE_COUNTERS))]
+        rates = coord._compute_counter_rates(now, counters)
+        assert rates["responses_per_minute"] == 2
+        assert rates["responses_per_hour"] == 120
+        assert rates["cache_misses_per_minute"] == 12
+        assert rates["cache_misses_per_hour"] == 720
+        assert coord._compute_rates(now, 12000) == (12000, 288000)
+
+    def test_rates_merged_into_update(self):
+        coord = make_coordinator()
+        coord._update_history(time.time() - 600, 0, [0] * len(RATE_COUNTERS))
+        stats = [
+            {"name": "queries", "value": 600},
+            {"name": "responses", "value": 600},
+            {"name": "drops", "value": 60},
+        ]
+
+        data = run_update(coord, stats=stats, config={}, dynamic={})
+        assert 59 <= data["responses_per_minute"] <= 60
+        assert 5 <= data["drops_per_minute"] <= 6
+        assert data["cache_hits_per_hour"] == 0
+
+    def test_legacy_history_is_backfilled(self, tmp_path):
+        coord = make_coordinator()
+        use_journal(coord, tmp_path / "history.journal")
+        now = float(int(time.time()))
+        payload = {"history": [[now - 120, 100], [now - 60, 200]]}
+        coord._history_store = MagicMock(async_load=AsyncMock(return_value=payload))
+        asyncio.run(coord._async_ensure_history_loaded())
+        assert list(coord._history)[0] == (now - 120, 100, 0, 0, 0, 0, 0, 0)
+
+        counters = [5000, 10, 0, 0, 0, 0]
+        coord._update_history(now, 300, counters)
+        rates = coord._compute_counter_rates(now, counters)
+        assert rates["responses_per_minute"] == 0
+        assert rates["responses_per_hour"] == 0
+        assert coord._compute_rates(now, 300)[0] == 3600 * 100 // 60
+
+    def test_full_width_history_persists(self, tmp_path):
+        coord = make_coordinator()
+        use_journal(coord, tmp_path / "history.journal")
+        now = float(int(time.time()))
+        coord._history_loaded = True
+        coord._update_history(now, 10, [1, 2, 3, 4, 5, 6])
+        asyncio.run(coord._async_save_history())
+
+        restored = make_coordinator()
+        use_journal(restored, tmp_path / "history.journal")
+        asyncio.run(restored._async_ensure_history_loaded())
+        assert list(restored._history) == [(now, 10, 1, 2, 3, 4, 5, 6)]
+        assert not restored._history_backfill
+
+    def test_poll_exposes_per_second_rates(self):
+        coord = make_coordinator()
+        with patch("custom_components.dnsdist.coordinator.monotonic", return_value=100.0):
+            run_update(coord, stats=[{"name": "queries", "value": 0}])
+        with patch("custom_components.dnsdist.coordinator.monotonic", return_value=110.0):
+            result = run_update(coord, stats=[{"name": "queries", "value": 250}, {"name": "drops", "value": 20}])
+        assert result["queries_per_second_1m"] == 25.0
+        assert result["queries_per_second_5m"] == 25.0
+        assert result["drops_per_second_1m"] == 2.0
+        assert result["downstream_errors_per_second_5m"] == 0.0
+
+    def test_poll_exposes_long_rates(self):
+        coord = make_coordinator()
+        result = run_update(coord, stats=[{"name": "queries", "value": 10}])
+        assert result[ATTR_REQ_PER_WEEK] == 0
+        assert result[ATTR_REQ_PER_MONTH] == 0
+
+
+class TestHistoryJournal:
+    def _save(self, coord):
+        coord._last_history_persist = None
+        asyncio.run(coord._async_save_history())
+
+    def test_saves_append_only_new_samples(self, tmp_path):
+        path = tmp_path / "history.journal"
+        coord = make_coordinator()
+        use_journal(coord, path)
+        coord._history_loaded = True
+        now = float(int(time.time()))
+        coord._update_history(now - 60, 100)
+        self._save(coord)
+        snapshot_size = path.stat().st_size
+
+        coord._update_history(now - 30, 200)
+        coord._update_history(now, 300)
+        self._save(coord)
+        assert coord._history_journal.records == 2
+        assert path.stat().st_size == snapshot_size + 2 * coord._history_journal._record_size
+
+        restored = make_coordinator()
+        use_journal(restored, path)
+        asyncio.run(restored._async_ensure_history_loaded())
+        assert list(restored._history) == list(coord._history)
+        assert list(restored._history_5m) == list(coord._history_5m)
+        assert not restored._journal_pending
+
+    def test_compacts_when_records_outgrow_history(self, tmp_path):
+        path = tmp_path / "history.journal"
+        coord = make_coordinator(update_interval=3600)  # 25 raw samples
+        use_journal(coord, path)
+        coord._history_loaded = True
+        now = time.time() - 86400
+        for step in range(40):
+            coord._update_history(now + step * 60, step)
+            self._save(coord)
+        assert coord._history_journal.records < coord._history.maxlen
+        assert path.stat().st_size < 60 * coord._history_journal._record_size
+
+    def test_replay_keeps_reset_offsets(self, tmp_path):
+        path = tmp_path / "history.journal"
+        coord = make_coordinator()
+        use_journal(coord, path)
+        coord._history_loaded = True
+        now = float(int(time.time()))
+        coord._update_history(now - 60, 1000)
+        self._save(coord)
+        coord._update_history(now, 5)
+        self._save(coord)
+
+        restored = make_coordinator()
+        use_journal(restored, path)
+        asyncio.run(restored._async_ensure_history_loaded())
+        assert [sample[:2] for sample in restored._history] == [(now - 60, 1000), (now, 1005)]
+        assert restored._counter_offsets[0] == 1000
+        assert restored._update_history(now + 30, 10)[0] == 1010
+
+    def test_legacy_store_is_migrated(self, tmp_path):
+        path = tmp_path / "history.journal"
+        coord = make_coordinator()
+        use_journal(coord, path)
+        now = float(int(time.time()))
+        payload = {"history": [[now - 60, 100]], "history_1h": [[now - 7200, 50]]}
+        coord._history_store = MagicMock(async_load=AsyncMock(return_value=payload), async_remove=AsyncMock())
+        asyncio.run(coord._async_ensure_history_loaded())
+        coord._update_history(now, 200)
+        self._save(coord)
+        coord._history_store.async_remove.assert_awaited_once()
+        assert coord._history_journal.records == 0
+
+        restored = make_coordinator()
+        use_journal(restored, path)
+        restored._history_store = MagicMock(async_load=AsyncMock())
+        asyncio.run(restored._async_ensure_history_loaded())
+        restored._history_store.async_load.assert_not_awaited()
+        assert [sample[:2] for sample in restored._history] == [(now - 60, 100), (now, 200)]
+        assert list(restored._history_1h) == [(now - 7200, 50), (now, 200)]
+
+    def test_reads_raw_snapshot_of_first_journal_version(self, tmp_path):
+        path = tmp_path / "history.journal"
+        now = float(int(time.time()))
+        coord = make_coordinator()
+        width = coord._history.width
+        raw = HistoryRing(10, [(now - 60, 100, *range(width - 1))], width=width)
+        with patch("custom_components.dnsdist.journal.JOURNAL_VERSION", 1):
+            HistoryJournal(str(path), width).compact([raw.to_bytes(), b"", b""])
+
+        use_journal(coord, path)
+        asyncio.run(coord._async_ensure_history_loaded())
+        assert list(coord._history) == list(raw)
+
+    def test_snapshot_much_smaller_than_json(self, tmp_path):
+        path = tmp_path / "history.journal"
+        coord = make_coordinator()
+        use_journal(coord, path)
+        coord._history_loaded = True
+        now = float(int(time.time())) - 86400
+        for step in range(2880):
+            coord._update_history(now + step * 30, 10**9 + step * 1500, [step * n for n in range(6)])
+        self._save(coord)
+
+        legacy = json.dumps({"history": [list(sample) for sample in coord._history]})
+        assert path.stat().st_size * 5 < len(legacy)
+
+
+class TestCounterResets:
+    def test_counter_regression_keeps_history_monotonic(self):
+        coord = make_coordinator()
+        coord._update_history(0.0, 1000, [100] * 6, uptime=500)
+        coord._update_history(30.0, 1300, [130] * 6, uptime=530)
+        stored = coord._update_history(60.0, 50, [5] * 6, uptime=10)
+        assert stored == (1350, *[135] * 6)
+        assert len(coord._history) == 3
+        assert coord._compute_rates(60.0, 1350)[0] == 350 * 60
+
+    def test_uptime_drop_detects_restart_without_regression(self):
+        coord = make_coordinator()
+        coord._update_history(0.0, 100, uptime=1000)
+        stored = coord._update_history(3600.0, 150, uptime=20)
+        assert stored[0] == 250
+        assert coord._counter_offsets[0] == 100
+
+    def test_single_counter_regression_offsets_every_column(self):
+        coord = make_coordinator()
+        coord._update_history(0.0, 100, [10, 20])
+        stored = coord._update_history(30.0, 120, [2, 25])
+        assert stored[:3] == (220, 12, 45)
+
+    def test_reset_state_survives_compaction(self, tmp_path):
+        path = tmp_path / "history.journal"
+        coord = make_coordinator()
+        use_journal(coord, path)
+        coord._history_loaded = True
+        now = float(int(time.time()))
+        coord._update_history(now - 60, 1000, uptime=900)
+        coord._update_history(now - 30, 10, uptime=5)
+        coord._history_journal.records = None  # force a snapshot
+        asyncio.run(coord._async_save_history())
+
+        restored = make_coordinator()
+        use_journal(restored, path)
+        asyncio.run(restored._async_ensure_history_loaded())
+        assert restored._last_uptime == 5
+        assert restored._last_raw[0] == 10
+        assert restored._update_history(now, 40, uptime=35)[0] == 1040
+
+    def test_poll_passes_uptime(self):
+        coord = make_coordinator()
+        run_update(coord, stats=[{"name": "queries", "value": 900}, {"name": "uptime", "value": 600}])
+        result = run_update(coord, stats=[{"name": "queries", "value": 950}, {"name": "uptime", "value": 3}])
+        assert coord._counter_offsets[0] == 900
+        assert coord._history[-1][1] == 1850
+        assert result[ATTR_QUERIES] == 950
+
+
+class TestDataSnapshot:
+    def _store(self, coord, stored=None):
+        store = MagicMock()
+        store.async_load = AsyncMock(return_value=stored)
+        coord._snapshot._store = store
+        return store
+
+    def test_restore_seeds_data_counters_and_structure(self):
+        coord = make_coordinator(retain_all_counters=True)
+        data = {
+            ATTR_QUERIES: 42,
+            ATTR_FILTERING_RULES: {"block-ads": {"name": "Block Ads", "matches": 3}},
+            ATTR_COUNTERS: [42, 1.5],
+        }
+        self._store(
+            coord,
+            {
+                "data": data,
+                "counter_names": ["queries", "latency-avg100"],
+                "counter_types": {"queries": "counter"},
+                "saved_at": time.time(),
+            },
+        )
+        assert asyncio.run(coord.async_restore_snapshot()) is True
+        assert coord.data is data
+        assert coord.counter_names == ["queries", "latency-avg100"]
+        assert coord.counter_types == {"queries": "counter"}
+        version = coord.structure_version
+        assert version > 0
+
+        # Unchanged rules on the first poll do not count as a structure change
+        coord._track_structure(ATTR_FILTERING_RULES, {"block-ads": {}})
+        assert coord.structure_version == version
+
+    def test_missing_or_stale_snapshot_is_ignored(self):
+        coord = make_coordinator()
+        self._store(coord, None)
+        assert asyncio.run(coord.async_restore_snapshot()) is False
+        self._store(coord, {"data": {ATTR_QUERIES: 1}, "saved_at": time.time() - 2 * 86400})
+        assert asyncio.run(coord.async_restore_snapshot()) is False
+        assert coord.data is None
+
+    def test_polls_schedule_one_spaced_save(self):
+        coord = make_coordinator()
+        store = self._store(coord)
+        stats = [{"name": "queries", "type": "counter", "value": 10}]
+        coord.data = run_update(coord, stats=stats)
+        run_update(coord, stats=stats)
+        store.async_delay_save.assert_called_once()
+        payload_fn, delay = store.async_delay_save.call_args.args
+        assert delay == 300
+        payload = payload_fn()
+        assert payload["data"] is coord.data
+        assert payload["saved_at"] > 0
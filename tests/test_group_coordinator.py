@@ -26,9 +26,12 @@
 """Tests for DnsdistGroupCoordinator aggregation logic."""
 
 import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from custom_components.dnsdist.group_coordinator import DnsdistGroupCoordinator
+from custom_components.dnsdist.registry import REGISTRY_KEY, async_get_member_registry
+from custom_components.dnsdist.utils import slugify_rule
 from custom_components.dnsdist.const import (
     ATTR_CACHE_HITS,
     ATTR_CACHE_HITRATE,
@@ -42,8 +45,10 @@ from custom_components.dnsdist.const import (
     ATTR_RESPONSES,
     ATTR_RULE_DROP,
     ATTR_SECURITY_STATUS,
+    ATTR_REQ_PER_HOUR,
     ATTR_UPTIME,
     DOMAIN,
+    RATE_COUNTERS,
 )
 
 
@@ -70,6 +75,7 @@ def make_group_coordinator(members=None):
 def make_member(name, data, success=True):
     c = MagicMock()
     c._name = name
+    c.cpu_weight = 1
     c.last_update_success = success
     c.data = data
     return c
@@ -94,8 +100,21 @@ def base_data(**overrides):
 
 
 def run_aggregation(coord, hass, members_map):
-    """Set hass.data and run _async_update_data, patching HA storage calls."""
-    hass.data[DOMAIN] = members_map
+    """Load members_map as the loaded entries and run _async_update_data.
+
+    Hosts are indexed in the shared registry, which is kept across calls, and
+    resolved again as the reload signal would do after entries load or unload;
+    HA storage calls are patched out.
+    """
+    registry = hass.data.get(DOMAIN, {}).get(REGISTRY_KEY)
+    hass.data[DOMAIN] = dict(members_map)
+    if registry is not None:
+        hass.data[DOMAIN][REGISTRY_KEY] = registry
+    registry = async_get_member_registry(hass)
+    for c in members_map.values():
+        if isinstance(getattr(c, "_name", None), str):
+            registry.async_add(c)
+    coord._resolved_members = None
     with (
         patch.object(coord, "_async_ensure_history_loaded", new_callable=AsyncMock),
         patch.object(coord, "_async_save_history", new_callable=AsyncMock),
@@ -296,3 +315,263 @@ class TestGroupAggregationDynamicRules:
         sources = result[ATTR_DYNAMIC_RULES][slug]["sources"]
         assert sources["h1"] == 3
         assert sources["h2"] == 7
+
+    def test_metadata_follows_member_updates(self):
+        coord, hass = make_group_coordinator(members=["h1"])
+        c1 = make_member(
+            "h1", base_data(**{ATTR_DYNAMIC_RULES: {"n": {"network": "10.0.0.1/32", "blocks": 3, "seconds": 60}}})
+        )
+        run_aggregation(coord, hass, {"e1": c1})
+
+        # Block count unchanged, only the remaining time moved on
+        c1.data = base_data(**{ATTR_DYNAMIC_RULES: {"n": {"network": "10.0.0.1/32", "blocks": 3, "seconds": 45}}})
+        result = run_aggregation(coord, hass, {"e1": c1})
+        entry = next(iter(result[ATTR_DYNAMIC_RULES].values()))
+        assert entry["seconds"] == 45
+        assert entry["blocks"] == 3
+
+
+class TestGroupIncrementalRules:
+    def test_member_change_updates_only_its_share(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        c1 = make_member("h1", base_data(**{ATTR_FILTERING_RULES: {"a": {"name": "Block Ads", "matches": 10}}}))
+        c2 = make_member("h2", base_data(**{ATTR_FILTERING_RULES: {"a": {"name": "Block Ads", "matches": 20}}}))
+        run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+
+        c2.data = base_data(**{ATTR_FILTERING_RULES: {"a": {"name": "Block Ads", "matches": 25}}})
+        with patch.object(coord._rules, "_apply", wraps=coord._rules._apply) as apply:
+            result = run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+        apply.assert_called_once()
+        assert result[ATTR_FILTERING_RULES]["block-ads"]["matches"] == 35
+        assert result[ATTR_FILTERING_RULES]["block-ads"]["sources"] == {"h1": 10, "h2": 25}
+
+    def test_unchanged_rule_tables_are_skipped(self):
+        coord, hass = make_group_coordinator(members=["h1"])
+        rules = {"a": {"name": "Block Ads", "matches": 10}}
+        c1 = make_member("h1", base_data(**{ATTR_FILTERING_RULES: rules}))
+        run_aggregation(coord, hass, {"e1": c1})
+
+        c1.data = base_data(queries=500, **{ATTR_FILTERING_RULES: rules})
+        with patch("custom_components.dnsdist.utils.slugify_rule") as slugify:
+            result = run_aggregation(coord, hass, {"e1": c1})
+        slugify.assert_not_called()
+        assert result[ATTR_FILTERING_RULES]["block-ads"]["matches"] == 10
+
+    def test_failed_member_is_withdrawn(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        c1 = make_member("h1", base_data(**{ATTR_DYNAMIC_RULES: {"x": {"network": "10.0.0.1/32", "blocks": 3}}}))
+        c2 = make_member("h2", base_data(**{ATTR_DYNAMIC_RULES: {"x": {"network": "10.0.0.1/32", "blocks": 7}}}))
+        run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+
+        c2.last_update_success = False
+        result = run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+        entry = result[ATTR_DYNAMIC_RULES]["10-0-0-1-32"]
+        assert entry["blocks"] == 3
+        assert entry["sources"] == {"h1": 3}
+
+    def test_overlapping_groups_share_member_partials(self):
+        site, hass = make_group_coordinator(members=["h1", "h2"])
+        everything, _ = make_group_coordinator(members=["h1", "h2", "h3"])
+        everything.hass = hass
+        rules = {"a": {"name": "Block Ads", "matches": 10}}
+        c1 = make_member("h1", base_data(queries=1, **{ATTR_FILTERING_RULES: rules}))
+        c2 = make_member("h2", base_data(queries=2, **{ATTR_FILTERING_RULES: rules}))
+        members = {"e1": c1, "e2": c2}
+
+        with patch("custom_components.dnsdist.utils.slugify_rule", wraps=slugify_rule) as slugify:
+            first = run_aggregation(site, hass, members)
+            second = run_aggregation(everything, hass, members)
+        assert slugify.call_count == 2
+        assert first[ATTR_QUERIES] == second[ATTR_QUERIES] == 3
+        assert second[ATTR_FILTERING_RULES]["block-ads"]["matches"] == 20
+
+    def test_previous_result_is_not_mutated(self):
+        coord, hass = make_group_coordinator(members=["h1"])
+        c1 = make_member("h1", base_data(**{ATTR_FILTERING_RULES: {"a": {"name": "Block Ads", "matches": 10}}}))
+        first = run_aggregation(coord, hass, {"e1": c1})
+
+        c1.data = base_data(**{ATTR_FILTERING_RULES: {"a": {"name": "Block Ads", "matches": 15}}})
+        run_aggregation(coord, hass, {"e1": c1})
+        assert first[ATTR_FILTERING_RULES]["block-ads"]["matches"] == 10
+
+
+class TestGroupCounterResets:
+    def test_member_restart_bridges_the_sum(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        coord._history_spacing = 0
+        c1 = make_member("h1", base_data(queries=1000))
+        c2 = make_member("h2", base_data(queries=1000))
+        run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+
+        c2.data = base_data(queries=10)
+        result = run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+        assert result[ATTR_QUERIES] == 1010
+        assert coord._history[-1][1] == 2000
+        assert len(coord._history) == 2
+
+    def test_member_leaving_and_rejoining_keeps_rates_flat(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        c1 = make_member("h1", base_data())
+        c2 = make_member("h2", base_data())
+        rates = []
+        for step in range(8):
+            # 100 queries a minute each; h2 has a long lifetime counter
+            c1.data = base_data(queries=1000 + step * 100)
+            c2.data = base_data(queries=50_000_000 + step * 100)
+            c2.last_update_success = step != 4
+            with patch("custom_components.dnsdist.group_coordinator.time.time", return_value=6000.0 + step * 60):
+                result = run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+            rates.append(result[ATTR_REQ_PER_HOUR])
+        # h2 missing from one aggregation only loses its share of two minutes
+        assert rates[1] == 12_000
+        assert max(rates[1:]) == 12_000
+        assert min(rates[1:]) >= 9_000
+        assert coord._history[-1][1] == 50_001_000 + 1200
+
+    def test_nested_group_follows_member_series(self):
+        coord, hass = make_group_coordinator(members=["h1", "site"])
+        c1 = make_member("h1", base_data(queries=100))
+        c1.traffic_counters = (100,) + (0,) * len(RATE_COUNTERS)
+        site = make_member("site", base_data(queries=1000))
+        site.traffic_counters = (5000,) + (0,) * len(RATE_COUNTERS)
+        run_aggregation(coord, hass, {"e1": c1, "e2": site})
+        # A member of the nested group came back: its sum jumps, its series does not
+        c1.data = base_data(queries=150)
+        c1.traffic_counters = (150,) + (0,) * len(RATE_COUNTERS)
+        site.data = base_data(queries=900_000)
+        site.traffic_counters = (5010,) + (0,) * len(RATE_COUNTERS)
+        result = run_aggregation(coord, hass, {"e1": c1, "e2": site})
+        assert result[ATTR_QUERIES] == 900_150
+        assert coord._history[-1][1] == 5100 + 60
+
+
+class TestGroupMemberListeners:
+    def test_has_no_timer_of_its_own(self):
+        coord, _ = make_group_coordinator()
+        assert coord.update_interval is None
+
+    def test_subscribes_to_members_on_aggregation(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        c1 = make_member("h1", base_data())
+        c2 = make_member("h2", base_data())
+        other = make_member("other", base_data())
+        run_aggregation(coord, hass, {"e1": c1, "e2": c2, "e3": other, "_services_registered": True})
+        c1.async_add_listener.assert_called_once_with(coord._handle_member_update)
+        c2.async_add_listener.assert_called_once_with(coord._handle_member_update)
+        other.async_add_listener.assert_not_called()
+
+        run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+        c1.async_add_listener.assert_called_once()
+
+    def test_drops_unloaded_members(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        c1 = make_member("h1", base_data())
+        c2 = make_member("h2", base_data())
+        run_aggregation(coord, hass, {"e1": c1, "e2": c2})
+        unsub = c2.async_add_listener.return_value
+
+        async_get_member_registry(hass).async_remove(c2)
+        with patch.object(coord, "async_request_refresh", new=MagicMock()):
+            coord._handle_reload_signal()
+        unsub.assert_called_once()
+
+        coord.async_unsubscribe_members()
+        c1.async_add_listener.return_value.assert_called_once()
+        assert not coord._member_unsubs
+
+    def test_members_resolved_once_until_reload(self):
+        coord, hass = make_group_coordinator(members=["h1", "h2"])
+        c1 = make_member("h1", base_data(queries=10))
+        run_aggregation(coord, hass, {"e1": c1})
+        registry = async_get_member_registry(hass)
+        c2 = make_member("h2", base_data(queries=20))
+        registry.async_add(c2)
+        with patch.object(registry, "get", wraps=registry.get) as lookup:
+            assert coord._member_coordinators() == [c1]
+            lookup.assert_not_called()
+
+            with patch.object(coord, "async_request_refresh", new=MagicMock()):
+                coord._handle_reload_signal()
+            assert coord._member_coordinators() == [c1, c2]
+            assert lookup.call_count == 2
+
+    def test_member_update_requests_refresh(self):
+        coord, hass = make_group_coordinator()
+        with patch.object(coord, "async_request_refresh", new=MagicMock()) as refresh:
+            coord._handle_member_update()
+        refresh.assert_called_once()
+        hass.async_create_task.assert_called_once_with(refresh.return_value)
+
+    def test_one_history_sample_per_interval(self):
+        coord, hass = make_group_coordinator(members=["h1"])
+        c1 = make_member("h1", base_data(queries=0))
+        with patch("custom_components.dnsdist.group_coordinator.time.time", return_value=3000.0):
+            run_aggregation(coord, hass, {"e1": c1})
+        for step, now in enumerate((3010.0, 3020.0, 3031.0), start=1):
+            c1.data = base_data(queries=step * 100)
+            with patch("custom_components.dnsdist.group_coordinator.time.time", return_value=now):
+                run_aggregation(coord, hass, {"e1": c1})
+        assert [sample[:2] for sample in coord._history] == [(3020.0, 200), (3031.0, 300)]
+
+
+class TestNestedGroups:
+    def test_group_of_groups_sums_children(self):
+        site_a, hass = make_group_coordinator(members=["h1", "h2"])
+        site_b, _ = make_group_coordinator(members=["h3"])
+        region, _ = make_group_coordinator(members=["site-a", "site-b"])
+        site_b.hass = region.hass = hass
+        site_a._name, site_b._name = "site-a", "site-b"
+
+        hosts = {
+            "e1": make_member("h1", base_data(queries=100, cpu=10.0, uptime=50, security_status="ok")),
+            "e2": make_member("h2", base_data(queries=200, cpu=20.0, uptime=70, security_status="warning")),
+            "e3": make_member("h3", base_data(queries=300, cpu=60.0, uptime=60, security_status="ok")),
+        }
+        site_a.data = run_aggregation(site_a, hass, hosts)
+        site_b.data = run_aggregation(site_b, hass, hosts)
+        assert site_a.cpu_weight == 2
+
+        result = run_aggregation(region, hass, {**hosts, "ga": site_a, "gb": site_b})
+        assert result[ATTR_QUERIES] == 600
+        assert result[ATTR_CPU] == 30.0
+        assert result[ATTR_UPTIME] == 70
+        assert result[ATTR_SECURITY_STATUS] == "warning"
+        assert region.cpu_weight == 3
+
+    def test_child_rules_are_merged_with_the_child_as_source(self):
+        site, hass = make_group_coordinator(members=["h1", "h2"])
+        region, _ = make_group_coordinator(members=["site", "h3"])
+        region.hass = hass
+        site._name = "site"
+        rules = {"a": {"name": "Block Ads", "matches": 5}}
+        hosts = {
+            "e1": make_member("h1", base_data(**{ATTR_FILTERING_RULES: rules})),
+            "e2": make_member("h2", base_data(**{ATTR_FILTERING_RULES: rules})),
+            "e3": make_member("h3", base_data(**{ATTR_FILTERING_RULES: rules})),
+        }
+        site.data = run_aggregation(site, hass, hosts)
+
+        result = run_aggregation(region, hass, {**hosts, "g": site})
+        entry = result[ATTR_FILTERING_RULES]["block-ads"]
+        assert entry["matches"] == 15
+        assert entry["sources"] == {"site": 10, "h3": 5}
+
+
+class TestGroupDataSnapshot:
+    def test_restored_data_served_until_members_report(self):
+        coord, hass = make_group_coordinator(members=["h1"])
+        coord._snapshot._store = store = MagicMock()
+        store.async_load = AsyncMock(
+            return_value={"data": base_data(queries=77), "cpu_weight": 2, "saved_at": time.time()}
+        )
+        assert asyncio.run(coord.async_restore_snapshot()) is True
+        assert coord.data[ATTR_QUERIES] == 77
+        assert coord.cpu_weight == 2
+
+        result = run_aggregation(coord, hass, {})
+        assert result[ATTR_QUERIES] == 77
+
+        result = run_aggregation(coord, hass, {"e1": make_member("h1", base_data(queries=5))})
+        assert result[ATTR_QUERIES] == 5
+        payload_fn = store.async_delay_save.call_args.args[0]
+        assert payload_fn()["data"] is result
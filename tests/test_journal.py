@@ -0,0 +1,120 @@
+# Copyright (c) 2025, Renaud Allard <renaud@allard.it>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Tests for the binary history journal."""
+
+import os
+
+import pytest
+
+from custom_components.dnsdist.journal import HistoryJournal
+from custom_components.dnsdist.utils import HistoryRing
+
+
+def make_journal(tmp_path, width=2):
+    journal = HistoryJournal(str(tmp_path / "history.journal"), width)
+    ring = HistoryRing(4, [(1.0, 10, 1), (2.0, 20, 2)], width=width)
+    tier = HistoryRing(4, [(0.0, 5)])
+    journal.compact([ring.to_bytes(), tier.to_bytes()])
+    return journal
+
+
+class TestHistoryJournal:
+    def test_missing_file(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / "absent"), 1)
+        assert journal.load() is None
+        assert journal.records is None
+
+    def test_snapshot_and_appended_records(self, tmp_path):
+        journal = make_journal(tmp_path)
+        journal.append([(3.0, 30, 3), (4.0, 40, 4)])
+        assert journal.records == 2
+
+        reopened = HistoryJournal(journal.path, 2)
+        blobs, samples = reopened.load()
+        assert list(HistoryRing.from_bytes(blobs[0], 4, width=2)) == [(1.0, 10, 1), (2.0, 20, 2)]
+        assert list(HistoryRing.from_bytes(blobs[1], 4)) == [(0.0, 5)]
+        assert samples == [(3.0, 30, 3), (4.0, 40, 4)]
+        assert reopened.records == 2
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        journal = make_journal(tmp_path)
+        journal.append([(3.0, 30, 3), (4.0, 40, 4)])
+        size = os.path.getsize(journal.path)
+        os.truncate(journal.path, size - 5)
+
+        reopened = HistoryJournal(journal.path, 2)
+        _, samples = reopened.load()
+        assert samples == [(3.0, 30, 3)]
+        assert os.path.getsize(journal.path) == size - reopened._record_size
+        reopened.append([(5.0, 50, 5)])
+        assert HistoryJournal(journal.path, 2).load()[1] == [(3.0, 30, 3), (5.0, 50, 5)]
+
+    def test_corrupt_record_stops_replay(self, tmp_path):
+        journal = make_journal(tmp_path)
+        journal.append([(3.0, 30, 3), (4.0, 40, 4)])
+        with open(journal.path, "r+b") as file:
+            file.seek(-journal._record_size - 2, os.SEEK_END)
+            file.write(b"\xff")
+        assert HistoryJournal(journal.path, 2).load()[1] == []
+
+    def test_other_width_loads_but_needs_compaction(self, tmp_path):
+        journal = make_journal(tmp_path)
+        journal.append([(3.0, 30, 3)])
+        wider = HistoryJournal(journal.path, 3)
+        assert wider.load()[1] == [(3.0, 30, 3)]
+        assert wider.loaded_width == 2
+        assert wider.records is None
+
+    def test_rejects_corrupt_snapshot(self, tmp_path):
+        journal = make_journal(tmp_path)
+        with open(journal.path, "r+b") as file:
+            file.seek(20)
+            file.write(b"\xff\xff")
+        assert HistoryJournal(journal.path, 2).load() is None
+
+    def test_append_requires_snapshot(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / "history.journal"), 1)
+        with pytest.raises(RuntimeError):
+            journal.append([(1.0, 1)])
+
+    def test_compact_replaces_records(self, tmp_path):
+        journal = make_journal(tmp_path)
+        journal.append([(3.0, 30, 3)])
+        journal.compact([b""])
+        assert journal.records == 0
+        assert journal.load() == ([b""], [])
+        assert not os.path.exists(f"{journal.path}.tmp")
+
+    def test_needs_compaction(self, tmp_path):
+        journal = HistoryJournal(str(tmp_path / "history.journal"), 1)
+        assert journal.needs_compaction(0, 100)
+        journal.compact([b"\x00" * 100_000])
+        assert not journal.needs_compaction(99, 100)
+        assert journal.needs_compaction(101, 100)
+        journal.snapshot_size = 0
+        assert journal.needs_compaction(99, 10_000) is (99 * journal._record_size > 64 * 1024)
+        assert journal.needs_compaction(5000, 10_000)
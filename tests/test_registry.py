@@ -0,0 +1,71 @@
+# Copyright (c) 2025, Renaud Allard <renaud@allard.it>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for the name-keyed member registry."""
+
+from types import SimpleNamespace
+
+from custom_components.dnsdist.const import DOMAIN
+from custom_components.dnsdist.registry import REGISTRY_KEY, DnsdistMemberRegistry, async_get_member_registry
+
+
+class TestMemberRegistry:
+    def test_lookup_by_name(self):
+        registry = DnsdistMemberRegistry()
+        host = SimpleNamespace(_name="h1")
+        registry.async_add(host)
+        assert registry.get("h1") is host
+        assert registry.get("h2") is None
+        assert len(registry) == 1
+
+    def test_remove_keeps_a_newer_host_with_the_same_name(self):
+        registry = DnsdistMemberRegistry()
+        old, new = SimpleNamespace(_name="h1"), SimpleNamespace(_name="h1")
+        registry.async_add(old)
+        registry.async_add(new)
+        registry.async_remove(old)
+        assert registry.get("h1") is new
+        registry.async_remove(new)
+        assert registry.get("h1") is None
+
+    def test_shared_per_hass(self):
+        hass = SimpleNamespace(data={})
+        registry = async_get_member_registry(hass)
+        assert async_get_member_registry(hass) is registry
+        assert hass.data[DOMAIN][REGISTRY_KEY] is registry
+
+    def test_partial_rebuilt_only_when_data_changes(self):
+        registry = DnsdistMemberRegistry()
+        host = SimpleNamespace(_name="h1", data={"queries": 5}, cpu_weight=1, traffic_counters=())
+        registry.async_add(host)
+        partial = registry.partial(host)
+        assert registry.partial(host) is partial
+
+        host.data = {"queries": 7}
+        assert registry.partial(host).totals["queries"] == 7
+
+        registry.async_remove(host)
+        registry.async_add(host)
+        assert registry.partial(host) is not partial
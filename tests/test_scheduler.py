@@ -0,0 +1,171 @@
+# Copyright (c) 2025, Renaud Allard <renaud@allard.it>
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests for the fleet-wide poll scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.dnsdist.scheduler import DnsdistPollScheduler, next_slot
+from custom_components.dnsdist.utils import PollInstrumentation
+
+
+class FakeHost:
+    """Stand-in coordinator recording how many polls overlap."""
+
+    def __init__(self, name, interval, tracker, duration=0.0):
+        self._name = name
+        self._update_interval_s = interval
+        self.update_interval = interval
+        self.instrumentation = PollInstrumentation()
+        self.polls = 0
+        self._tracker = tracker
+        self._duration = duration
+
+    async def async_refresh(self):
+        self._tracker["active"] += 1
+        self._tracker["peak"] = max(self._tracker["peak"], self._tracker["active"])
+        self.polls += 1
+        await asyncio.sleep(self._duration)
+        self._tracker["active"] -= 1
+
+
+def make_scheduler(max_concurrent=8):
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(loop=loop, async_create_background_task=lambda coro, name: loop.create_task(coro))
+    return DnsdistPollScheduler(hass, max_concurrent=max_concurrent)
+
+
+class TestNextSlot:
+    def test_next_slot_after_now(self):
+        assert next_slot(100.0, 30, 0) == 120.0
+        assert next_slot(100.0, 30, 15) == 105.0
+        assert next_slot(105.0, 30, 15) == 135.0
+
+
+class TestPhases:
+    def test_hosts_spread_evenly_and_deterministically(self):
+        async def run():
+            scheduler = make_scheduler()
+            tracker = {"active": 0, "peak": 0}
+            for entry_id in ("c", "a", "b"):
+                scheduler.async_add(entry_id, FakeHost(entry_id, 30, tracker))
+            # A host on another interval is phased independently
+            scheduler.async_add("d", FakeHost("d", 60, tracker))
+            return {name: info["phase"] for name, info in scheduler.as_dict()["hosts"].items()}
+
+        assert asyncio.run(run()) == {"a": 0.0, "b": 10.0, "c": 20.0, "d": 0.0}
+
+    def test_removal_rephases_remaining_hosts(self):
+        async def run():
+            scheduler = make_scheduler()
+            tracker = {"active": 0, "peak": 0}
+            remove_a = scheduler.async_add("a", FakeHost("a", 30, tracker))
+            scheduler.async_add("b", FakeHost("b", 30, tracker))
+            remove_a()
+            return scheduler.as_dict()["hosts"]
+
+        assert asyncio.run(run()) == {"b": {"interval": 30.0, "phase": 0.0}}
+
+    def test_coordinator_timer_disabled(self):
+        async def run():
+            host = FakeHost("a", 30, {"active": 0, "peak": 0})
+            make_scheduler().async_add("a", host)
+            return host.update_interval
+
+        assert asyncio.run(run()) is None
+
+
+class TestPolling:
+    def test_concurrency_capped_and_lag_recorded(self):
+        async def run():
+            scheduler = make_scheduler(max_concurrent=1)
+            tracker = {"active": 0, "peak": 0}
+            hosts = [FakeHost(f"h{i}", 0.05, tracker, duration=0.03) for i in range(3)]
+            removals = [scheduler.async_add(host._name, host) for host in hosts]
+            await asyncio.sleep(0.2)
+            for remove in removals:
+                remove()
+            return scheduler, hosts, tracker
+
+        scheduler, hosts, tracker = asyncio.run(run())
+        assert tracker["peak"] == 1
+        assert all(host.polls >= 1 for host in hosts)
+        assert scheduler.instrumentation.summary("schedule_lag_ms")["samples"] >= 3
+        assert hosts[0].instrumentation.summary("schedule_lag_ms") is not None
+
+    def test_async_remove_cancels_queued_poll(self):
+        async def run():
+            scheduler = make_scheduler(max_concurrent=1)
+            tracker = {"active": 0, "peak": 0}
+            busy = FakeHost("busy", 0.05, tracker, duration=0.5)
+            queued = FakeHost("queued", 0.05, tracker)
+            remove_busy = scheduler.async_add("busy", busy, poll_now=True)
+            scheduler.async_add("queued", queued)
+            # The busy host holds the semaphore, so the queued host's poll waits on it
+            await asyncio.sleep(0.06)
+            task = scheduler._hosts["queued"].task
+            assert task is not None and not task.done()
+            await scheduler.async_remove("queued")
+            assert task.cancelled()
+            assert "queued" not in scheduler.as_dict()["hosts"]
+            await scheduler.async_remove("queued")
+            remove_busy()
+            await scheduler.async_remove("busy")
+            return queued
+
+        assert asyncio.run(run()).polls == 0
+
+    def test_slow_host_slot_skipped_not_stacked(self):
+        async def run():
+            scheduler = make_scheduler()
+            tracker = {"active": 0, "peak": 0}
+            host = FakeHost("slow", 0.02, tracker, duration=0.09)
+            remove = scheduler.async_add("slow", host)
+            await asyncio.sleep(0.1)
+            remove()
+            return scheduler, tracker
+
+        scheduler, tracker = asyncio.run(run())
+        assert tracker["peak"] == 1
+        assert scheduler.skipped >= 1
+
+    def test_poll_now_runs_first_poll_through_scheduler(self):
+        async def run():
+            scheduler = make_scheduler()
+            tracker = {"active": 0, "peak": 0}
+            host = FakeHost("restored", 0.02, tracker, duration=0.07)
+            scheduler.async_add("restored", host, poll_now=True)
+            await asyncio.sleep(0.01)
+            assert host.polls == 1
+            # Slots falling due during the first poll are skipped, not stacked
+            await asyncio.sleep(0.05)
+            await scheduler.async_remove("restored")
+            return scheduler, host, tracker
+
+        scheduler, host, tracker = asyncio.run(run())
+        assert tracker["peak"] == 1
+        assert host.polls == 1
+        assert scheduler.skipped >= 1
@@ -25,9 +25,32 @@
 
 """Tests for utility functions."""
 
+import json
+import math
+import zlib
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.dnsdist.const import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN
 from custom_components.dnsdist.utils import (
+    CircuitBreaker,
+    EwmaRates,
+    HistoryRing,
+    JsonArrayExtractor,
+    MemberPartial,
+    PollInstrumentation,
+    RuleAggregate,
+    RuleContribution,
+    SlugCache,
+    StructureTracker,
     coerce_int,
     compute_window_total,
+    group_dependency_order,
+    group_leaf_hosts,
+    group_members_by_name,
+    parse_prometheus_line,
     slugify_rule,
 )
 
@@ -85,6 +108,31 @@ class TestSlugifyRule:
     def test_special_characters(self):
         assert slugify_rule("Rule #1 (main)") == "rule-1-main"
 
+    def test_fallback_is_stable_across_runs(self):
+        assert slugify_rule("!!!") == f"rule-{zlib.crc32(b'!!!') & 0xFFFF:x}"
+        assert slugify_rule("???") != slugify_rule("!!!")
+
+
+class TestSlugCache:
+    def test_recurring_names_hit_whatever_their_count(self):
+        cache = SlugCache()
+        names = [f"Rule {i}" for i in range(10_000)]
+        for _ in range(3):
+            assert [cache.slugify(name) for name in names] == [slugify_rule(name) for name in names]
+            cache.prune()
+        assert cache.as_dict() == {"hits": 20_000, "misses": 10_000, "size": 10_000}
+
+    def test_prune_drops_names_gone_from_the_table(self):
+        cache = SlugCache()
+        cache.slugify("Old")
+        cache.slugify("Kept")
+        cache.prune()
+        cache.slugify("Kept")
+        cache.prune()
+        assert cache.as_dict()["size"] == 1
+        cache.slugify("Old")
+        assert cache.misses == 3
+
 
 class TestComputeWindowTotal:
     """Tests for compute_window_total function."""
@@ -155,3 +203,474 @@ class TestComputeWindowTotal:
         history = [(0.0, 0)]
         # 24 hour window
         assert compute_window_total(history, 86400.0, 86400, 1000) == 1000
+
+    def test_ring_matches_list_for_every_horizon(self):
+        # Wrapped ring: the boundary search must cross the physical seam
+        ring = HistoryRing(50)
+        for i in range(80):
+            ring.append((i * 10.0, i * 7))
+        samples = list(ring)
+        for window in range(0, 900, 5):
+            assert compute_window_total(ring, 790.0, window, 600) == compute_window_total(
+                samples, 790.0, window, 600
+            ), window
+
+    def test_lookup_cost_is_logarithmic(self):
+        class CountingList(list):
+            reads = 0
+
+            def __getitem__(self, index):
+                CountingList.reads += 1
+                return super().__getitem__(index)
+
+        for size in (100, 17281):
+            history = CountingList((i * 5.0, i) for i in range(size))
+            CountingList.reads = 0
+            compute_window_total(history, size * 5.0, 3600, size)
+            # bisect plus the handful of direct reads around the boundary
+            assert CountingList.reads <= 20, size
+
+
+class TestStructureTracker:
+    """Tests for StructureTracker."""
+
+    def test_first_call_is_changed(self):
+        tracker = StructureTracker(SimpleNamespace(structure_version=0))
+        assert tracker.unchanged() is False
+
+    def test_same_version_is_unchanged(self):
+        coord = SimpleNamespace(structure_version=3)
+        tracker = StructureTracker(coord)
+        tracker.unchanged()
+        assert tracker.unchanged() is True
+        coord.structure_version = 4
+        assert tracker.unchanged() is False
+
+    def test_coordinator_without_version_always_changed(self):
+        tracker = StructureTracker(SimpleNamespace())
+        assert tracker.unchanged() is False
+        assert tracker.unchanged() is False
+
+
+class TestGroupDependencyOrder:
+    def test_children_come_first(self):
+        groups = {"global": ["eu", "us"], "eu": ["h1", "h2"], "us": ["h3"]}
+        order = group_dependency_order(groups)
+        assert order.index("eu") < order.index("global")
+        assert order.index("us") < order.index("global")
+        assert sorted(order) == ["eu", "global", "us"]
+
+    def test_cycle_is_rejected(self):
+        groups = {"a": ["b"], "b": ["c", "h1"], "c": ["a"]}
+        with pytest.raises(ValueError, match="a -> b -> c -> a"):
+            group_dependency_order(groups)
+
+    def test_self_membership_is_a_cycle(self):
+        with pytest.raises(ValueError):
+            group_dependency_order({"a": ["a"]})
+
+    def test_roots_limit_the_check(self):
+        groups = {"site": ["h1"], "x": ["y"], "y": ["x"]}
+        assert group_dependency_order(groups, ["site"]) == ["site"]
+
+    def test_leaf_hosts_expand_nested_groups(self):
+        groups = {"global": ["eu", "h3"], "eu": ["h1", "h2"]}
+        assert sorted(group_leaf_hosts(groups, "global")) == ["h1", "h2", "h3"]
+
+    @pytest.mark.parametrize(
+        "groups",
+        [
+            {"global": ["eu", "h1"], "eu": ["h1", "h2"]},
+            {"global": ["eu", "us"], "eu": ["h1"], "us": ["h1", "h2"]},
+            {"global": ["eu", "us"], "eu": ["core"], "us": ["core"], "core": ["h1"]},
+        ],
+    )
+    def test_shared_members_are_rejected(self, groups):
+        with pytest.raises(ValueError, match="Group global reaches"):
+            group_leaf_hosts(groups, "global")
+
+    def test_group_members_by_name(self):
+        entries = [
+            SimpleNamespace(title="h1", data={"name": "h1", "host": "10.0.0.1"}),
+            SimpleNamespace(title="Site", data={"is_group": True, "members": ["h1"]}),
+        ]
+        assert group_members_by_name(entries) == {"Site": ["h1"]}
+
+
+def rule_contribution(rules):
+    return RuleContribution(rules, "name", "matches", "Unnamed Rule")
+
+
+class TestRuleAggregate:
+    def make(self):
+        agg = RuleAggregate("name", "matches", ("action",))
+        return agg, lambda member, rules: agg.update(member, rule_contribution(rules))
+
+    def test_sums_members_and_merges_same_slug(self):
+        agg, update = self.make()
+        update("h1", {"a": {"name": "Block Ads", "matches": 4}, "b": {"name": "block ads", "matches": 1}})
+        update("h2", {"a": {"name": "Block Ads", "matches": 5, "action": "Drop"}})
+        entry = agg.as_dict()["block-ads"]
+        assert entry["matches"] == 10
+        assert entry["sources"] == {"h1": 5, "h2": 5}
+        assert entry["action"] == "Drop"
+
+    def test_update_replaces_previous_contribution(self):
+        agg, update = self.make()
+        update("h1", {"a": {"name": "A", "matches": 4}, "b": {"name": "B", "matches": 2}})
+        update("h2", {"a": {"name": "A", "matches": 1}})
+        update("h1", {"a": {"name": "A", "matches": 6}})
+        table = agg.as_dict()
+        assert table["a"]["matches"] == 7
+        assert "b" not in table
+
+    def test_same_contribution_is_a_no_op(self):
+        agg, _ = self.make()
+        contribution = rule_contribution({"a": {"name": "A", "matches": 4}})
+        assert agg.update("h1", contribution) is True
+        assert agg.update("h1", contribution) is False
+
+    def test_metadata_follows_sources(self):
+        agg, update = self.make()
+        update("h1", {"a": {"name": "A", "matches": 4, "action": "Drop"}})
+        update("h2", {"a": {"name": "A", "matches": 1, "action": "Refused"}})
+        assert agg.as_dict()["a"]["action"] == "Drop"
+        # Same count, new metadata
+        update("h1", {"a": {"name": "A", "matches": 4, "action": "Truncate"}})
+        assert agg.as_dict()["a"]["action"] == "Truncate"
+        agg.discard("h1")
+        assert agg.as_dict()["a"]["action"] == "Refused"
+        update("h2", {"a": {"name": "A", "matches": 1}})
+        assert "action" not in agg.as_dict()["a"]
+
+    def test_discard_removes_orphaned_entries(self):
+        agg, update = self.make()
+        update("h1", {"a": {"name": "A", "matches": 4}})
+        update("h2", {"a": {"name": "A", "matches": 1}, "c": {"name": "C", "matches": 0}})
+        agg.discard("h2")
+        assert agg.as_dict() == {"a": {"name": "A", "matches": 4, "sources": {"h1": 4}}}
+        assert agg.members() == {"h1"}
+
+
+class TestMemberPartial:
+    def test_normalizes_scalars(self):
+        partial = MemberPartial("h1", {"queries": "12", "drops": None, "cpu": "bad", "uptime": 9.5})
+        assert partial.totals["queries"] == 12
+        assert partial.totals["drops"] == 0
+        assert partial.cpu is None
+        assert partial.uptime == 9
+        assert partial.security == "unknown"
+
+    def test_unchanged_rule_tables_are_carried_over(self):
+        rules = {"a": {"name": "A", "matches": 1}}
+        first = MemberPartial("h1", {"filtering_rules": rules, "dynamic_rules": {}})
+        second = MemberPartial("h1", {"filtering_rules": rules, "dynamic_rules": {}}, first)
+        assert second.rules is first.rules
+        assert second.dynamic is not first.dynamic
+
+    def test_changed_rule_tables_reuse_label_slugs(self):
+        first = MemberPartial("h1", {"filtering_rules": {"a": {"name": "A", "matches": 1}}})
+        with patch("custom_components.dnsdist.utils.slugify_rule", wraps=slugify_rule) as slugify:
+            second = MemberPartial(
+                "h1", {"filtering_rules": {"a": {"name": "A", "matches": 2}, "b": {"name": "B"}}}, first
+            )
+        assert slugify.call_count == 1
+        assert second.rules.slugs == {"A": "a", "B": "b"}
+
+
+class TestParsePrometheusLine:
+    """Tests for parse_prometheus_line function."""
+
+    def test_plain_sample(self):
+        assert parse_prometheus_line("dnsdist_queries 1234\n") == ("dnsdist_queries", {}, 1234.0)
+
+    def test_labelled_sample(self):
+        name, labels, value = parse_prometheus_line('dnsdist_server_queries{server="ns1",address="10.0.0.1:53"} 7')
+        assert name == "dnsdist_server_queries"
+        assert labels == {"server": "ns1", "address": "10.0.0.1:53"}
+        assert value == 7.0
+
+    def test_comments_and_blank_lines_skipped(self):
+        assert parse_prometheus_line("# HELP dnsdist_queries Number of queries") is None
+        assert parse_prometheus_line("# TYPE dnsdist_queries counter") is None
+        assert parse_prometheus_line("   ") is None
+
+    def test_special_float_values(self):
+        assert parse_prometheus_line("dnsdist_latency_sum +Inf")[2] == float("inf")
+
+    def test_unparseable_value_returns_none(self):
+        assert parse_prometheus_line("dnsdist_queries abc") is None
+
+
+SERVER_CONFIG_DOC = {
+    "daemon_type": "dnsdist",
+    "config": [{"name": "allow-from", "value": 'tricky "}], value'}],
+    "rules": [{"id": i, "uuid": f"u{i}", "rule": "qname in a.example.", "matches": i} for i in range(25)],
+    "statistics": [{"name": "queries", "value": 1.5}],
+    "servers": [{"address": "10.0.0.1:53", "pools": ["", "edge"], "state": "up"}],
+    "version": "1.9.0",
+    "zones": None,
+}
+
+
+class TestJsonArrayExtractor:
+    """Tests for JsonArrayExtractor."""
+
+    def _extract(self, text, step, keys=("rules", "servers")):
+        extractor = JsonArrayExtractor(keys)
+        for start in range(0, len(text), step):
+            extractor.feed(text[start : start + step])
+        return extractor.finish()
+
+    @pytest.mark.parametrize("step", [1, 2, 7, 100, 1 << 20])
+    def test_matches_full_parse_for_any_chunking(self, step):
+        result = self._extract(json.dumps(SERVER_CONFIG_DOC), step)
+        assert result == {"rules": SERVER_CONFIG_DOC["rules"], "servers": SERVER_CONFIG_DOC["servers"]}
+
+    def test_unwanted_keys_are_not_materialized(self):
+        result = self._extract(json.dumps(SERVER_CONFIG_DOC), 3)
+        assert "config" not in result
+        assert "statistics" not in result
+
+    def test_non_array_value_decoded_whole(self):
+        text = '{"rules": {"rules": [1, 2]}, "servers": 5}'
+        assert self._extract(text, 1) == {"rules": {"rules": [1, 2]}, "servers": 5}
+
+    def test_trailing_scalar_at_chunk_edge(self):
+        assert self._extract('{"servers": [12, 345]}', 4, keys=("servers",)) == {"servers": [12, 345]}
+
+    @pytest.mark.parametrize(
+        ("text", "split", "expected"),
+        [
+            ('{"rules": [1, -2.5]}', len('{"rules": [1, -2.'), [1, -2.5]),
+            ('{"rules": [1e5]}', len('{"rules": [1e'), [1e5]),
+            ('{"rules": [2E+3, 7]}', len('{"rules": [2E+'), [2e3, 7]),
+        ],
+    )
+    def test_number_cut_at_chunk_boundary(self, text, split, expected):
+        extractor = JsonArrayExtractor(("rules",))
+        extractor.feed(text[:split])
+        extractor.feed(text[split:])
+        assert extractor.finish() == {"rules": expected}
+
+    def test_truncated_document_raises(self):
+        extractor = JsonArrayExtractor(("rules",))
+        extractor.feed('{"rules": [{"id": 1}, {"id"')
+        with pytest.raises(ValueError):
+            extractor.finish()
+
+    def test_non_object_document_raises(self):
+        with pytest.raises(ValueError):
+            JsonArrayExtractor(("rules",)).feed("[1, 2]")
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_threshold_failures(self):
+        breaker = CircuitBreaker(30, threshold=3, jitter=0)
+        assert breaker.record_failure(0) is False
+        assert breaker.record_failure(30) is False
+        assert breaker.state == BREAKER_CLOSED
+        assert breaker.record_failure(60) is True
+        assert breaker.state == BREAKER_OPEN
+        assert breaker.retry_in(60) == 30
+
+    def test_blocks_until_backoff_then_half_opens(self):
+        breaker = CircuitBreaker(30, threshold=1, jitter=0)
+        breaker.record_failure(0)
+        assert breaker.allow(29) is False
+        assert breaker.allow(30) is True
+        assert breaker.state == BREAKER_HALF_OPEN
+
+    def test_failed_probe_doubles_backoff_up_to_cap(self):
+        breaker = CircuitBreaker(30, threshold=1, max_delay=100, jitter=0)
+        breaker.record_failure(0)
+        delays = []
+        now = 0.0
+        for _ in range(4):
+            now = breaker.retry_at
+            assert breaker.allow(now)
+            breaker.record_failure(now)
+            delays.append(breaker.retry_at - now)
+        assert delays == [60, 100, 100, 100]
+
+    def test_jitter_stays_within_bounds(self):
+        breaker = CircuitBreaker(100, threshold=1, jitter=0.2)
+        breaker.record_failure(0)
+        assert 80 <= breaker.retry_in(0) <= 120
+
+    def test_success_closes_and_resets(self):
+        breaker = CircuitBreaker(30, threshold=1, jitter=0)
+        breaker.record_failure(0)
+        breaker.allow(30)
+        breaker.record_success()
+        assert breaker.state == BREAKER_CLOSED
+        assert breaker.consecutive_failures == 0
+        assert breaker.retry_in(30) is None
+        breaker.record_failure(40)
+        # Backoff restarts from the base delay after recovery
+        assert breaker.retry_in(40) == 30
+
+
+class TestEwmaRates:
+    """Tests for EwmaRates."""
+
+    def test_first_delta_seeds_all_horizons(self):
+        ewma = EwmaRates(["queries"], [("_1m", 60), ("_5m", 300)])
+        assert ewma.update(0.0, {"queries": 0}) == {"queries_1m": 0.0, "queries_5m": 0.0}
+        assert ewma.update(10.0, {"queries": 500}) == {"queries_1m": 50.0, "queries_5m": 50.0}
+
+    def test_short_horizon_reacts_faster(self):
+        ewma = EwmaRates(["queries"], [("_1m", 60), ("_5m", 300)])
+        ewma.update(0.0, {"queries": 0})
+        ewma.update(30.0, {"queries": 300})  # 10 q/s
+        rates = ewma.update(60.0, {"queries": 300 + 30 * 1000})  # spike to 1000 q/s
+        assert 10 < rates["queries_5m"] < rates["queries_1m"] < 1000
+        weight = 1 - math.exp(-0.5)
+        assert rates["queries_1m"] == round(10 + weight * 990, 2)
+
+    def test_counter_reset_only_rebases(self):
+        ewma = EwmaRates(["drops"], [("_1m", 60)])
+        ewma.update(0.0, {"drops": 100})
+        ewma.update(10.0, {"drops": 200})
+        assert ewma.update(20.0, {"drops": 5}) == {"drops_1m": 10.0}
+        assert ewma.update(30.0, {"drops": 105})["drops_1m"] == 10.0
+
+    def test_missing_counters_report_zero(self):
+        ewma = EwmaRates(["queries", "drops"], [("_1m", 60)])
+        ewma.update(0.0, {"queries": 1})
+        assert ewma.update(0.0, {"queries": "x"}) == {"queries_1m": 0.0, "drops_1m": 0.0}
+
+
+class TestPollInstrumentation:
+    """Tests for PollInstrumentation."""
+
+    def test_percentiles_over_samples(self):
+        instrumentation = PollInstrumentation(size=100)
+        for value in range(1, 101):
+            instrumentation.record("poll_ms", value)
+        summary = instrumentation.summary("poll_ms")
+        assert summary["p50"] == 50
+        assert summary["p95"] == 95
+        assert summary["max"] == 100
+        assert summary["last"] == 100
+
+    def test_ring_keeps_only_recent_samples(self):
+        instrumentation = PollInstrumentation(size=4)
+        for value in (1000, 1, 2, 3, 4):
+            instrumentation.record("poll_ms", value)
+        summary = instrumentation.summary("poll_ms")
+        assert summary["samples"] == 4
+        assert summary["max"] == 4
+
+    def test_unknown_series(self):
+        instrumentation = PollInstrumentation()
+        assert instrumentation.summary("missing") is None
+        assert instrumentation.as_dict() == {}
+
+
+class TestHistoryRing:
+    """Tests for HistoryRing."""
+
+    def test_behaves_like_bounded_deque(self):
+        ring = HistoryRing(3)
+        assert not ring
+        for i in range(5):
+            ring.append((float(i), i * 10))
+        assert ring.maxlen == 3
+        assert len(ring) == 3
+        assert list(ring) == [(2.0, 20), (3.0, 30), (4.0, 40)]
+        assert ring[0] == (2.0, 20)
+        assert ring[-1] == (4.0, 40)
+        assert ring[1:] == [(3.0, 30), (4.0, 40)]
+
+    def test_popleft_and_clear(self):
+        ring = HistoryRing(4, [(1.0, 1), (2.0, 2)])
+        assert ring.popleft() == (1.0, 1)
+        assert list(ring) == [(2.0, 2)]
+        ring.clear()
+        assert len(ring) == 0
+        with pytest.raises(IndexError):
+            ring.popleft()
+        with pytest.raises(IndexError):
+            ring[0]
+
+    def test_bytes_round_trip_across_wrap(self):
+        ring = HistoryRing(4)
+        for i in range(6):
+            ring.append((1000.5 + i, 2**40 + i))
+        data = ring.to_bytes()
+        assert len(data) == 4 * 16
+        restored = HistoryRing.from_bytes(data, 4)
+        assert list(restored) == list(ring)
+
+    def test_from_bytes_keeps_newest_when_shrinking(self):
+        ring = HistoryRing(5, [(float(i), i) for i in range(5)])
+        restored = HistoryRing.from_bytes(ring.to_bytes(), 2)
+        assert list(restored) == [(3.0, 3), (4.0, 4)]
+
+    def test_from_bytes_rejects_partial_sample(self):
+        with pytest.raises(ValueError):
+            HistoryRing.from_bytes(b"\x00" * 20, 4)
+
+    def test_bisect_time_across_wrap(self):
+        ring = HistoryRing(5)
+        for i in range(8):
+            ring.append((float(i), i))
+        # Logical contents are timestamps 3..7
+        assert [ring.bisect_time(ts) for ts in (0, 3, 3.5, 5, 7, 8)] == [0, 0, 1, 2, 4, 5]
+
+    def test_window_total_over_ring(self):
+        ring = HistoryRing(10, [(0.0, 0), (100.0, 100), (200.0, 200)])
+        assert compute_window_total(ring, 200.0, 150, 200) == 150
+
+    def test_columns_share_timestamps(self):
+        ring = HistoryRing(3, width=2)
+        for i in range(4):
+            ring.append((float(i), i, -i))
+        assert ring.width == 2
+        assert list(ring) == [(1.0, 1, -1), (2.0, 2, -2), (3.0, 3, -3)]
+        column = ring.column(1)
+        assert len(column) == 3
+        assert column[0] == (1.0, -1)
+        assert column[-1] == (3.0, -3)
+        assert column.bisect_time(2.5) == 2
+        assert compute_window_total(ring.column(0), 3.0, 1, 3) == 1
+
+    def test_fill_column(self):
+        ring = HistoryRing(4, [(0.0, 1, 0), (1.0, 2, 0)], width=2)
+        ring.fill_column(1, 7)
+        assert list(ring) == [(0.0, 1, 7), (1.0, 2, 7)]
+
+    def test_varint_round_trip(self):
+        ring = HistoryRing(5, width=2)
+        samples = [(1_700_000_000.125, 2**62, 0), (1_700_000_030.25, 2**62 + 7, 3), (1_700_000_060.5, 1, 3)]
+        for sample in samples:
+            ring.append(sample)
+        data = ring.to_varint_bytes()
+        assert list(HistoryRing.from_varint_bytes(data, 5, width=2)) == samples
+        assert list(HistoryRing.from_varint_bytes(data, 2, width=2)) == samples[1:]
+        assert HistoryRing.from_varint_bytes(HistoryRing(3).to_varint_bytes(), 3).maxlen == 3
+
+    def test_varint_is_compact_for_steady_polls(self):
+        ring = HistoryRing(100)
+        for i in range(100):
+            ring.append((1_700_000_000.0 + 30 * i, 10**12 + 100 * i))
+        assert len(ring.to_varint_bytes()) < len(ring.to_bytes()) / 3
+
+    def test_varint_rejects_truncated_payload(self):
+        data = HistoryRing(3, [(1.0, 300), (2.0, 600)]).to_varint_bytes()
+        with pytest.raises(ValueError):
+            HistoryRing.from_varint_bytes(data[:-1], 3)
+        with pytest.raises(ValueError):
+            HistoryRing.from_varint_bytes(data + b"\x00", 3)
+
+    def test_bytes_round_trip_with_columns(self):
+        ring = HistoryRing(3, width=3)
+        for i in range(5):
+            ring.append((float(i), i, i * 2, i * 3))
+        data = ring.to_bytes()
+        assert len(data) == 3 * 32
+        restored = HistoryRing.from_bytes(data, 3, width=3)
+        assert list(restored) == list(ring)